@@ -1,23 +1,8 @@
 'use client';
 
-import { useState, useEffect, useRef } from 'react';
-import novelsData from '@/data/books.json';
-import stacksData from '@/src/data/stacks.json';
+import { useState, useEffect, useRef, useMemo } from 'react';
 import Link from 'next/link';
-
-interface Novel {
-  id: string;
-  title: string;
-  author: string;
-  coverImage?: string;
-}
-
-interface Stack {
-  id: string;
-  title: string;
-  entries: Array<{ novelId: string }>;
-  [key: string]: any;
-}
+import { loadSearchIndex, SearchIndex, SearchResults } from '../lib/search';
 
 interface SearchModalProps {
   isOpen: boolean;
@@ -26,22 +11,28 @@ interface SearchModalProps {
 
 type TabType = 'all' | 'books' | 'stacks';
 
+const NO_RESULTS: SearchResults = { novels: [], stacks: [] };
+
 export default function SearchModal({ isOpen, onClose }: SearchModalProps) {
   const [searchQuery, setSearchQuery] = useState('');
   const [activeTab, setActiveTab] = useState<TabType>('all');
   const searchInputRef = useRef<HTMLInputElement>(null);
   const modalRef = useRef<HTMLDivElement>(null);
+  const [searchIndex, setSearchIndex] = useState<SearchIndex | null>(null);
 
-  const novels = novelsData as Novel[];
-  const stacks = stacksData.stacks as Stack[];
-
-  const filteredNovels = novels.filter(novel =>
-    novel.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-    novel.author.toLowerCase().includes(searchQuery.toLowerCase())
-  );
-
-  const filteredStacks = stacks.filter(stack =>
-    stack.title.toLowerCase().includes(searchQuery.toLowerCase())
+  // 首次打开时加载预生成的搜索索引（public/data/search.json）
+  useEffect(() => {
+    if (!isOpen || searchIndex) return;
+    let cancelled = false;
+    loadSearchIndex()
+      .then((index) => { if (!cancelled) setSearchIndex(index); })
+      .catch((error) => console.error(error));
+    return () => { cancelled = true; };
+  }, [isOpen, searchIndex]);
+
+  const { novels: filteredNovels, stacks: filteredStacks } = useMemo(
+    () => searchIndex ? searchIndex.search(searchQuery) : NO_RESULTS,
+    [searchIndex, searchQuery]
   );
 
   useEffect(() => {
@@ -155,23 +146,23 @@ export default function SearchModal({ isOpen, onClose }: SearchModalProps) {
               {(activeTab === 'all' || activeTab === 'books') && filteredNovels.length > 0 && (
                 <div className="sm-section">
                   <span className="sm-label">Books</span>
-                  {filteredNovels.slice(0, 5).map((novel) => (
+                  {filteredNovels.map(([, id, title, author, coverImage]) => (
                     <Link
-                      key={novel.id}
-                      href={`/novel/${novel.id}`}
+                      key={id}
+                      href={`/novel/${id}`}
                       onClick={close}
                       className="sm-result-item"
                     >
                       <div className="sm-icon-box" style={{ background: 'var(--g75)' }}>
-                        {novel.coverImage ? (
-                          <img src={novel.coverImage} alt="" style={{ width: 24, height: 32, borderRadius: 3, objectFit: 'cover' }} />
+                        {coverImage ? (
+                          <img src={coverImage} alt="" style={{ width: 24, height: 32, borderRadius: 3, objectFit: 'cover' }} />
                         ) : (
                           <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="var(--accent)" strokeWidth="2"><path d="M4 19.5v-15A2.5 2.5 0 0 1 6.5 2H20v20H6.5a2.5 2.5 0 0 1 0-5H20" /></svg>
                         )}
                       </div>
                       <div className="sm-result-text">
-                        <div className="sm-result-title">{novel.title}</div>
-                        <div className="sm-result-sub">by {novel.author}</div>
+                        <div className="sm-result-title">{title}</div>
+                        <div className="sm-result-sub">by {author}</div>
                       </div>
                       <svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="var(--g200)" strokeWidth="2"><path d="M5 12h14M12 5l7 7-7 7" /></svg>
                     </Link>
@@ -183,10 +174,10 @@ export default function SearchModal({ isOpen, onClose }: SearchModalProps) {
               {(activeTab === 'all' || activeTab === 'stacks') && filteredStacks.length > 0 && (
                 <div className="sm-section">
                   <span className="sm-label">Stacks</span>
-                  {filteredStacks.slice(0, 5).map((stack) => (
+                  {filteredStacks.map(([, id, title, novelCount]) => (
                     <Link
-                      key={stack.id}
-                      href={`/stack/${stack.id}`}
+                      key={id}
+                      href={`/stack/${id}`}
                       onClick={close}
                       className="sm-result-item"
                     >
@@ -194,8 +185,8 @@ export default function SearchModal({ isOpen, onClose }: SearchModalProps) {
                         <svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="var(--accent)" strokeWidth="2"><path d="m19 21-7-4-7 4V5a2 2 0 0 1 2-2h10a2 2 0 0 1 2 2v16z" /></svg>
                       </div>
                       <div className="sm-result-text">
-                        <div className="sm-result-title">{stack.title}</div>
-                        <div className="sm-result-sub">{stack.entries.length} picks</div>
+                        <div className="sm-result-title">{title}</div>
+                        <div className="sm-result-sub">{novelCount} picks</div>
                       </div>
                       <svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="var(--g200)" strokeWidth="2"><path d="M5 12h14M12 5l7 7-7 7" /></svg>
                     </Link>
@@ -204,7 +195,7 @@ export default function SearchModal({ isOpen, onClose }: SearchModalProps) {
               )}
 
               {/* No Results */}
-              {filteredNovels.length === 0 && filteredStacks.length === 0 && (
+              {searchIndex && filteredNovels.length === 0 && filteredStacks.length === 0 && (
                 <div className="sm-empty">
                   No results found for &ldquo;{searchQuery}&rdquo;
                 </div>
@@ -219,7 +210,7 @@ export default function SearchModal({ isOpen, onClose }: SearchModalProps) {
             <span><kbd>↑↓</kbd> navigate</span>
             <span><kbd>↵</kbd> select</span>
           </div>
-          <span>Search across {novels.length + stacks.length}+ items</span>
+          {searchIndex && <span>Search across {searchIndex.docs.length}+ items</span>}
         </div>
       </div>
     </div>
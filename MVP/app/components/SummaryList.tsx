@@ -0,0 +1,67 @@
+'use client';
+
+import { useEffect, useState } from 'react';
+import Link from 'next/link';
+import { loadPlatformPage, loadThemePage, ShardSummaryPage } from '../lib/shards';
+
+interface SummaryListProps {
+  kind: 'theme' | 'platform';
+  // 主题按书籍数据里的名称（如 Time Loop），平台按 slug
+  name: string;
+  emptyText: string;
+}
+
+// 主题 / 平台页的书单和书籍列表，数据来自 public/data/theme|platform/<name>.json
+export default function SummaryList({ kind, name, emptyText }: SummaryListProps) {
+  const [loaded, setLoaded] = useState<{ name: string; page: ShardSummaryPage | null } | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    (kind === 'theme' ? loadThemePage(name) : loadPlatformPage(name))
+      .then((page) => { if (!cancelled) setLoaded({ name, page }); })
+      .catch((error) => console.error(error));
+    return () => { cancelled = true; };
+  }, [kind, name]);
+
+  if (!loaded || loaded.name !== name) return null;
+
+  const page = loaded.page;
+  if (!page || (page.novels.length === 0 && page.stacks.length === 0)) {
+    return <p className="text-gray-500 mb-6">{emptyText}</p>;
+  }
+
+  return (
+    <div className="w-full max-w-2xl px-4 mb-6">
+      {page.stacks.length > 0 && (
+        <section className="mb-6">
+          <h2 className="text-lg font-semibold mb-2">Stacks</h2>
+          <ul>
+            {page.stacks.map((stack) => (
+              <li key={stack.id} className="mb-1">
+                <Link href={`/stack/${stack.id}`} className="text-blue-500 hover:underline">
+                  {stack.title}
+                </Link>
+                <span className="text-gray-500"> · {stack.novelCount} books</span>
+              </li>
+            ))}
+          </ul>
+        </section>
+      )}
+      {page.novels.length > 0 && (
+        <section>
+          <h2 className="text-lg font-semibold mb-2">Books</h2>
+          <ul>
+            {page.novels.map((novel) => (
+              <li key={novel.id} className="mb-1">
+                <Link href={`/novel/${novel.id}`} className="text-blue-500 hover:underline">
+                  {novel.title}
+                </Link>
+                <span className="text-gray-500"> · {novel.author}</span>
+              </li>
+            ))}
+          </ul>
+        </section>
+      )}
+    </div>
+  );
+}
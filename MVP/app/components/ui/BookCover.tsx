@@ -1,4 +1,6 @@
 import React from 'react';
+import type { ResponsiveCover } from '@/types/types';
+import CoverImage from './CoverImage';
 
 interface BookCoverProps {
   emoji?: string;
@@ -6,25 +8,41 @@ interface BookCoverProps {
   size?: 'small' | 'large';
   className?: string;
   coverImage?: string;
+  cover?: ResponsiveCover | null;
   alt?: string;
+  eager?: boolean;
+  onClick?: () => void;
 }
 
+// 与 globals.css 中 .book-cover-small / .book-cover-large 的显示宽度一致
+const COVER_SIZES = {
+  small: '100px',
+  large: '(max-width: 640px) 120px, 180px',
+};
+
 export default function BookCover({
   emoji = '📚',
   gradient = 'from-blue-500 to-indigo-600',
   size = 'small',
   className = '',
   coverImage,
-  alt = ''
+  cover,
+  alt = '',
+  eager = false,
+  onClick
 }: BookCoverProps) {
   const sizeClasses = size === 'large' ? 'book-cover-large' : 'book-cover-small';
 
   if (coverImage) {
     return (
-      <img 
-        src={coverImage} 
-        alt={alt} 
+      <CoverImage
+        src={coverImage}
+        cover={cover}
+        alt={alt}
+        sizes={COVER_SIZES[size]}
         className={`${sizeClasses} ${className}`}
+        eager={eager}
+        onClick={onClick}
       />
     );
   }
@@ -0,0 +1,55 @@
+import React from 'react';
+import type { ResponsiveCover } from '@/types/types';
+
+interface CoverImageProps {
+  src: string;
+  // 分片中书籍的 cover 字段；没有时直接用原地址
+  cover?: ResponsiveCover | null;
+  alt?: string;
+  // <source sizes>：与 className 对应的显示宽度一致
+  sizes: string;
+  className?: string;
+  style?: React.CSSProperties;
+  // 首屏大图（LCP）不延迟加载
+  eager?: boolean;
+  onClick?: () => void;
+  onError?: () => void;
+}
+
+// 封面图：有多尺寸版本的输出 <picture>（AVIF / WebP 多尺寸 + 模糊占位），没有的直接用原地址
+export default function CoverImage({
+  src,
+  cover,
+  alt = '',
+  sizes,
+  className,
+  style,
+  eager = false,
+  onClick,
+  onError
+}: CoverImageProps) {
+  if (!cover) {
+    return <img src={src} alt={alt} className={className} style={style} onClick={onClick} onError={onError} />;
+  }
+
+  // picture 不参与布局，img 仍是原来父元素的直接子元素；模糊占位图作为背景，图片加载完成后被覆盖
+  return (
+    <picture style={{ display: 'contents' }}>
+      {cover.sources.map(([type, srcSet]) => (
+        <source key={type} type={type} srcSet={srcSet} sizes={sizes} />
+      ))}
+      <img
+        src={src}
+        alt={alt}
+        width={cover.width}
+        height={cover.height}
+        loading={eager ? 'eager' : 'lazy'}
+        decoding="async"
+        className={className}
+        style={{ backgroundImage: `url(${cover.blurDataURL})`, backgroundSize: 'cover', ...style }}
+        onClick={onClick}
+        onError={onError}
+      />
+    </picture>
+  );
+}
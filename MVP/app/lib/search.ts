@@ -0,0 +1,226 @@
+// 搜索框查询预生成的倒排索引（scripts/search_index.py 输出到 public/data/search.json）
+// 规范化、前缀区间、三元组 + 编辑距离容错的规则与 Python 端一致
+
+const SEARCH_INDEX_URL = '/data/search.json';
+const FORMAT_VERSION = 1;
+
+// 字段权重：标题 / 作者 / 主题
+const FIELD_WEIGHT = [1.0, 0.8, 0.5];
+
+// 匹配方式得分
+const SCORE_EXACT = 3;
+const SCORE_PREFIX = 2;
+const SCORE_FUZZY = 1;
+
+// [类型, id, 标题, 副标题（作者 / 书单作品数）, 封面]
+export type SearchDoc = ['n' | 's', string, string, string | number, string | null];
+
+interface SearchIndexData {
+  v: number;
+  docs: SearchDoc[];
+  terms: string[];
+  postings: number[][];
+}
+
+export interface SearchResults {
+  novels: SearchDoc[];
+  stacks: SearchDoc[];
+}
+
+// ES2017 目标下不能写 \p{} 正则字面量
+const RE_MARK = new RegExp('\\p{M}', 'gu');
+const RE_TOKEN = new RegExp('[\\p{L}\\p{N}]+', 'gu');
+
+// 大小写与变音符号折叠：Kurmaić -> kurmaic
+export function fold(text: string): string {
+  return text.replace(/['’`]/g, '').normalize('NFKD').replace(RE_MARK, '').toLowerCase();
+}
+
+export function tokenize(text: string): string[] {
+  return fold(text).match(RE_TOKEN) ?? [];
+}
+
+function trigrams(term: string): Set<string> {
+  const padded = '^' + term;
+  const grams = new Set<string>();
+  for (let i = 0; i < Math.max(1, padded.length - 2); i++) grams.add(padded.slice(i, i + 3));
+  return grams;
+}
+
+function maxEdits(token: string): number {
+  if (token.length < 4) return 0;
+  return token.length < 8 ? 1 : 2;
+}
+
+// Damerau-Levenshtein（相邻换位），超过 limit 提前返回 limit + 1
+function editDistance(a: string, b: string, limit: number): number {
+  if (Math.abs(a.length - b.length) > limit) return limit + 1;
+  let prev2: number[] | null = null;
+  let prev = Array.from({ length: b.length + 1 }, (_, j) => j);
+  for (let i = 1; i <= a.length; i++) {
+    const row = [i];
+    let rowMin = i;
+    for (let j = 1; j <= b.length; j++) {
+      const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+      let value = Math.min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost);
+      if (prev2 && i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+        value = Math.min(value, prev2[j - 2] + 1);
+      }
+      row.push(value);
+      rowMin = Math.min(rowMin, value);
+    }
+    if (rowMin > limit) return limit + 1;
+    prev2 = prev;
+    prev = row;
+  }
+  return prev[b.length];
+}
+
+function lowerBound(terms: string[], target: string, start = 0): number {
+  let lo = start;
+  let hi = terms.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (terms[mid] < target) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+export class SearchIndex {
+  readonly docs: SearchDoc[];
+  private terms: string[];
+  private postings: number[][];
+  private decoded = new Map<number, Array<[number, number]>>();
+  private grams: Map<string, number[]> | null = null;
+
+  constructor(data: SearchIndexData) {
+    if (data.v !== FORMAT_VERSION) throw new Error(`搜索索引版本不符: ${data.v}`);
+    this.docs = data.docs;
+    this.terms = data.terms;
+    this.postings = data.postings;
+  }
+
+  // 解码第 i 个词项的倒排列表 -> [文档, 字段]
+  private posting(i: number): Array<[number, number]> {
+    let cached = this.decoded.get(i);
+    if (!cached) {
+      cached = [];
+      let doc = 0;
+      for (const value of this.postings[i]) {
+        doc += value >> 2;
+        cached.push([doc, value & 3]);
+      }
+      this.decoded.set(i, cached);
+    }
+    return cached;
+  }
+
+  // 三元组 -> 词项序号，首次模糊查询时生成
+  private gramIndex(): Map<string, number[]> {
+    if (!this.grams) {
+      this.grams = new Map();
+      this.terms.forEach((term, i) => {
+        for (const gram of trigrams(term)) {
+          const list = this.grams!.get(gram);
+          if (list) list.push(i);
+          else this.grams!.set(gram, [i]);
+        }
+      });
+    }
+    return this.grams;
+  }
+
+  // 与 token 在编辑距离内的词项（整词或等长前缀）
+  private fuzzyTerms(token: string): number[] {
+    const limit = maxEdits(token);
+    if (!limit) return [];
+    const grams = this.gramIndex();
+    const tokenGrams = trigrams(token);
+    const counts = new Map<number, number>();
+    for (const gram of tokenGrams) {
+      for (const i of grams.get(gram) ?? []) counts.set(i, (counts.get(i) ?? 0) + 1);
+    }
+    // 每处编辑最多破坏 3 个三元组
+    const need = Math.max(1, tokenGrams.size - 3 * limit);
+    const matches: number[] = [];
+    for (const [i, count] of counts) {
+      if (count < need) continue;
+      const term = this.terms[i];
+      if (editDistance(token, term, limit) <= limit ||
+          (term.length > token.length && editDistance(token, term.slice(0, token.length), limit) <= limit)) {
+        matches.push(i);
+      }
+    }
+    return matches;
+  }
+
+  // 单个查询词命中的文档 -> 得分
+  private tokenScores(token: string): Map<number, number> {
+    const scores = new Map<number, number>();
+    const hit = (i: number, base: number) => {
+      for (const [doc, field] of this.posting(i)) {
+        const score = base * FIELD_WEIGHT[field];
+        if (score > (scores.get(doc) ?? 0)) scores.set(doc, score);
+      }
+    };
+
+    const start = lowerBound(this.terms, token);
+    const end = lowerBound(this.terms, token + '\uffff', start);
+    for (let i = start; i < end; i++) hit(i, this.terms[i] === token ? SCORE_EXACT : SCORE_PREFIX);
+    if (end === start || scores.size < 3) {
+      for (const i of this.fuzzyTerms(token)) hit(i, SCORE_FUZZY);
+    }
+    return scores;
+  }
+
+  // 所有查询词都须命中；得分高的在前，同分按原顺序
+  search(query: string, limit = 5): SearchResults {
+    const results: SearchResults = { novels: [], stacks: [] };
+    const tokens = [...new Set(tokenize(query))].sort((a, b) => b.length - a.length);
+    if (!tokens.length) return results;
+
+    let total: Map<number, number> | null = null;
+    for (const token of tokens) {
+      const scores = this.tokenScores(token);
+      if (total) {
+        const next = new Map<number, number>();
+        for (const [doc, score] of scores) {
+          const prev = total.get(doc);
+          if (prev !== undefined) next.set(doc, prev + score);
+        }
+        total = next;
+      } else {
+        total = scores;
+      }
+      if (!total.size) return results;
+    }
+
+    const ranked = [...total!].sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+    for (const [doc] of ranked) {
+      const entry = this.docs[doc];
+      const bucket = entry[0] === 'n' ? results.novels : results.stacks;
+      if (bucket.length < limit) bucket.push(entry);
+    }
+    return results;
+  }
+}
+
+let loading: Promise<SearchIndex> | null = null;
+
+// 首次打开搜索框时加载，之后复用
+export function loadSearchIndex(): Promise<SearchIndex> {
+  if (!loading) {
+    loading = fetch(SEARCH_INDEX_URL)
+      .then((response) => {
+        if (!response.ok) throw new Error(`加载搜索索引失败: ${response.status}`);
+        return response.json();
+      })
+      .then((data: SearchIndexData) => new SearchIndex(data))
+      .catch((error) => {
+        loading = null;
+        throw error;
+      });
+  }
+  return loading;
+}
@@ -0,0 +1,65 @@
+// 按路由拆分的预生成数据（scripts/build_shards.py 输出到 public/data/）
+// 页面按需请求自己的分片，不再整体 import books.json / stacks.json
+
+import type { NovelDetailData, ResponsiveCover, StackDetailData } from '@/types/types';
+
+const SHARD_ROOT = '/data';
+
+// 首页书单卡片：书单摘要 + 前几本书（精选书单带简介）
+export interface HomeStack {
+  id: string;
+  title: string;
+  description?: string;
+  curatorId: string;
+  curatorNote?: string;
+  novelCount: number;
+  novels: Array<{ id: string; title: string; author: string; coverImage?: string; cover?: ResponsiveCover; status?: string; synopsis?: string }>;
+}
+
+export interface ShardHome {
+  featured: HomeStack;
+  picks: HomeStack[];
+  // stat 为 rising.py 排序用的计数（followers、views 等）
+  rising: { days: number; stat: string; stacks: Array<HomeStack & { gained: number; growth: number }> };
+}
+
+// 主题 / 平台页的摘要数据
+export interface ShardSummaryPage {
+  novels: Array<{ id: string; title: string; author: string; coverImage?: string | null; cover?: ResponsiveCover; status?: string; themes?: string[] }>;
+  stacks: Array<{ id: string; title: string; description?: string; coverGradient?: string; novelCount: number }>;
+}
+
+// 与 build_shards.shard_name 一致：安全 ID 直接作为文件名，其余转义
+function shardName(id: string): string {
+  if (/^[a-z0-9][a-z0-9._-]*$/.test(id)) return id;
+  return encodeURIComponent(id)
+    .replace(/[!'()*]/g, (c) => '%' + c.charCodeAt(0).toString(16).toUpperCase())
+    .replace(/%/g, '_');
+}
+
+async function loadShard<T>(path: string): Promise<T | null> {
+  const response = await fetch(`${SHARD_ROOT}/${path}.json`);
+  if (response.status === 404) return null;
+  if (!response.ok) throw new Error(`加载 ${path} 失败: ${response.status}`);
+  return response.json() as Promise<T>;
+}
+
+export function loadHome() {
+  return loadShard<ShardHome>('home');
+}
+
+export function loadNovelDetail(id: string) {
+  return loadShard<NovelDetailData>(`novel/${shardName(id)}`);
+}
+
+export function loadStackDetail(id: string) {
+  return loadShard<StackDetailData>(`stack/${shardName(id)}`);
+}
+
+export function loadThemePage(theme: string) {
+  return loadShard<ShardSummaryPage & { theme: string }>(`theme/${shardName(theme)}`);
+}
+
+export function loadPlatformPage(platform: string) {
+  return loadShard<ShardSummaryPage & { platform: string }>(`platform/${shardName(platform)}`);
+}
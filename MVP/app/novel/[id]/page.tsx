@@ -2,8 +2,12 @@
 
 import { useState, use, useEffect, useRef } from 'react';
 import Link from 'next/link';
-import novelsData from '@/data/books.json';
+import curatorsData from '@/src/data/curators.json';
+import type { NovelDetailData, ResponsiveCover } from '@/types/types';
 import Footer from '../../components/Footer';
+import BookCover from '../../components/ui/BookCover';
+import CoverImage from '../../components/ui/CoverImage';
+import { loadNovelDetail } from '../../lib/shards';
 import { formatTagLabel } from '../../lib/tagStyles';
 
 // 平台类型
@@ -24,10 +28,11 @@ interface Novel {
   editorNote?: string;
   themes: string[];
   coverImage?: string | null;
+  cover?: ResponsiveCover;
   links: Array<{ platform: string; url: string; isCanonical: boolean }>;
 }
 
-// MVP Novel 接口（匹配 data/books.json）
+// MVP Novel 接口（匹配 data/books.json，页面数据来自 public/data/novel/<id>.json）
 interface MVPNovel {
   id: string;
   title: string;
@@ -47,6 +52,7 @@ interface MVPNovel {
   completedAt?: string;
   coverGradient?: string;
   coverImage?: string;
+  cover?: ResponsiveCover;
   editorNote?: string;
   curatorNote?: string;
   stackCount: number;
@@ -60,6 +66,7 @@ interface Stack {
   description: string;
   picks: number;
   gradient: string;
+  curator: string;
 }
 
 const FEATURED_SPINE_SETS = [
@@ -77,10 +84,10 @@ const FEATURED_SPINE_SETS = [
   },
 ];
 
-const FEATURED_CURATORS = [
-  { name: 'Zorian', dot: 'linear-gradient(135deg,#5a9eae,#3e7e92)' },
-  { name: 'looplord', dot: 'linear-gradient(135deg,#ae6a8a,#924e6e)' },
-  { name: 'TimeLooper', dot: 'linear-gradient(135deg,#7a6aae,#5e4e92)' },
+const CURATOR_DOTS = [
+  'linear-gradient(135deg,#5a9eae,#3e7e92)',
+  'linear-gradient(135deg,#ae6a8a,#924e6e)',
+  'linear-gradient(135deg,#7a6aae,#5e4e92)',
 ];
 
 // 平台映射函数
@@ -141,37 +148,11 @@ function convertMVPToNovel(mvpNovel: MVPNovel): Novel {
     editorNote: mvpNovel.editorNote || mvpNovel.curatorNote,
     themes: mvpNovel.themes,
     coverImage: mvpNovel.coverImage || null,
+    cover: mvpNovel.cover,
     links: mvpNovel.links
   };
 }
 
-// 获取相关书单
-const getStacksForNovel = (novelId: string): Stack[] => {
-  return [
-    {
-      id: 'rational-fiction-essentials',
-      title: 'Rational Fiction Essentials',
-      description: 'Stories where protagonists think strategically.',
-      picks: 15,
-      gradient: 'from-gray-200 to-gray-100'
-    },
-    {
-      id: 'completed-bingeable',
-      title: 'Completed & Bingeable',
-      description: 'Finished stories ready to marathon.',
-      picks: 20,
-      gradient: 'from-gray-200 to-gray-100'
-    },
-    {
-      id: 'time-loop-masters',
-      title: 'Time Loop Masters',
-      description: 'The best of groundhog day fiction.',
-      picks: 8,
-      gradient: 'from-gray-200 to-gray-100'
-    }
-  ];
-};
-
 function stackSpineLetters(title: string) {
   const letters = title
     .split(/\s+/)
@@ -183,52 +164,25 @@ function stackSpineLetters(title: string) {
   return letters;
 }
 
-// 获取相似推荐
-const getSimilarNovels = (currentNovelId: string) => {
-  const allNovels = novelsData as MVPNovel[];
-  return allNovels
-    .filter(novel => novel.id !== currentNovelId)
-    .slice(0, 8)
-    .map(novel => ({
-      id: novel.id,
-      title: novel.title,
-      author: novel.author,
-      gradient: novel.coverGradient || 'from-gray-200 to-gray-100',
-      coverImage: novel.coverImage
-    }));
-};
-
-// 获取相关书籍（同一系列或同一作者）
-const getRelatedNovels = (currentNovelId: string, currentAuthor: string, currentTitle: string) => {
-  const allNovels = novelsData as MVPNovel[];
-
-  // 提取书名前缀用于系列匹配（如 "Mother of Learning" -> "mother of learning"）
-  const titlePrefix = currentTitle.toLowerCase().split(':')[0].trim();
-  const authorLower = currentAuthor.toLowerCase();
-
-  return allNovels
-    .filter(novel => {
-      if (novel.id === currentNovelId) return false;
-
-      // 同一作者
-      const sameAuthor = novel.author.toLowerCase() === authorLower;
-
-      // 同一系列（书名前缀相同）
-      const novelTitlePrefix = novel.title.toLowerCase().split(':')[0].trim();
-      const sameSeries = titlePrefix.length > 3 &&
-        (novelTitlePrefix.includes(titlePrefix) || titlePrefix.includes(novelTitlePrefix));
-
-      return sameAuthor || sameSeries;
-    })
-    .slice(0, 6)
-    .map(novel => ({
-      id: novel.id,
-      title: novel.title,
-      author: novel.author,
-      gradient: novel.coverGradient || 'from-gray-200 to-gray-100',
-      coverImage: novel.coverImage
-    }));
-};
+// 推荐书籍的缩略信息（相似推荐、同一系列或同一作者的作品由 scripts/build_shards.py 预先算好）
+const toThumbnail = (novel: MVPNovel) => ({
+  id: novel.id,
+  title: novel.title,
+  author: novel.author,
+  gradient: novel.coverGradient || 'from-gray-200 to-gray-100',
+  coverImage: novel.coverImage,
+  cover: novel.cover
+});
+
+// 收录这本书的书单（分片中的 stacks）
+const toStackCard = (stack: NovelDetailData['stacks'][number]): Stack => ({
+  id: stack.id,
+  title: stack.title,
+  description: stack.description,
+  picks: stack.entries.length,
+  gradient: stack.coverGradient || 'from-gray-200 to-gray-100',
+  curator: curatorsData.curators.find((c) => c.id === stack.curatorId)?.name ?? stack.curatorId
+});
 
 // 平台配置
 const PLATFORM_CONFIG: Record<Platform, { name: string; bgColor: string; iconBg: string }> = {
@@ -241,6 +195,41 @@ const PLATFORM_CONFIG: Record<Platform, { name: string; bgColor: string; iconBg:
 
 export default function NovelDetailPage({ params }: { params: Promise<{ id: string }> }) {
   const { id } = use(params);
+  // 按需加载这本书的分片；detail 为 null 表示没有这本书
+  const [loaded, setLoaded] = useState<{ id: string; detail: NovelDetailData | null } | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    loadNovelDetail(id)
+      .then((detail) => { if (!cancelled) setLoaded({ id, detail }); })
+      .catch((error) => {
+        console.error(error);
+        if (!cancelled) setLoaded({ id, detail: null });
+      });
+    return () => { cancelled = true; };
+  }, [id]);
+
+  if (!loaded || loaded.id !== id) {
+    return <div className="min-h-screen bg-deep-50" />;
+  }
+
+  // 如果找不到小说，显示 404
+  if (!loaded.detail) {
+    return (
+      <div className="min-h-screen bg-deep-50 flex items-center justify-center">
+        <div className="text-center">
+          <h1 className="text-4xl font-bold text-deep-900 mb-4">Novel Not Found</h1>
+          <p className="text-deep-600 mb-8">The novel you're looking for doesn't exist.</p>
+          <Link href="/" className="text-sonar-600 hover:underline">Return to Home</Link>
+        </div>
+      </div>
+    );
+  }
+
+  return <NovelDetail detail={loaded.detail} />;
+}
+
+function NovelDetail({ detail }: { detail: NovelDetailData }) {
   const [isSaved, setIsSaved] = useState(false);
   const [showFullSynopsis, setShowFullSynopsis] = useState(false);
   const [showSynopsisButton, setShowSynopsisButton] = useState(false);
@@ -256,24 +245,8 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
   const synopsisRef = useRef<HTMLParagraphElement>(null);
   const editorTakeRef = useRef<HTMLParagraphElement>(null);
 
-  // 根据 ID 从数据中查找小说
-  const mvpNovel = (novelsData as MVPNovel[]).find(novel => novel.id === id);
-
-  // 如果找不到小说，显示 404
-  if (!mvpNovel) {
-    return (
-      <div className="min-h-screen bg-deep-50 flex items-center justify-center">
-        <div className="text-center">
-          <h1 className="text-4xl font-bold text-deep-900 mb-4">Novel Not Found</h1>
-          <p className="text-deep-600 mb-8">The novel you're looking for doesn't exist.</p>
-          <Link href="/" className="text-sonar-600 hover:underline">Return to Home</Link>
-        </div>
-      </div>
-    );
-  }
-
   // 转换数据格式
-  const novelData = convertMVPToNovel(mvpNovel);
+  const novelData = convertMVPToNovel(detail.novel);
   const statusText = novelData.status === 'Completed'
     ? 'DONE'
     : novelData.status === 'Ongoing'
@@ -288,9 +261,9 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
       : novelData.status === 'Hiatus'
         ? 'status-hiatus'
         : 'status-dropped';
-  const stacks = getStacksForNovel(id);
-  const similarNovels = getSimilarNovels(id);
-  const relatedNovels = getRelatedNovels(id, mvpNovel.author, mvpNovel.title);
+  const stacks = detail.stacks.map(toStackCard);
+  const similarNovels = detail.similarNovels.map(toThumbnail);
+  const relatedNovels = detail.relatedNovels.map(toThumbnail);
 
   // 检测 synopsis 是否被截断
   useEffect(() => {
@@ -348,10 +321,13 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
               <div className="flex sm:flex-col gap-5 sm:gap-6 nd-sidebar-top">
                 {/* Cover */}
                 {novelData.coverImage ? (
-                  <img
-                    src={novelData.coverImage}
+                  <BookCover
+                    size="large"
+                    coverImage={novelData.coverImage}
+                    cover={novelData.cover}
                     alt={novelData.title}
-                    className="book-cover-large flex-shrink-0 lg:mt-1"
+                    className="flex-shrink-0 lg:mt-1"
+                    eager
                     onClick={() => setCoverModalOpen(true)}
                   />
                 ) : (
@@ -596,7 +572,7 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
                         return (
                           <Link key={novel.id} href={`/novel/${novel.id}`} className="block flex-shrink-0 nd-book-thumb">
                             {novel.coverImage ? (
-                              <img src={novel.coverImage} alt={novel.title} className="book-cover-small mb-2 nd-book-thumb-cover" />
+                              <BookCover coverImage={novel.coverImage} cover={novel.cover} alt={novel.title} className="mb-2 nd-book-thumb-cover" />
                             ) : (
                               <div className={`book-cover-small bg-gradient-to-br ${style.gradient} flex items-center justify-center text-3xl mb-2 nd-book-thumb-cover`}>
                                 {style.icon}
@@ -622,7 +598,7 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
                         return (
                           <Link key={novel.id} href={`/novel/${novel.id}`} className="block nd-book-thumb">
                             {novel.coverImage ? (
-                              <img src={novel.coverImage} alt={novel.title} className="book-cover-small mb-2 nd-book-thumb-cover" />
+                              <BookCover coverImage={novel.coverImage} cover={novel.cover} alt={novel.title} className="mb-2 nd-book-thumb-cover" />
                             ) : (
                               <div className={`book-cover-small bg-gradient-to-br ${style.gradient} flex items-center justify-center text-3xl mb-2 nd-book-thumb-cover`}>
                                 {style.icon}
@@ -660,7 +636,7 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
                       return (
                         <Link key={novel.id} href={`/novel/${novel.id}`} className="block flex-shrink-0 nd-book-thumb">
                           {novel.coverImage ? (
-                            <img src={novel.coverImage} alt={novel.title} className="book-cover-small mb-2 nd-book-thumb-cover" />
+                            <BookCover coverImage={novel.coverImage} cover={novel.cover} alt={novel.title} className="mb-2 nd-book-thumb-cover" />
                           ) : (
                             <div className={`book-cover-small bg-gradient-to-br ${style.gradient} flex items-center justify-center text-3xl mb-2 nd-book-thumb-cover`}>
                               {style.icon}
@@ -689,7 +665,7 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
                       return (
                         <Link key={novel.id} href={`/novel/${novel.id}`} className="block nd-book-thumb">
                           {novel.coverImage ? (
-                            <img src={novel.coverImage} alt={novel.title} className="book-cover-small mb-2 nd-book-thumb-cover" />
+                            <BookCover coverImage={novel.coverImage} cover={novel.cover} alt={novel.title} className="mb-2 nd-book-thumb-cover" />
                           ) : (
                             <div className={`book-cover-small bg-gradient-to-br ${style.gradient} flex items-center justify-center text-3xl mb-2 nd-book-thumb-cover`}>
                               {style.icon}
@@ -705,86 +681,88 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
               </section>
 
               {/* Featured in Stacks */}
-              <section className="mb-10 sm:mb-10 nd-sec nd-fis-sec">
-                <h2 className="text-sm font-semibold text-neutral-400 uppercase tracking-wider mb-5 nd-sec-label">Featured in {stacks.length} Stacks</h2>
-                {/* Mobile */}
-                <div className="sm:hidden">
-                  <div
-                    className="flex gap-4 px-5 pb-0 pt-0 overflow-x-auto hide-scrollbar nd-fis-scroll"
-                    style={{ WebkitOverflowScrolling: 'touch' }}
-                  >
-                    {stacks.map((stack, index) => {
-                      const spines = FEATURED_SPINE_SETS[index % FEATURED_SPINE_SETS.length];
-                      const letters = stackSpineLetters(stack.title);
-                      const curator = FEATURED_CURATORS[index % FEATURED_CURATORS.length];
-                      return (
-                        <Link key={stack.id} href={`/stack/${stack.id}`} className="card card-hover p-4 w-[260px] flex-shrink-0 nd-fis-card">
-                          <div className="nd-fis-spines">
-                            {letters.map((letter, i) => (
-                              <div
-                                key={`${stack.id}-m-${i}`}
-                                className="nd-fis-spine"
-                                style={{
-                                  background: spines.gradients[i],
-                                  height: `${spines.heights[i]}px`,
-                                }}
-                              >
-                                {letter}
+              {stacks.length > 0 && (
+                <section className="mb-10 sm:mb-10 nd-sec nd-fis-sec">
+                  <h2 className="text-sm font-semibold text-neutral-400 uppercase tracking-wider mb-5 nd-sec-label">Featured in {stacks.length} Stacks</h2>
+                  {/* Mobile */}
+                  <div className="sm:hidden">
+                    <div
+                      className="flex gap-4 px-5 pb-0 pt-0 overflow-x-auto hide-scrollbar nd-fis-scroll"
+                      style={{ WebkitOverflowScrolling: 'touch' }}
+                    >
+                      {stacks.map((stack, index) => {
+                        const spines = FEATURED_SPINE_SETS[index % FEATURED_SPINE_SETS.length];
+                        const letters = stackSpineLetters(stack.title);
+                        const curatorDot = CURATOR_DOTS[index % CURATOR_DOTS.length];
+                        return (
+                          <Link key={stack.id} href={`/stack/${stack.id}`} className="card card-hover p-4 w-[260px] flex-shrink-0 nd-fis-card">
+                            <div className="nd-fis-spines">
+                              {letters.map((letter, i) => (
+                                <div
+                                  key={`${stack.id}-m-${i}`}
+                                  className="nd-fis-spine"
+                                  style={{
+                                    background: spines.gradients[i],
+                                    height: `${spines.heights[i]}px`,
+                                  }}
+                                >
+                                  {letter}
+                                </div>
+                              ))}
+                            </div>
+                            <p className="nd-fis-title">{stack.title}</p>
+                            <p className="nd-fis-meta">"{stack.description}"</p>
+                            <div className="nd-fis-foot">
+                              <div className="nd-fis-curator">
+                                <div className="nd-fis-curator-dot" style={{ background: curatorDot }} />
+                                <span>{stack.curator}</span>
                               </div>
-                            ))}
-                          </div>
-                          <p className="nd-fis-title">{stack.title}</p>
-                          <p className="nd-fis-meta">"{stack.description}"</p>
-                          <div className="nd-fis-foot">
-                            <div className="nd-fis-curator">
-                              <div className="nd-fis-curator-dot" style={{ background: curator.dot }} />
-                              <span>{curator.name}</span>
+                              <span className="nd-fis-count">{stack.picks} books →</span>
                             </div>
-                            <span className="nd-fis-count">{stack.picks} books →</span>
-                          </div>
-                        </Link>
-                      );
-                    })}
+                          </Link>
+                        );
+                      })}
+                    </div>
                   </div>
-                </div>
-                {/* Desktop */}
-                <div className="hidden sm:block scroll-wrapper nd-fis-scroll-desktop">
-                  <div className="scroll-container nd-fis-scroll">
-                    {stacks.map((stack, index) => {
-                      const spines = FEATURED_SPINE_SETS[index % FEATURED_SPINE_SETS.length];
-                      const letters = stackSpineLetters(stack.title);
-                      const curator = FEATURED_CURATORS[index % FEATURED_CURATORS.length];
-                      return (
-                        <Link key={stack.id} href={`/stack/${stack.id}`} className="card card-hover p-4 w-[260px] nd-fis-card">
-                          <div className="nd-fis-spines">
-                            {letters.map((letter, i) => (
-                              <div
-                                key={`${stack.id}-d-${i}`}
-                                className="nd-fis-spine"
-                                style={{
-                                  background: spines.gradients[i],
-                                  height: `${spines.heights[i]}px`,
-                                }}
-                              >
-                                {letter}
+                  {/* Desktop */}
+                  <div className="hidden sm:block scroll-wrapper nd-fis-scroll-desktop">
+                    <div className="scroll-container nd-fis-scroll">
+                      {stacks.map((stack, index) => {
+                        const spines = FEATURED_SPINE_SETS[index % FEATURED_SPINE_SETS.length];
+                        const letters = stackSpineLetters(stack.title);
+                        const curatorDot = CURATOR_DOTS[index % CURATOR_DOTS.length];
+                        return (
+                          <Link key={stack.id} href={`/stack/${stack.id}`} className="card card-hover p-4 w-[260px] nd-fis-card">
+                            <div className="nd-fis-spines">
+                              {letters.map((letter, i) => (
+                                <div
+                                  key={`${stack.id}-d-${i}`}
+                                  className="nd-fis-spine"
+                                  style={{
+                                    background: spines.gradients[i],
+                                    height: `${spines.heights[i]}px`,
+                                  }}
+                                >
+                                  {letter}
+                                </div>
+                              ))}
+                            </div>
+                            <p className="nd-fis-title">{stack.title}</p>
+                            <p className="nd-fis-meta">"{stack.description}"</p>
+                            <div className="nd-fis-foot">
+                              <div className="nd-fis-curator">
+                                <div className="nd-fis-curator-dot" style={{ background: curatorDot }} />
+                                <span>{stack.curator}</span>
                               </div>
-                            ))}
-                          </div>
-                          <p className="nd-fis-title">{stack.title}</p>
-                          <p className="nd-fis-meta">"{stack.description}"</p>
-                          <div className="nd-fis-foot">
-                            <div className="nd-fis-curator">
-                              <div className="nd-fis-curator-dot" style={{ background: curator.dot }} />
-                              <span>{curator.name}</span>
+                              <span className="nd-fis-count">{stack.picks} books →</span>
                             </div>
-                            <span className="nd-fis-count">{stack.picks} books →</span>
-                          </div>
-                        </Link>
-                      );
-                    })}
+                          </Link>
+                        );
+                      })}
+                    </div>
                   </div>
-                </div>
-              </section>
+                </section>
+              )}
             </div>
           </div>
         </div>
@@ -797,10 +775,13 @@ export default function NovelDetailPage({ params }: { params: Promise<{ id: stri
           onClick={() => setCoverModalOpen(false)}
         >
           {novelData.coverImage ? (
-            <img
+            <CoverImage
               src={novelData.coverImage}
+              cover={novelData.cover}
               alt={novelData.title}
+              sizes="(max-width: 640px) 280px, 320px"
               className="w-[280px] sm:w-[320px] shadow-2xl rounded-none"
+              eager
             />
           ) : (
             <div className="w-[280px] sm:w-[320px] aspect-[3/4] bg-gradient-to-br from-blue-500 to-indigo-600 flex items-center justify-center text-8xl shadow-2xl">
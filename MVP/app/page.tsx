@@ -1,20 +1,16 @@
 'use client';
 
-import { useState, useRef } from 'react';
+import { useEffect, useState, useRef } from 'react';
 import Link from 'next/link';
-import { Novel, Stack, PLATFORM_INFO, THEME_INFO, Theme } from '@/types/types';
-import stacksData from '@/src/data/stacks.json';
+import { Stack, PLATFORM_INFO, THEME_INFO, Theme } from '@/types/types';
 import curatorsData from '@/src/data/curators.json';
-import novelsData from '@/data/books.json';
+import { loadHome, ShardHome } from './lib/shards';
 import Footer from './components/Footer';
+import CoverImage from './components/ui/CoverImage';
 
 // ─── Data wiring ──────────────────────────────────────────────
-const allStacks = stacksData.stacks;
-const editorPicks = allStacks.filter((s) => s.isEditorPick);
-const featuredStack = allStacks.find((s) => s.isFeatured) || allStacks[0];
-// Hero preview uses the stack with isHeroPreview flag (The Worm Fanfic Hall of Fame by Zorian)
-const heroPreviewStack = allStacks.find((s) => (s as any).isHeroPreview) || allStacks.find((s) => s.id !== featuredStack.id && s.isEditorPick) || allStacks[0];
-const novelsById = new Map((novelsData as Novel[]).map((n) => [n.id, n]));
+// Featured stack, editor's picks and rising stacks (with their first few books) come from
+// public/data/home.json (scripts/build_shards.py); rising is empty until scraped history exists
 const curatorsById = new Map(curatorsData.curators.map((c) => [c.id, c]));
 
 // ─── Spine gradient colors ───────────────────────────────────
@@ -37,6 +33,13 @@ const AVATAR_GRADIENTS = [
   'linear-gradient(135deg,#E05050,#B03030)',
 ];
 
+// ─── Cover display widths (match globals.css) ───────────────
+const COVER_SIZES = {
+  hero: '(max-width: 600px) 84px, (max-width: 960px) 96px, 120px',
+  compact: '(max-width: 960px) 56px, 52px',
+  spine: '28px',
+};
+
 // ─── Theme grid config ───────────────────────────────────────
 const FEATURED_THEMES: { id: Theme; name: string; icon: string; count: number }[] = [
   { id: 'progression' as Theme, name: 'Progression Fantasy', icon: 'PF', count: 47 },
@@ -56,7 +59,7 @@ const PLATFORMS = [
 ];
 
 // ─── Helpers ─────────────────────────────────────────────────
-function getStatusLabel(status: string): { label: string; cls: string; mbCls: string } {
+function getStatusLabel(status?: string): { label: string; cls: string; mbCls: string } {
   switch (status) {
     case 'completed': return { label: 'Done', cls: 'st-d', mbCls: 'mb-d' };
     case 'ongoing': return { label: 'Live', cls: 'st-l', mbCls: 'mb-l' };
@@ -65,6 +68,14 @@ function getStatusLabel(status: string): { label: string; cls: string; mbCls: st
   }
 }
 
+// rising.py 的时间窗口（--days）-> 标题
+function risingTitle(days: number) {
+  if (days === 1) return 'Rising Today';
+  if (days === 7) return 'Rising This Week';
+  if (days === 30) return 'Rising This Month';
+  return `Rising in the Last ${days} Days`;
+}
+
 function getCuratorName(curatorId: string) {
   const c = curatorsById.get(curatorId);
   return c ? c.name : curatorId;
@@ -73,137 +84,139 @@ function getCuratorName(curatorId: string) {
 // ═══════════════════════════════════════════════════════════════
 export default function HomePage() {
   const [email, setEmail] = useState('');
+  const [home, setHome] = useState<ShardHome | null>(null);
   const scrollRef = useRef<HTMLDivElement>(null);
 
-  // Featured stack data
-  const featuredNovels = featuredStack.entries
-    .sort((a, b) => a.order - b.order)
-    .map((e) => novelsById.get(e.novelId))
-    .filter((n): n is Novel => Boolean(n));
-
-  const featuredCuratorName = getCuratorName(featuredStack.curatorId);
+  useEffect(() => {
+    let cancelled = false;
+    loadHome()
+      .then((data) => { if (!cancelled) setHome(data); })
+      .catch((error) => console.error(error));
+    return () => { cancelled = true; };
+  }, []);
 
-  // Hero preview stack data (different from featured stack)
-  const heroPreviewNovels = heroPreviewStack.entries
-    .sort((a, b) => a.order - b.order)
-    .map((e) => novelsById.get(e.novelId))
-    .filter((n): n is Novel => Boolean(n));
-
-  const heroPreviewCuratorName = getCuratorName(heroPreviewStack.curatorId);
+  // Featured stack data
+  const featuredStack = home?.featured;
+  const featuredNovels = featuredStack?.novels ?? [];
+  const featuredCuratorName = featuredStack ? getCuratorName(featuredStack.curatorId) : '';
 
   // Editor's picks scroll
   const scrollPicks = (dir: 'l' | 'r') => {
     scrollRef.current?.scrollBy({ left: dir === 'l' ? -316 : 316, behavior: 'smooth' });
   };
 
-  // Filter out featured stack from editor's picks to avoid duplication
-  const pickStacks = editorPicks.filter((s) => s.id !== featuredStack.id);
+  // Editor's picks, featured stack already excluded
+  const pickStacks = home?.picks ?? [];
+  const risingStacks = home?.rising.stacks ?? [];
+  const risingDays = home?.rising.days ?? 7;
 
   return (
     <div>
       {/* ═══ SPOTLIGHT ═══ */}
-      <section className="spotlight">
-        <div className="spotlight-card">
-          {/* 左侧：标题区 */}
-          <div className="spotlight-left">
-            <div className="spotlight-title-area">
-              <div className="spotlight-label">Editor's Pick</div>
-              <h1 className="spotlight-title">{featuredStack.title}</h1>
-            </div>
+      {featuredStack && (
+        <section className="spotlight">
+          <div className="spotlight-card">
+            {/* 左侧：标题区 */}
+            <div className="spotlight-left">
+              <div className="spotlight-title-area">
+                <div className="spotlight-label">Editor's Pick</div>
+                <h1 className="spotlight-title">{featuredStack.title}</h1>
+              </div>
 
-            {/* 补充信息区 */}
-            <div className="spotlight-meta-area">
-              <p
-                className="spotlight-note"
-                style={{
-                  display: '-webkit-box',
-                  WebkitLineClamp: 3,
-                  WebkitBoxOrient: 'vertical',
-                  overflow: 'hidden',
-                  whiteSpace: 'normal',
-                }}
-              >
-                {featuredStack.curatorNote || featuredStack.description}
-              </p>
-              <div className="spotlight-meta">
-                <div className="curator-avatar"></div>
-                <div className="curator-info">
-                  Curated by <strong>{featuredCuratorName}</strong>
+              {/* 补充信息区 */}
+              <div className="spotlight-meta-area">
+                <p
+                  className="spotlight-note"
+                  style={{
+                    display: '-webkit-box',
+                    WebkitLineClamp: 3,
+                    WebkitBoxOrient: 'vertical',
+                    overflow: 'hidden',
+                    whiteSpace: 'normal',
+                  }}
+                >
+                  {featuredStack.curatorNote || featuredStack.description}
+                </p>
+                <div className="spotlight-meta">
+                  <div className="curator-avatar"></div>
+                  <div className="curator-info">
+                    Curated by <strong>{featuredCuratorName}</strong>
+                  </div>
                 </div>
               </div>
             </div>
-          </div>
-
-          {/* 右侧：书籍区 */}
-          <div className="spotlight-right">
-            {featuredNovels.length > 0 && (
-              <>
-                <div className="hero-book">
-                  <Link href={`/novel/${featuredNovels[0]?.id}`} className="hero-book-main">
-                    <div
-                      className="hero-book-cover"
-                      style={{ background: featuredNovels[0].coverImage ? 'transparent' : SPINE_COLORS[0 % SPINE_COLORS.length] }}
-                    >
-                      {featuredNovels[0].coverImage ? (
-                        <img src={featuredNovels[0].coverImage} alt={featuredNovels[0].title} className="hero-book-cover-img" />
-                      ) : (
-                        featuredNovels[0].title.charAt(0)
-                      )}
-                    </div>
-                    <div className="hero-book-info">
-                      <div className="hero-book-title">{featuredNovels[0].title}</div>
-                      <div className="hero-book-author">{featuredNovels[0].author}</div>
-                      <div
-                        className="hero-book-curator-note"
-                        style={{
-                          display: '-webkit-box',
-                          WebkitLineClamp: 3,
-                          WebkitBoxOrient: 'vertical',
-                          overflow: 'hidden',
-                        }}
-                      >
-                        {featuredNovels[0].synopsis || featuredStack.description || ''}
-                      </div>
-                    </div>
-                  </Link>
-                </div>
 
-                <div className="spotlight-divider"></div>
-
-                <div className="compact-books-label">Also in This Stack</div>
-                <div className="compact-books">
-                  {featuredNovels.slice(1, 4).map((novel, i) => (
-                    <Link key={novel.id} href={`/novel/${novel.id}`} className="compact-book">
+            {/* 右侧：书籍区 */}
+            <div className="spotlight-right">
+              {featuredNovels.length > 0 && (
+                <>
+                  <div className="hero-book">
+                    <Link href={`/novel/${featuredNovels[0]?.id}`} className="hero-book-main">
                       <div
-                        className="compact-book-cover"
-                        style={{ background: novel.coverImage ? 'transparent' : SPINE_COLORS[(i + 1) % SPINE_COLORS.length] }}
+                        className="hero-book-cover"
+                        style={{ background: featuredNovels[0].coverImage ? 'transparent' : SPINE_COLORS[0 % SPINE_COLORS.length] }}
                       >
-                        {novel.coverImage ? (
-                          <img src={novel.coverImage} alt={novel.title} className="compact-book-cover-img" />
+                        {featuredNovels[0].coverImage ? (
+                          <CoverImage src={featuredNovels[0].coverImage} cover={featuredNovels[0].cover} alt={featuredNovels[0].title} sizes={COVER_SIZES.hero} className="hero-book-cover-img" eager />
                         ) : (
-                          novel.title.charAt(0)
+                          featuredNovels[0].title.charAt(0)
                         )}
                       </div>
-                      <div className="compact-book-title">{novel.title}</div>
-                      <div className="compact-book-author">{novel.author}</div>
-                      <div className="compact-book-hook">{novel.synopsis}</div>
+                      <div className="hero-book-info">
+                        <div className="hero-book-title">{featuredNovels[0].title}</div>
+                        <div className="hero-book-author">{featuredNovels[0].author}</div>
+                        <div
+                          className="hero-book-curator-note"
+                          style={{
+                            display: '-webkit-box',
+                            WebkitLineClamp: 3,
+                            WebkitBoxOrient: 'vertical',
+                            overflow: 'hidden',
+                          }}
+                        >
+                          {featuredNovels[0].synopsis || featuredStack.description || ''}
+                        </div>
+                      </div>
                     </Link>
-                  ))}
-                </div>
+                  </div>
 
-                {featuredStack.entries.length > 4 && (
-                  <div className="spotlight-more-link">
-                    <Link href={`/stack/${featuredStack.id}`}>
-                      <span>See all {featuredStack.entries.length} books</span>
-                      <span className="arr">→</span>
-                    </Link>
+                  <div className="spotlight-divider"></div>
+
+                  <div className="compact-books-label">Also in This Stack</div>
+                  <div className="compact-books">
+                    {featuredNovels.slice(1, 4).map((novel, i) => (
+                      <Link key={novel.id} href={`/novel/${novel.id}`} className="compact-book">
+                        <div
+                          className="compact-book-cover"
+                          style={{ background: novel.coverImage ? 'transparent' : SPINE_COLORS[(i + 1) % SPINE_COLORS.length] }}
+                        >
+                          {novel.coverImage ? (
+                            <CoverImage src={novel.coverImage} cover={novel.cover} alt={novel.title} sizes={COVER_SIZES.compact} className="compact-book-cover-img" />
+                          ) : (
+                            novel.title.charAt(0)
+                          )}
+                        </div>
+                        <div className="compact-book-title">{novel.title}</div>
+                        <div className="compact-book-author">{novel.author}</div>
+                        <div className="compact-book-hook">{novel.synopsis}</div>
+                      </Link>
+                    ))}
                   </div>
-                )}
-              </>
-            )}
+
+                  {featuredStack.novelCount > 4 && (
+                    <div className="spotlight-more-link">
+                      <Link href={`/stack/${featuredStack.id}`}>
+                        <span>See all {featuredStack.novelCount} books</span>
+                        <span className="arr">→</span>
+                      </Link>
+                    </div>
+                  )}
+                </>
+              )}
+            </div>
           </div>
-        </div>
-      </section>
+        </section>
+      )}
 
       {/* ═══ CONTEXT LINE ═══ */}
       <div className="context-line">Curated web fiction across Royal Road, SpaceBattles, Sufficient Velocity &amp; more</div>
@@ -226,10 +239,7 @@ export default function HomePage() {
         <div className="more-row no-sb" ref={scrollRef}>
           {pickStacks.map((stack, si) => {
             const stackHref = `/stack/${stack.id}`;
-            const stackNovels = stack.entries
-              .sort((a, b) => a.order - b.order)
-              .map((e) => novelsById.get(e.novelId))
-              .filter((n): n is Novel => Boolean(n));
+            const stackNovels = stack.novels;
             const curName = getCuratorName(stack.curatorId);
 
             return (
@@ -237,7 +247,7 @@ export default function HomePage() {
                 <Link href={stackHref} className="mc-name mc-name-link">
                   {stack.title}
                 </Link>
-                <div className="mc-meta">{stack.entries.length} books</div>
+                <div className="mc-meta">{stack.novelCount} books</div>
                 <div className="mc-note">{stack.curatorNote || stack.description}</div>
                 <div className="mc-books">
                   {stackNovels.slice(0, 3).map((novel, bi) => {
@@ -249,7 +259,7 @@ export default function HomePage() {
                           style={{ background: SPINE_COLORS[(si * 3 + bi) % SPINE_COLORS.length] }}
                         >
                           {novel.coverImage ? (
-                            <img src={novel.coverImage} alt={novel.title} className="spine-cover" style={{ width: 28, height: 38, borderRadius: 3 }} />
+                            <CoverImage src={novel.coverImage} cover={novel.cover} alt={novel.title} sizes={COVER_SIZES.spine} className="spine-cover" style={{ width: 28, height: 38, borderRadius: 3 }} />
                           ) : (
                             novel.title.charAt(0)
                           )}
@@ -272,7 +282,7 @@ export default function HomePage() {
                     by <strong>{curName}</strong>
                   </div>
                   <Link href={stackHref} className="mc-lnk">
-                    All {stack.entries.length} →
+                    All {stack.novelCount} →
                   </Link>
                 </div>
               </div>
@@ -281,6 +291,63 @@ export default function HomePage() {
         </div>
       </section>
 
+      {/* ═══ RISING ═══ */}
+      {risingStacks.length > 0 && (
+        <section className="more">
+          <div className="more-head">
+            <div>
+              <h2>{risingTitle(risingDays)}</h2>
+              <p>Stacks whose books gained the most {home?.rising.stat} over the last {risingDays === 1 ? 'day' : `${risingDays} days`}</p>
+            </div>
+          </div>
+          <div className="more-row no-sb">
+            {risingStacks.map((stack, si) => {
+              const stackHref = `/stack/${stack.id}`;
+              const stackNovels = stack.novels;
+
+              return (
+                <div key={stack.id} className="mc">
+                  <Link href={stackHref} className="mc-name mc-name-link">
+                    {stack.title}
+                  </Link>
+                  <div className="mc-meta">
+                    +{(stack.growth * 100).toFixed(1)}% followers · {stack.gained.toLocaleString()} new
+                  </div>
+                  <div className="mc-books">
+                    {stackNovels.slice(0, 3).map((novel, bi) => (
+                      <div key={novel.id} className="mc-book">
+                        <div
+                          className="spine spine-sm"
+                          style={{ background: SPINE_COLORS[(si * 3 + bi) % SPINE_COLORS.length] }}
+                        >
+                          {novel.coverImage ? (
+                            <CoverImage src={novel.coverImage} cover={novel.cover} alt={novel.title} sizes={COVER_SIZES.spine} className="spine-cover" style={{ width: 28, height: 38, borderRadius: 3 }} />
+                          ) : (
+                            novel.title.charAt(0)
+                          )}
+                        </div>
+                        <div className="mc-bi">
+                          <h5>{novel.title}</h5>
+                          <span>{novel.author}</span>
+                        </div>
+                      </div>
+                    ))}
+                  </div>
+                  <div className="mc-foot">
+                    <div className="mc-cur">
+                      by <strong>{getCuratorName(stack.curatorId)}</strong>
+                    </div>
+                    <Link href={stackHref} className="mc-lnk">
+                      All {stack.novelCount} →
+                    </Link>
+                  </div>
+                </div>
+              );
+            })}
+          </div>
+        </section>
+      )}
+
       {/* ═══ BROWSE BY THEME ═══ */}
       <section className="themes">
         <div className="s-label">Browse by Theme</div>
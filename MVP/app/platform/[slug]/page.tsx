@@ -1,6 +1,7 @@
 import Link from 'next/link';
 import { notFound } from 'next/navigation';
 import { PLATFORM_INFO, Platform } from '@/types/types';
+import SummaryList from '../../components/SummaryList';
 
 export async function generateStaticParams() {
   return Object.keys(PLATFORM_INFO).map((slug) => ({
@@ -22,7 +23,7 @@ export default async function PlatformPage({ params }: { params: Promise<{ slug:
   return (
     <div className="min-h-screen flex flex-col items-center justify-center">
       <h1 className="text-2xl font-bold mb-2">{title}</h1>
-      <p className="text-gray-500 mb-6">Curated picks coming soon.</p>
+      <SummaryList kind="platform" name={slug} emptyText="Curated picks coming soon." />
       <Link href="/" className="text-blue-500 hover:underline">
         ← Back to home
       </Link>
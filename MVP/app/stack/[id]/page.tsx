@@ -2,15 +2,16 @@
 
 import { use, useEffect, useRef, useState } from 'react';
 import Link from 'next/link';
-import stacksData from '@/src/data/stacks.json';
-import novelsData from '@/data/books.json';
 import curatorsData from '@/src/data/curators.json';
+import type { ResponsiveCover, StackDetailData } from '@/types/types';
 import Footer from '../../components/Footer';
+import CoverImage from '../../components/ui/CoverImage';
+import { loadStackDetail } from '../../lib/shards';
 import { formatTagLabel } from '../../lib/tagStyles';
 
 interface StackEntry {
   novelId: string;
-  curatorNote: string;
+  curatorNote?: string;
   order: number;
 }
 
@@ -19,7 +20,7 @@ interface StackItem {
   title: string;
   description: string;
   curatorId: string;
-  curatorNote: string;
+  curatorNote?: string;
   entries: StackEntry[];
   themes: string[];
   createdAt: string;
@@ -32,6 +33,7 @@ interface NovelItem {
   status: 'ongoing' | 'completed' | 'hiatus' | 'dropped';
   themes: string[];
   coverImage?: string;
+  cover?: ResponsiveCover;
   synopsis?: string;
   editorNoteEN?: string;
   editorNote?: string;
@@ -49,6 +51,9 @@ interface StackBookResolved {
   noteType: 'editor' | 'synopsis' | 'curator';
 }
 
+// 与 globals.css 中 .sd-book-spine 的宽度一致
+const SPINE_COVER_SIZES = '(max-width: 768px) 46px, 75px';
+
 const SPINE_COLORS = [
   'linear-gradient(135deg,#5B6CF7,#3A47C9)',
   'linear-gradient(135deg,#9B5CE5,#6B2FB8)',
@@ -110,16 +115,17 @@ function pickRelatedLetters(title: string) {
   return letters;
 }
 
-function BookCover({ seed, title, coverImage }: { seed: string; title: string; coverImage?: string }) {
+function BookCover({ seed, title, coverImage, cover }: { seed: string; title: string; coverImage?: string; cover?: ResponsiveCover }) {
   const [imageFailed, setImageFailed] = useState(false);
-  const showImage = Boolean(coverImage) && !imageFailed;
 
   return (
     <div className="sd-book-spine" style={{ background: spineGradient(seed) }}>
-      {showImage ? (
-        <img
+      {coverImage && !imageFailed ? (
+        <CoverImage
           src={coverImage}
+          cover={cover}
           alt={title}
+          sizes={SPINE_COVER_SIZES}
           className="sd-book-cover-img"
           onError={() => setImageFailed(true)}
         />
@@ -132,18 +138,25 @@ function BookCover({ seed, title, coverImage }: { seed: string; title: string; c
 
 export default function StackDetailPage({ params }: { params: Promise<{ id: string }> }) {
   const { id } = use(params);
-  const [showNoteModal, setShowNoteModal] = useState(false);
-  const [noteExpanded, setNoteExpanded] = useState(false);
-  const [noteCanExpand, setNoteCanExpand] = useState(false);
-  const [expandedBookNotes, setExpandedBookNotes] = useState<Record<string, boolean>>({});
-  const [expandableBookNotes, setExpandableBookNotes] = useState<Record<string, boolean>>({});
-  const noteTextRef = useRef<HTMLParagraphElement>(null);
-  const bookListRef = useRef<HTMLDivElement>(null);
+  // 按需加载这个书单的分片（书单、书籍、相关书单）；detail 为 null 表示没有这个书单
+  const [loaded, setLoaded] = useState<{ id: string; detail: StackDetailData | null } | null>(null);
 
-  const allStacks = stacksData.stacks as StackItem[];
-  const stack = allStacks.find((item) => item.id === id);
+  useEffect(() => {
+    let cancelled = false;
+    loadStackDetail(id)
+      .then((detail) => { if (!cancelled) setLoaded({ id, detail }); })
+      .catch((error) => {
+        console.error(error);
+        if (!cancelled) setLoaded({ id, detail: null });
+      });
+    return () => { cancelled = true; };
+  }, [id]);
 
-  if (!stack) {
+  if (!loaded || loaded.id !== id) {
+    return <div className="sd-bg" />;
+  }
+
+  if (!loaded.detail) {
     return (
       <div className="sd-bg">
         <main className="sd-shell sd-not-found">
@@ -155,15 +168,29 @@ export default function StackDetailPage({ params }: { params: Promise<{ id: stri
     );
   }
 
-  const allNovels = novelsData as NovelItem[];
+  return <StackDetail detail={loaded.detail} />;
+}
+
+function StackDetail({ detail }: { detail: StackDetailData }) {
+  const [showNoteModal, setShowNoteModal] = useState(false);
+  const [noteExpanded, setNoteExpanded] = useState(false);
+  const [noteCanExpand, setNoteCanExpand] = useState(false);
+  const [expandedBookNotes, setExpandedBookNotes] = useState<Record<string, boolean>>({});
+  const [expandableBookNotes, setExpandableBookNotes] = useState<Record<string, boolean>>({});
+  const noteTextRef = useRef<HTMLParagraphElement>(null);
+  const bookListRef = useRef<HTMLDivElement>(null);
+
+  const stack: StackItem = detail.stack;
+  const novelsById = new Map<string, NovelItem>(detail.novels.map((n) => [n.id, n]));
+
   const books = [...stack.entries]
     .sort((a, b) => a.order - b.order)
     .map((entry) => {
-      const novel = allNovels.find((item) => item.id === entry.novelId);
+      const novel = novelsById.get(entry.novelId);
       const novelEditorNote = novel?.editorNoteEN?.trim() || novel?.editorNote?.trim();
       const novelSynopsis = novel?.synopsis?.trim();
       const stackEntryNote = entry.curatorNote?.trim();
-      let curatorNote = stack.curatorNote;
+      let curatorNote = stack.curatorNote ?? '';
       let noteType: StackBookResolved['noteType'] = 'curator';
 
       if (novelEditorNote) {
@@ -185,7 +212,8 @@ export default function StackDetailPage({ params }: { params: Promise<{ id: stri
     });
 
   const curatorName = getCuratorName(stack.curatorId);
-  const relatedStacks = allStacks.filter((item) => item.id !== stack.id).slice(0, 3);
+  // 相关书单由 scripts/similarity.py 离线计算
+  const relatedStacks = detail.relatedStacks;
 
   useEffect(() => {
     const checkNoteOverflow = () => {
@@ -364,7 +392,7 @@ export default function StackDetailPage({ params }: { params: Promise<{ id: stri
               const status = toStatus(book.novel.status);
               return (
                 <Link key={book.novel.id} href={`/novel/${book.novel.id}`} className="sd-book-item">
-                  <BookCover seed={book.novel.id} title={book.novel.title} coverImage={book.novel.coverImage} />
+                  <BookCover seed={book.novel.id} title={book.novel.title} coverImage={book.novel.coverImage} cover={book.novel.cover} />
                   <div className="sd-book-body">
                     <div className="sd-book-title-row">
                       <h3>{book.novel.title}</h3>
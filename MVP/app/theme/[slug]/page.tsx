@@ -1,6 +1,7 @@
 import Link from 'next/link';
 import { notFound } from 'next/navigation';
 import { THEME_INFO, Theme } from '@/types/types';
+import SummaryList from '../../components/SummaryList';
 
 export async function generateStaticParams() {
   return Object.keys(THEME_INFO).map((slug) => ({
@@ -20,7 +21,7 @@ export default async function ThemePage({ params }: { params: Promise<{ slug: st
   return (
     <div className="min-h-screen flex flex-col items-center justify-center">
       <h1 className="text-2xl font-bold mb-2">{themeInfo.name}</h1>
-      <p className="text-gray-500 mb-6">Books and stacks with this theme coming soon.</p>
+      <SummaryList kind="theme" name={themeInfo.name} emptyText="Books and stacks with this theme coming soon." />
       <Link href="/" className="text-blue-500 hover:underline">
         ← Back to home
       </Link>
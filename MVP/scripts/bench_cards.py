@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+列表页卡片基准
+切分：scrape_rr_best50 原来的回退写法与 rr_listing.segment_cards 对比
+- 一致性：卡片直接放在 body 下（原写法能正确处理的结构）时两者结果相同；带 fiction-card 类时与按类查找相同；
+  卡片外有容器和侧栏（真实页面结构）时新写法每本书一张卡片，原写法只得到最外层容器
+- 性能：卡片数从 20 增加到数千时的耗时，新写法每张卡片耗时应保持不变
+字段：三个抓取脚本原来各自的 extract_book_info 与 rr_listing.extract_book_info 对比，
+各种卡片写法（标签链接、正文标签、无段落简介、多个状态词等）结果逐字段相同，并比较每张卡片的耗时
+
+用法：
+    python3 scripts/bench_cards.py [最大卡片数]
+"""
+
+import importlib
+import re
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from bench_pipeline import CARD as PIPELINE_CARD
+from bench_scrapers import CARD
+from rr_http import BASE_URL
+from rr_listing import RE_FICTION_HREF, extract_book_info, segment_cards
+
+# 原写法超过该卡片数时不再计时（立方级，太慢）
+LEGACY_LIMIT = 500
+
+SIDEBAR = """
+<div class="portlet"><h4>Popular this week</h4><ul>
+  <li><a href="/fiction/99001/side-one">Side One</a></li>
+  <li><a href="/fiction/99002/side-two">Side Two</a></li>
+  <li><a href="/fiction/1000/book-1000">Book 1000</a></li>
+</ul></div>
+"""
+
+
+def legacy_find(soup):
+    """scrape_rr_best50 原来的回退写法"""
+    book_elements = []
+    all_divs = soup.find_all('div')
+    for div in all_divs:
+        if div.find('h2'):
+            links = div.find_all('a', href=lambda x: x and '/fiction/' in str(x))
+            if links:
+                book_elements.append(div)
+                for sub_div in div.find_all('div'):
+                    if sub_div in all_divs:
+                        all_divs.remove(sub_div)
+    return book_elements
+
+
+def parse_number(text):
+    if not text:
+        return None
+    cleaned = re.sub(r'[^\d]', '', str(text))
+    return int(cleaned) if cleaned else None
+
+
+def legacy_extract(book_element, guess_tags=True):
+    """scrape_rr / scrape_completed_top50 原来的 extract_book_info（guess_tags=False 即 scrape_rr_best50 的版本）"""
+    try:
+        # 获取链接和标题 - 查找 h2 标签
+        title_elem = book_element.find('h2')
+        if not title_elem:
+            return None
+
+        title_link = title_elem.find('a')
+        if not title_link:
+            return None
+
+        link = title_link.get('href')
+        full_url = urljoin(BASE_URL, link) if link else None
+        title = title_link.get_text(strip=True)
+
+        # 封面图 - 查找 img 标签
+        cover_img = book_element.find('img')
+        cover_url = cover_img.get('src') if cover_img else None
+
+        # 从全文中提取信息
+        all_text = book_element.get_text()
+
+        # 状态 - COMPLETED, ONGOING, HIATUS, STUB
+        status = "Unknown"
+        for status_type in ["COMPLETED", "ONGOING", "HIATUS", "STUB"]:
+            if status_type in all_text:
+                status = status_type
+                break
+
+        # 提取标签 - 从链接中提取
+        tags = []
+        tag_links = book_element.find_all('a', href=lambda x: x and '/tags/' in str(x))
+        for tag_elem in tag_links:
+            tag_text = tag_elem.get_text(strip=True)
+            # 过滤掉状态标签（如 COMPLETED）
+            if tag_text and tag_text not in ["COMPLETED", "ONGOING", "HIATUS", "STUB", "Original", "Fan Fiction"]:
+                if tag_text not in tags:
+                    tags.append(tag_text)
+
+        # 如果没有找到标签，尝试从文本中提取
+        if not tags and guess_tags:
+            # 常见标签列表
+            common_tags = [
+                "Time Loop", "Adventure", "Fantasy", "Mystery", "Magic", "Comedy",
+                "Sci-fi", "Action", "Slice of Life", "Romance", "LitRPG",
+                "Reincarnation", "Portal Fantasy / Isekai", "Xianxia", "Urban Fantasy",
+                "Super Heroes", "Female Lead", "Male Lead", "Villainous Lead",
+                "Non-Human Lead", "Drama", "Horror", "High Fantasy", "Low Fantasy",
+                "Space Opera", "Cyberpunk", "Dungeon", "Strategy", "Progression",
+                "Virtual Reality", "GameLit", "Anti-Hero Lead", "Strong Lead"
+            ]
+            for tag in common_tags:
+                if tag in all_text:
+                    tags.append(tag)
+
+        # 使用正则表达式提取统计信息
+        # Followers
+        followers_match = re.search(r'([\d,]+)\s*Followers?', all_text)
+        followers = parse_number(followers_match.group(1)) if followers_match else None
+
+        # Pages
+        pages_match = re.search(r'([\d,]+)\s*Pages?', all_text)
+        pages = parse_number(pages_match.group(1)) if pages_match else None
+
+        # Views
+        views_match = re.search(r'([\d,]+)\s*Views?', all_text)
+        views = parse_number(views_match.group(1)) if views_match else None
+
+        # Chapters
+        chapters_match = re.search(r'([\d,]+)\s*Chapters?', all_text)
+        chapters = parse_number(chapters_match.group(1)) if chapters_match else None
+
+        # 简介 - 获取描述文本（通常是标题后的文本）
+        # 查找所有段落
+        paragraphs = book_element.find_all('p')
+        description = ""
+        for p in paragraphs:
+            text = p.get_text(strip=True)
+            if text and len(text) > 50:  # 只取较长的段落作为简介
+                description = text
+                break
+
+        # 如果没有找到段落，尝试其他方式
+        if not description:
+            # 获取整个文本并移除标题和统计信息
+            lines = all_text.split('\n')
+            desc_lines = []
+            for line in lines:
+                line = line.strip()
+                if line and len(line) > 30 and title not in line:
+                    if not any(x in line for x in ['Followers', 'Pages', 'Views', 'Chapters', 'COMPLETED', 'ONGOING']):
+                        desc_lines.append(line)
+            description = ' '.join(desc_lines[:3])  # 取前3行
+
+        return {
+            'title': title,
+            'author': None,  # 从详情页获取
+            'url': full_url,
+            'coverUrl': cover_url,
+            'status': status,
+            'chapters': chapters,
+            'pages': pages,
+            'views': views,
+            'followers': followers,
+            'words': None,  # 从详情页获取
+            'synopsis': description[:1000] if description else None,
+            'platformRating': None,  # 从详情页获取
+            'tags': ', '.join(tags[:10]) if tags else None  # 限制标签数量
+        }
+    except Exception as e:
+        return None
+
+
+# 各种写法的卡片（字段提取一致性检查用）
+VARIANT_CARDS = [
+    CARD.format(id=1, status='COMPLETED', followers=12345, rating=4.5, pages=800, views=1234567, chapters=120),
+    CARD.format(id=2, status='STUBBED', followers=1, rating=4.1, pages=1, views=1, chapters=1)
+        .replace('Followers', 'Follower').replace('Chapters', 'Chapter'),
+    CARD.replace('/fictions/search?tagsAdd=', '/tags/').format(id=3, status='HIATUS', followers=5, rating=3,
+                                                                   pages=9, views=7, chapters=2),
+    PIPELINE_CARD.format(id=4, followers=3, pages=4, views=5, chapters=6),
+    """<div class="fiction-list-item row"><h2><a href="/fiction/5/x">Five</a></h2>
+       <span>ONGOING</span><span>COMPLETED</span>
+       <a href="/tags/original">Original</a><a href="/tags/litrpg">LitRPG</a><a href="/tags/litrpg">LitRPG</a>
+       A line of synopsis that is long enough to be kept as description
+       1,234 Followers 99 Views
+       Another synopsis line about High Fantasy and Time Loop adventures
+       <!-- 12 Pages --></div>""",
+    """<div class="row"><h2><a href="https://www.royalroad.com/fiction/6/six">Six</a></h2>
+       <p>short</p><p>Mystery and Magic in Space Opera, a story about the Female Lead who becomes a Villainous Lead.</p>
+       <div>,, Pages 10Chapters 3 Views</div></div>""",
+    """<div class="row"><h2>No link</h2></div>""",
+    """<div class="row"><h3><a href="/fiction/8/eight">Eight</a></h3></div>""",
+]
+
+
+# 各抓取脚本原来的提取函数是否从正文猜标签
+SCRIPT_GUESS_TAGS = {
+    'scrape_rr': True,
+    'scrape_rr_best50': False,
+    'scrape_completed_top50': True,
+}
+
+
+def check_extract():
+    """各脚本现在实际使用的提取函数与该脚本原来的版本逐字段比较"""
+    cards = [BeautifulSoup(html, 'lxml').body.contents[0] for html in VARIANT_CARDS]
+    cards = [c if c.name else c.find_next_sibling() for c in cards]
+    ok = True
+    for script, guess in SCRIPT_GUESS_TAGS.items():
+        module = importlib.import_module(script)
+        extract = getattr(module, 'extract_card', module.extract_book_info)
+        for i, card in enumerate(cards):
+            old, new = legacy_extract(card, guess), extract(card)
+            if old != new:
+                print(f"❌ {script} 卡片 {i} 字段不同:\n   原: {old}\n   新: {new}")
+                ok = False
+    print(f"{'✅' if ok else '❌'} 字段提取一致性检查：{len(cards)} 种卡片写法 × {len(SCRIPT_GUESS_TAGS)} 个抓取脚本")
+    return ok
+
+
+def cards_html(count, css=''):
+    card = CARD.replace('class="fiction-list-item row"', f'class="fiction-list-item row{css}"')
+    return ''.join(card.format(id=1000 + i, status='ONGOING', followers=i, rating=4.5, pages=i, views=i, chapters=i)
+                   for i in range(count))
+
+
+def page(count, layout):
+    if layout == 'flat':
+        body = cards_html(count)
+    elif layout == 'fiction-card':
+        body = f"<div class='container'><div class='fiction-list'>{cards_html(count, ' fiction-card')}</div></div>"
+    else:
+        body = (f"<div class='page-container'><div class='row'><div class='col-md-8'><div class='fiction-list'>"
+                f"{cards_html(count)}</div></div><div class='col-md-4'>{SIDEBAR}</div></div></div>")
+    return f"<html><body>{body}</body></html>"
+
+
+def same(a, b):
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+
+
+def card_ids(cards):
+    ids = []
+    for card in cards:
+        link = card.find('h2').find('a')
+        ids.append(int(RE_FICTION_HREF.match(link['href']).group(1)))
+    return ids
+
+
+def check():
+    ok = True
+    soup = BeautifulSoup(page(20, 'flat'), 'lxml')
+    if not same(legacy_find(soup), segment_cards(soup)):
+        print("❌ 卡片直接在 body 下时与原写法结果不同")
+        ok = False
+    soup = BeautifulSoup(page(20, 'fiction-card'), 'lxml')
+    if not same(soup.find_all('div', class_='fiction-card'), segment_cards(soup)):
+        print("❌ 带 fiction-card 类时与按类查找结果不同")
+        ok = False
+    soup = BeautifulSoup(page(20, 'wrapped'), 'lxml')
+    ids = card_ids(segment_cards(soup))
+    if ids != list(range(1000, 1020)):
+        print(f"❌ 真实页面结构切分错误: {ids}")
+        ok = False
+    print(f"{'✅' if ok else '❌'} 一致性检查：flat 与原写法相同，fiction-card 与按类查找相同；"
+          f"真实结构下新写法 {len(ids)} 张卡片，原写法 {len(legacy_find(soup))} 张")
+    return ok
+
+
+def bench(func, soup, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(soup)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_extract(repeat=20):
+    soup = BeautifulSoup(page(20, 'fiction-card'), 'lxml')
+    cards = soup.find_all('div', class_='fiction-card')
+    print("=" * 64)
+    for label, func in (("原 extract_book_info", legacy_extract), ("rr_listing", extract_book_info)):
+        per_card = bench(lambda _: [func(c) for c in cards], None, repeat) / len(cards)
+        print(f"{label:<24} {per_card * 1e6:>8.1f}µs/卡片")
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    ok = check() & check_extract()
+    bench_extract()
+
+    print("=" * 64)
+    print(f"{'卡片数':>8} {'原写法':>12} {'新写法':>12} {'新写法/卡片':>14}")
+    print("=" * 64)
+    count = 20
+    while count <= limit:
+        soup = BeautifulSoup(page(count, 'flat'), 'lxml')
+        legacy = f"{bench(legacy_find, soup, 1) * 1000:>10.1f}ms" if count <= LEGACY_LIMIT else f"{'-':>12}"
+        new_s = bench(segment_cards, soup)
+        print(f"{count:>8} {legacy} {new_s * 1000:>10.1f}ms {new_s / count * 1e6:>12.1f}µs")
+        count *= 5 if count < 100 else 2
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+convert_books.py 转换基准与一致性检查
+逐行路径：df.iterrows() + 原来的 convert_to_novel(row)（副本保留在本文件中）
+整列路径：convert_frame(df)
+用 data/books.json 合成指定行数的表格（默认 5 万行，含空值、空标签、未知平台等边界情况），
+检查两条路径合并后输出的 books.json 字节完全一致。
+
+用法：
+    python3 scripts/bench_convert.py [行数]
+"""
+
+import copy
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from convert_books import PLATFORM_MAPPING, STATUS_MAPPING, THEME_MAPPING, convert_frame
+
+BOOKS_JSON = Path(__file__).parent.parent / 'data' / 'books.json'
+
+TAG_POOL = [
+    'Time Loop', 'Progression', 'LitRPG', 'Rational', 'Kingdom Building', 'Dungeon Core',
+    'Slice of Life', 'Sci-fi', 'Cultivation', 'Portal Fantasy / Isekai', 'Base-Builder',
+    'Fantasy', 'Adventure', 'Action', 'Comedy', 'Female Lead', 'Magic', 'Sci', 'core',
+    'COMPLETED', 'Worm', 'Quest', ' ', '',
+]
+
+
+def make_sheet(rows, seed=42):
+    """合成与策展表格同结构的 DataFrame"""
+    rng = random.Random(seed)
+    books = json.loads(BOOKS_JSON.read_text(encoding='utf-8'))
+    platforms = list(PLATFORM_MAPPING) + ['Amazon', None]
+    statuses = list(STATUS_MAPPING) + ['STUB', None]
+
+    records = []
+    for i in range(rows):
+        book = books[i % len(books)]
+        tags = ', '.join(rng.sample(TAG_POOL, rng.randint(0, 6)))
+        records.append({
+            # 前一部分 ID 与现有书籍重合，走更新分支；也混入数字 ID
+            'id': book['title'] if i < len(books) else (i if i % 97 == 0 else f"{book['title']} {i}"),
+            'title': book['title'] if i % 50 else None,
+            'author': book['author'],
+            'url': book['links'][0]['url'],
+            'platform': rng.choice(platforms),
+            'status': rng.choice(statuses),
+            'tags': tags if i % 13 else (None if i % 2 else ''),
+            'curator_note_en': None if i % 3 else (f"Note {i}" if i % 5 else 3.5),
+            'cover_url': None if i % 4 == 0 else f"/covers/{i}.jpg",
+        })
+    df = pd.DataFrame(records)
+    df.loc[df.index % 11 == 0, 'tags'] = np.nan
+    return df
+
+
+def legacy_parse_tags(tags_str):
+    """convert_books.py 原来的 parse_tags：逐个标签 × THEME_MAPPING 双重循环"""
+    if pd.isna(tags_str) or not tags_str:
+        return []
+
+    themes = []
+    tags = str(tags_str).split(',')
+
+    for tag in tags:
+        tag_lower = tag.strip().lower()
+        # 查找匹配的主题
+        for key, value in THEME_MAPPING.items():
+            if key in tag_lower or tag_lower in key:
+                if value not in themes:
+                    themes.append(value)
+
+    return themes
+
+
+def legacy_convert_row(row):
+    """convert_books.py 原来的 convert_to_novel：逐行转换为 Novel 格式"""
+    platform_raw = row['platform']
+    platform = PLATFORM_MAPPING.get(platform_raw, 'personal-site')
+
+    status_raw = row['status']
+    status = STATUS_MAPPING.get(status_raw, 'ongoing')
+
+    # 解析标签为主题
+    themes = legacy_parse_tags(row.get('tags', ''))
+
+    # 获取英文编辑语
+    curator_note = str(row['curator_note_en']) if pd.notna(row.get('curator_note_en')) else None
+
+    # 直接使用 Excel 中的 cover_url
+    cover_image = str(row['cover_url']) if pd.notna(row.get('cover_url')) else None
+
+    # 构建 Novel 对象
+    novel = {
+        "id": str(row['id']).lower().replace(' ', '-'),
+        "title": str(row['title']),
+        "author": str(row['author']),
+        "synopsis": "",  # Excel 中没有此字段，留空
+        "themes": themes,
+        "links": [
+            {
+                "platform": platform,
+                "url": str(row['url']),
+                "isCanonical": True
+            }
+        ],
+        "status": status,
+        "stackCount": 0,
+        "savedCount": 0
+    }
+
+    # 只添加有值的字段
+    if cover_image:
+        novel["coverImage"] = cover_image
+    if curator_note:
+        novel["curatorNote"] = curator_note
+
+    return novel
+
+
+def legacy_merge(existing_books, excel_novels):
+    """convert_books.py 原来的合并逻辑，返回 (按 ID 排序的书籍列表, 新增数, 更新数)；两条路径的结果都用它合并后比较"""
+    updated_books = {}
+    new_count = 0
+    updated_count = 0
+
+    for excel_novel in excel_novels:
+        book_id = excel_novel['id']
+
+        if book_id in existing_books:
+            # 更新现有书籍：只更新新字段，保留原有字段
+            existing_book = existing_books[book_id]
+
+            # 更新 coverImage（如果有）
+            if 'coverImage' in excel_novel:
+                existing_book['coverImage'] = excel_novel['coverImage']
+
+            # 更新 curatorNote（如果有）
+            if 'curatorNote' in excel_novel:
+                existing_book['curatorNote'] = excel_novel['curatorNote']
+
+            updated_books[book_id] = existing_book
+            updated_count += 1
+        else:
+            # 新书籍：添加完整的 Excel 数据
+            updated_books[book_id] = excel_novel
+            new_count += 1
+
+    # 添加 Excel 里没有的现有书籍
+    for book_id, book in existing_books.items():
+        if book_id not in updated_books:
+            updated_books[book_id] = book
+
+    # 转换为列表并排序
+    novels = list(updated_books.values())
+    novels.sort(key=lambda x: x['id'])
+    return novels, new_count, updated_count
+
+
+def legacy_convert(df):
+    return [legacy_convert_row(row) for _, row in df.iterrows()]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    df = make_sheet(rows)
+    existing = {book['id']: book for book in json.loads(BOOKS_JSON.read_text(encoding='utf-8'))}
+
+    legacy_ms, legacy = timed(legacy_convert, df)
+    frame_ms, converted = timed(convert_frame, df)
+
+    legacy_out = json.dumps(legacy_merge(copy.deepcopy(existing), legacy)[0], ensure_ascii=False, indent=2)
+    frame_out = json.dumps(legacy_merge(copy.deepcopy(existing), converted)[0], ensure_ascii=False, indent=2)
+    same = legacy_out.encode('utf-8') == frame_out.encode('utf-8')
+
+    print("=" * 64)
+    print(f"⏱ convert_books 转换基准（{rows:,} 行）")
+    print("=" * 64)
+    print(f"逐行 iterrows:   {legacy_ms:>10.1f} ms")
+    print(f"整列 convert_frame: {frame_ms:>7.1f} ms   提速 {legacy_ms / frame_ms:.1f}x")
+    print("✅ books.json 输出字节一致" if same else "❌ books.json 输出不一致")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
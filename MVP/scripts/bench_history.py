@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+历史快照基准：rr_history 差值存储与直接存绝对值对比
+模拟若干本书每天抓取一次（关注、浏览缓慢增长，评分偶尔变化），比较：
+- 文件大小（VACUUM 后）
+- 每次抓取追加的耗时
+- 一本书一段时间的查询、全部书最近 7 天增长的查询耗时
+
+用法：
+    python3 scripts/bench_history.py [书数] [天数]
+"""
+
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rr_history import COUNTERS, DAY, growth, record_snapshot, series
+
+START = 1_700_000_000
+
+
+def simulate(books, days, seed=1):
+    """每天一次抓取的书籍字典列表"""
+    rng = random.Random(seed)
+    state = {
+        i: {'followers': rng.randint(100, 50000), 'views': rng.randint(10_000, 20_000_000),
+            'pages': rng.randint(50, 3000), 'chapters': rng.randint(10, 600), 'words': rng.randint(50_000, 3_000_000),
+            'platformRating': round(rng.uniform(3.5, 4.9), 2)}
+        for i in range(1, books + 1)
+    }
+    for day in range(days):
+        snapshot = []
+        for i, book in state.items():
+            book['followers'] += rng.randint(-2, book['followers'] // 500 + 3)
+            book['views'] += rng.randint(0, book['views'] // 200 + 50)
+            if rng.random() < 0.3:
+                book['chapters'] += 1
+                book['pages'] += rng.randint(5, 15)
+                book['words'] += rng.randint(2000, 5000)
+            if rng.random() < 0.05:
+                book['platformRating'] = round(min(5, max(1, book['platformRating'] + rng.uniform(-0.02, 0.02))), 2)
+            snapshot.append({'url': f"https://www.royalroad.com/fiction/{i}/book-{i}", **book})
+        yield START + day * DAY, snapshot
+
+
+def absolute_store(path, snapshots):
+    """对照：同样的聚簇主键，每行存绝对值"""
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        f"CREATE TABLE observations (fictionId INTEGER NOT NULL, ts INTEGER NOT NULL, rating REAL, "
+        f"{', '.join(f'{c} INTEGER' for c in COUNTERS)}, PRIMARY KEY (fictionId, ts)) WITHOUT ROWID"
+    )
+    elapsed = 0.0
+    for ts, snapshot in snapshots:
+        start = time.perf_counter()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO observations VALUES (?, ?, ?, {', '.join('?' for _ in COUNTERS)})",
+                ((int(b['url'].split('/')[-2]), ts, b['platformRating'], *(b[c] for c in COUNTERS)) for b in snapshot)
+            )
+        elapsed += time.perf_counter() - start
+    conn.execute("VACUUM")
+    conn.close()
+    return elapsed
+
+
+def vacuumed_size(path):
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("VACUUM")
+    conn.close()
+    return Path(path).stat().st_size
+
+
+def timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    books = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 180
+    rows = books * days
+    end = START + (days - 1) * DAY
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = Path(tmp) / 'absolute.sqlite'
+        history = Path(tmp) / 'history.sqlite'
+
+        plain_write = absolute_store(plain, simulate(books, days))
+        history_write = 0.0
+        followers = {}     # 窗口开始、结束时模拟的关注数（一致性检查用）
+        for ts, snapshot in simulate(books, days):
+            start = time.perf_counter()
+            record_snapshot(snapshot, ts=ts, path=history)
+            history_write += time.perf_counter() - start
+            if ts in (end - 7 * DAY, end):
+                followers[ts] = {int(b['url'].split('/')[-2]): b['followers'] for b in snapshot}
+
+        plain_size, history_size = vacuumed_size(plain), vacuumed_size(history)
+
+        # 一致性：重建的序列和增长与模拟值相同
+        df = series(7, path=history)
+        ok = len(df) == days and int(df['followers'].iloc[-1]) == followers[end][7]
+        changes = growth('followers', days=7, now=end, path=history)
+        ok &= len(changes) == books and all(
+            row.before == followers[end - 7 * DAY][row.fictionId] and row.after == followers[end][row.fictionId]
+            for row in changes.itertuples()
+        )
+
+        series_ms, _ = timed(lambda: series(books // 2, START + (days - 30) * DAY, path=history))
+        growth_ms, _ = timed(lambda: growth('followers', days=7, now=end, path=history))
+        conn = sqlite3.connect(str(plain))
+        plain_series_ms, _ = timed(lambda: conn.execute(
+            "SELECT * FROM observations WHERE fictionId = ? AND ts >= ?", (books // 2, START + (days - 30) * DAY)
+        ).fetchall())
+        conn.close()
+
+    print("=" * 72)
+    print(f"⏱ 历史快照：{books} 本书 × {days} 天 = {rows} 条观测")
+    print("=" * 72)
+    print(f"{'':<20}{'文件大小':>12}{'字节/条':>10}{'追加/次抓取':>14}")
+    print(f"{'绝对值':<20}{plain_size / 1e6:>10.1f}MB{plain_size / rows:>10.1f}{plain_write / days * 1000:>12.1f}ms")
+    print(f"{'rr_history 差值':<17}{history_size / 1e6:>10.1f}MB{history_size / rows:>10.1f}"
+          f"{history_write / days * 1000:>12.1f}ms")
+    print(f"压缩比: {plain_size / history_size:.2f}×（追加含读 latest、算差值、写 latest）")
+    print(f"一本书最近 30 天: {series_ms:.2f}ms（直接查绝对值表 {plain_series_ms:.2f}ms，不含 DataFrame）")
+    print(f"全部书最近 7 天关注增长: {growth_ms:.1f}ms")
+    print(f"{'✅' if ok else '❌'} 一致性检查（重建的值与模拟值相同）")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+封面匹配基准：map_images.py 原来的逐本扫描与文件名索引对比
+用 books.json 的标题词随机生成指定数量（默认 5000）的书和封面文件名，
+部分文件名带系列前缀（worm-、wildbow-2-）或只取标题前两个词，统计耗时和正确率。
+
+用法：
+    python3 scripts/bench_map_images.py [本数]
+"""
+
+import random
+import sys
+import time
+
+from build_shards import Catalog
+from map_images import CoverIndex, match_covers
+from search_index import tokenize
+
+SEED = 42
+PREFIXES = ['', '', '', 'worm-', 'wildbow-{n}-', 'series-{n}-']
+
+
+def make_dataset(count):
+    rng = random.Random(SEED)
+    vocab = sorted({t for n in Catalog.load().novels for t in tokenize(n['title']) if len(t) > 3 and not t.isdigit()})
+    books, files, truth = [], [], {}
+    while len(books) < count:
+        title = ' '.join(rng.sample(vocab, rng.randint(2, 4)))
+        book_id = '-'.join(tokenize(title))
+        if book_id in truth:
+            continue
+        slug = book_id
+        if rng.random() < 0.1:
+            # 文件名只取主标题
+            slug = '-'.join(book_id.split('-')[:2])
+        name = rng.choice(PREFIXES).format(n=rng.randint(1, 9)) + slug + '.png'
+        books.append((book_id, title))
+        files.append(name)
+        truth[book_id] = name
+    return books, files, truth
+
+
+def legacy_match(books, files):
+    """map_images.py 原来的写法"""
+    mapping = {}
+    for book_id, title in books:
+        title = title.lower()
+        matched = None
+        if f"{book_id}.png" in files:
+            matched = f"{book_id}.png"
+        if not matched:
+            for img in files:
+                img_name = img.lower().replace('.png', '')
+                img_normalized = img_name.replace('-2-', '-').replace('-3-', '-').replace('-1-', '-')
+                if book_id in img_name or img_normalized == book_id or img_name in book_id:
+                    matched = img
+                    break
+        if not matched:
+            title_words = title.split()
+            for img in files:
+                img_name = img.lower().replace('.png', '')
+                if title_words and title_words[0] in img_name and len(title_words[0]) > 3:
+                    matched = img
+                    break
+        mapping[book_id] = matched
+    return mapping
+
+
+def accuracy(mapping, truth):
+    return sum(1 for k, v in mapping.items() if v == truth[k]) / len(truth)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    books, files, truth = make_dataset(count)
+
+    start = time.perf_counter()
+    legacy = legacy_match(books, files)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = match_covers(books, CoverIndex(files))
+    index_s = time.perf_counter() - start
+
+    print("=" * 56)
+    print(f"⏱ 封面匹配基准（{count:,} 本书 / {len(files):,} 张封面）")
+    print("=" * 56)
+    print(f"{'方法':<12} {'耗时':>10} {'正确率':>10}")
+    print(f"{'逐本扫描':<12} {legacy_s:>8.2f} s {accuracy(legacy, truth):>9.1%}")
+    print(f"{'文件名索引':<12} {index_s:>8.2f} s {accuracy(result.mapping, truth):>9.1%}")
+    print(f"   有歧义 {len(result.ambiguous)}，最佳图片被占用 {len(result.displaced)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
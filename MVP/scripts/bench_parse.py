@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+详情页解析基准与回归检查
+旧路径：BeautifulSoup(html.parser) + 逐项 find / 全文正则（原 scrape_single_book.scrape_book 的做法）
+新路径：rr_parse.parse_fiction_page（lxml + 预编译 XPath，一次解析）
+
+回归检查的期望值不由解析器生成：
+- VERIFIED 中的数值、状态和评分是对照样例页面源码手工读出的
+- fixtures/expected.json 手工维护（新增样例页面时逐项核对后再加入），每次检查前先与 VERIFIED 核对
+
+用法：
+    python3 scripts/bench_parse.py [重复次数]     # 回归检查 + 性能对比
+"""
+
+import json
+import re
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from rr_parse import parse_fiction_page
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+EXPECTED_PATH = FIXTURES_DIR / 'expected.json'
+
+# 对照页面源码手工读出的值（统计表、章节表 data-chapters、状态标签；
+# 评分取 books:rating:value，页面没有该 meta 时取 JSON-LD 的 ratingValue，再没有时取 Overall Score 的 data-content）
+VERIFIED = {
+    'fiction_15193.html': {'fiction_id': 15193, 'status': 'ONGOING', 'rating': 4.62, 'chapters': 612,
+                           'pages': 31420, 'words': 12450000, 'views': 48213877, 'followers': 28455},
+    'fiction_21220.html': {'fiction_id': 21220, 'status': 'COMPLETED', 'rating': 4.77, 'chapters': 109,
+                           'pages': 2356, 'words': 589000, 'views': 19391538, 'followers': 23104},
+    'fiction_26294.html': {'fiction_id': 26294, 'status': 'HIATUS', 'rating': 4.51, 'chapters': 320,
+                           'pages': 12210, 'words': 3500000, 'views': 27004518, 'followers': 17220},
+    # 没有 rating meta，评分只在 JSON-LD 中
+    'fiction_50001.html': {'fiction_id': 50001, 'status': 'STUBBED', 'rating': 4.69, 'chapters': 109,
+                           'pages': 2356, 'words': 589000, 'views': 19391538, 'followers': 23104},
+    # 没有 meta 和 JSON-LD，统计写成 "23,104 Followers"，标签链接是 /tags/...；
+    # aria-label 写的是 4.77，显示的分数 data-content 是 4.31
+    'fiction_50002.html': {'fiction_id': 50002, 'status': 'COMPLETED', 'rating': 4.31, 'chapters': 109,
+                           'pages': 2356, 'words': 589000, 'views': 19391538, 'followers': 23104},
+}
+
+
+def legacy_parse(content):
+    """旧版解析逻辑，仅用于对比"""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    title_elem = soup.find('h1', class_='font-white') or soup.find('h1')
+    title = title_elem.get_text(strip=True) if title_elem else None
+
+    author_link = soup.find('a', href=lambda x: x and '/profile/' in str(x))
+    author = author_link.get_text(strip=True) if author_link else None
+
+    status = None
+    all_text = soup.get_text()
+    for status_type in ["COMPLETED", "ONGOING", "HIATUS", "STUB", "STUBBED"]:
+        if status_type in all_text:
+            status = status_type
+            break
+
+    rating = None
+    meta_rating = soup.find('meta', property='books:rating:value')
+    if meta_rating and meta_rating.get('content'):
+        rating = float(meta_rating['content'])
+    if not rating:
+        json_ld = soup.find('script', type='application/ld+json')
+        if json_ld:
+            data = json.loads(json_ld.string)
+            rating = float(data['aggregateRating']['ratingValue'])
+    if not rating:
+        match = re.search(r'books:rating:value"\s+content="(\d+\.\d+)"', str(soup))
+        if match:
+            rating = float(match.group(1))
+
+    words = None
+    stats_section = soup.find('div', class_='fiction-stats')
+    if stats_section:
+        words_match = re.search(r'([\d,]+)\s*Words?', stats_section.get_text(), re.IGNORECASE)
+        if words_match:
+            words = int(words_match.group(1).replace(',', ''))
+
+    views = None
+    followers = None
+    for elem in soup.find_all(['div', 'span', 'p']):
+        text = elem.get_text(strip=True)
+        if not views:
+            views_match = re.search(r'([\d,]+)\s*Views?', text, re.IGNORECASE)
+            if views_match:
+                views = int(views_match.group(1).replace(',', ''))
+        if not followers:
+            followers_match = re.search(r'([\d,]+)\s*Followers?', text, re.IGNORECASE)
+            if followers_match:
+                followers = int(followers_match.group(1).replace(',', ''))
+
+    synopsis_elem = soup.find('div', class_='description')
+    synopsis = synopsis_elem.get_text(strip=True)[:1000] if synopsis_elem else None
+
+    tags = [a.get_text(strip=True) for a in soup.find_all('a', href=lambda x: x and '/tags/' in str(x))]
+
+    return {
+        'title': title, 'author': author, 'status': status, 'platformRating': rating,
+        'words': words, 'views': views, 'followers': followers, 'synopsis': synopsis, 'tags': tags
+    }
+
+
+def bench(func, pages, repeat):
+    """返回每页平均耗时（毫秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in pages:
+            func(content)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+
+def check(files, pages):
+    """先核对 expected.json 与 VERIFIED，再把解析结果与 expected.json 逐字段比对，返回不一致的数量"""
+    expected = json.loads(EXPECTED_PATH.read_text(encoding='utf-8'))
+    failures = 0
+    for name, values in VERIFIED.items():
+        for key, value in values.items():
+            if expected.get(name, {}).get(key) != value:
+                print(f"❌ expected.json {name} {key}: 手工核对为 {value!r}，文件中为 {expected.get(name, {}).get(key)!r}")
+                failures += 1
+    for f, content in zip(files, pages):
+        if f.name not in VERIFIED:
+            print(f"⚠️ {f.name}: VERIFIED 中没有手工核对的值")
+            failures += 1
+        actual = asdict(parse_fiction_page(content))
+        want = expected.get(f.name)
+        if want is None:
+            print(f"⚠️ {f.name}: expected.json 中没有记录")
+            failures += 1
+            continue
+        for key in sorted(set(want) | set(actual)):
+            if want.get(key) != actual.get(key):
+                print(f"❌ {f.name} {key}: 期望 {want.get(key)!r}，实际 {actual.get(key)!r}")
+                failures += 1
+    return failures
+
+
+def main():
+    files = sorted(FIXTURES_DIR.glob('fiction_*.html'))
+    pages = [f.read_bytes() for f in files]
+    if not pages:
+        print(f"❌ 未找到样例页面: {FIXTURES_DIR}")
+        return 1
+
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 72)
+    print(f"🔍 回归检查（{len(pages)} 个样例页面）")
+    print("=" * 72)
+    failures = check(files, pages)
+    print("✅ 全部字段一致" if not failures else f"❌ {failures} 处不一致")
+
+    print("\n" + "=" * 72)
+    print(f"⏱ 详情页解析基准（重复 {repeat} 次）")
+    print("=" * 72)
+
+    for f, content in zip(files, pages):
+        legacy_ms = bench(legacy_parse, [content], repeat)
+        new_ms = bench(parse_fiction_page, [content], repeat)
+        print(f"{f.name:<24} {len(content) / 1024:>7.1f} KB  "
+              f"旧: {legacy_ms:>8.2f} ms  新: {new_ms:>7.2f} ms  提速 {legacy_ms / new_ms:>5.1f}x")
+
+    legacy_ms = bench(legacy_parse, pages, repeat)
+    new_ms = bench(parse_fiction_page, pages, repeat)
+    print("-" * 72)
+    print(f"{'平均':<24} {'':>10}  旧: {legacy_ms:>8.2f} ms  新: {new_ms:>7.2f} ms  提速 {legacy_ms / new_ms:>5.1f}x")
+    print(f"📈 吞吐量: 旧 {1000 / legacy_ms:,.1f} 页/秒，新 {1000 / new_ms:,.1f} 页/秒")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
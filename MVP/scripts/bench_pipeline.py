@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+抓取流水线基准：全部页面来自响应缓存（离线），比较在事件循环里解析与解析进程池
+生成指定页数（默认 50 页 × 20 本）的列表页，详情页轮流使用 fixtures 中的真实页面，
+写入临时缓存后用 AsyncFetcher.scrape_list 跑一遍完整刷新，检查各方式结果一致。
+
+用法：
+    python3 scripts/bench_pipeline.py [列表页数] [--workers 1 2 4]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rr_async import AsyncFetcher, ParseStage
+from rr_cache import ResponseCache
+from rr_http import BASE_URL
+from rr_parse import parse_book_details
+from scrape_rr import extract_book_info, find_book_elements
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+BOOKS_PER_PAGE = 20
+
+CARD = """
+<div class="fiction-list-item row fiction-card">
+  <figure><img src="https://www.royalroadcdn.com/public/covers-large/{id}.jpg"></figure>
+  <div class="col">
+    <h2 class="fiction-title"><a href="/fiction/{id}/book-{id}">Book {id}</a></h2>
+    <span class="label">ONGOING</span>
+    <a class="fiction-tag" href="/fictions/search?tags=fantasy">Fantasy</a>
+    <a class="fiction-tag" href="/fictions/search?tags=progression">Progression</a>
+    <div class="stats">
+      <span>{followers:,} Followers</span><span>{pages:,} Pages</span>
+      <span>{views:,} Views</span><span>{chapters} Chapters</span>
+    </div>
+    <p>Synopsis of book {id}. A long enough paragraph to be taken as the description of the story.</p>
+  </div>
+</div>
+"""
+
+
+def list_url(page):
+    return f"{BASE_URL}/fictions/best-rated?page={page}"
+
+
+def list_page(page):
+    ids = range(page * 1000, page * 1000 + BOOKS_PER_PAGE)
+    cards = ''.join(CARD.format(id=i, followers=i * 3, pages=i % 900, views=i * 40, chapters=i % 300) for i in ids)
+    return f"<html><body><div class='fiction-list'>{cards}</div></body></html>".encode('utf-8')
+
+
+def fill_cache(cache, pages):
+    details = [p.read_bytes() for p in sorted(FIXTURES_DIR.glob('*.html'))]
+    for page in range(1, pages + 1):
+        cache.put(list_url(page), list_page(page))
+        for n, i in enumerate(range(page * 1000, page * 1000 + BOOKS_PER_PAGE)):
+            cache.put(f"{BASE_URL}/fiction/{i}/book-{i}", details[(page + n) % len(details)])
+
+
+async def refresh(cache, pages, workers):
+    urls = [list_url(page) for page in range(1, pages + 1)]
+    async with AsyncFetcher(concurrency=16, cache=cache) as fetcher:
+        if not workers:
+            return await fetcher.scrape_list(urls, find_book_elements, extract_book_info, parse_book_details)
+        async with ParseStage(workers) as parser:
+            return await fetcher.scrape_list(urls, find_book_elements, extract_book_info, parse_book_details,
+                                             parser=parser)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取流水线基准")
+    parser.add_argument('pages', nargs='?', type=int, default=50, help="列表页数")
+    parser.add_argument('--workers', nargs='+', type=int, help="解析进程数（默认 1 和 CPU 核数）")
+    args = parser.parse_args()
+    workers = args.workers or sorted({1, os.cpu_count() or 1})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(Path(tmp) / 'responses.sqlite', offline=True)
+        fill_cache(cache, args.pages)
+        total = args.pages * (BOOKS_PER_PAGE + 1)
+
+        print("=" * 60)
+        print(f"⏱ 流水线基准（{args.pages} 个列表页，共 {total:,} 个页面，CPU {os.cpu_count()} 核）")
+        print("=" * 60)
+
+        baseline = None
+        for count in [0] + workers:
+            start = time.perf_counter()
+            # 逐本进度输出不计入
+            with contextlib.redirect_stdout(io.StringIO()):
+                books = asyncio.run(refresh(cache, args.pages, count))
+            elapsed = time.perf_counter() - start
+            label = "事件循环内解析" if not count else f"解析进程 × {count}"
+            print(f"{label:<16} {elapsed:>7.2f} s  {total / elapsed:>7.1f} 页/秒  {len(books)} 本")
+            if baseline is None:
+                baseline = books
+            elif books != baseline:
+                print("❌ 结果与事件循环内解析不一致")
+                return 1
+        cache.close()
+    print("✅ 各方式结果一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
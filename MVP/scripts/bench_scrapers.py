@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+抓取脚本端到端基准：不访问 royalroad.com，由本地替身服务器提供页面
+- /fictions/best-rated?page=N：fixtures/best-rated-N.html（录制的列表页）存在时直接返回，否则按真实结构生成 20 本
+- /fiction/<id>[/slug]：轮流返回 fixtures 中录制的详情页
+- 可设置延迟、抖动，以及按比例注入 503 和带 Retry-After 的 429
+
+scripts 目录复制到临时目录后逐个场景在子进程中运行（数据库、缓存、进度日志都在临时目录，每个场景从空状态开始），
+报告墙钟时间、请求数、每秒请求数、CPU 时间和峰值 RSS。--json 保存结果，--compare 与之前的结果对比，
+变慢超过 --tolerance 时返回 1，可用于 CI 回归检查。
+
+用法：
+    python3 scripts/bench_scrapers.py                                  # 全部场景
+    python3 scripts/bench_scrapers.py scrape_rr fetch_ratings          # 指定场景
+    python3 scripts/bench_scrapers.py --latency 0.1 --error-rate 0.02 --throttle-rate 0.01
+    python3 scripts/bench_scrapers.py --json baseline.json
+    python3 scripts/bench_scrapers.py --compare baseline.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+SCRIPTS_DIR = Path(__file__).parent
+FIXTURES_DIR = SCRIPTS_DIR / 'fixtures'
+BOOKS_PER_PAGE = 20
+LIST_PAGES = 15       # scrape_completed_top50 最多翻 15 页
+SEED_PAGES = 8        # 评分更新脚本的数据库取前 8 页的书
+RATE_SCALE = 1000     # 限速器速率放大倍数，本地服务器不需要礼貌限速
+RESULT_FILE = 'bench_result.json'
+
+CARD = """
+<div class="fiction-list-item row">
+  <figure><a href="/fiction/{id}"><img src="https://www.royalroadcdn.com/public/covers-large/{id}-book-{id}.jpg" alt="Book {id}"></a></figure>
+  <div class="col-sm-10 col-xs-8">
+    <h2 class="fiction-title"><a href="/fiction/{id}/book-{id}" class="font-red-sunglo bold">Book {id}</a></h2>
+    <div class="margin-bottom-10">
+      <span class="label label-default label-sm bg-blue-hoki">{status}</span>
+      <span class="tags">
+        <a class="label label-default label-sm bg-blue-dark fiction-tag" href="/fictions/search?tagsAdd=fantasy">Fantasy</a>
+        <a class="label label-default label-sm bg-blue-dark fiction-tag" href="/fictions/search?tagsAdd=progression">Progression</a>
+      </span>
+    </div>
+    <div class="row stats">
+      <div class="col-sm-6"><span>{followers:,} Followers</span></div>
+      <div class="col-sm-6"><span>Rating: {rating}</span></div>
+      <div class="col-sm-6"><span>{pages:,} Pages</span></div>
+      <div class="col-sm-6"><span>{views:,} Views</span></div>
+      <div class="col-sm-6"><span>{chapters} Chapters</span></div>
+    </div>
+    <div class="hidden-content"><p>Synopsis of book {id}. A long enough paragraph to be taken as the description of the story.</p></div>
+  </div>
+</div>
+"""
+
+RE_FICTION_PATH = re.compile(r'^/fiction/(\d+)(?:/[^/]*)?/?$')
+
+
+def page_ids(page):
+    return range(page * 1000, page * 1000 + BOOKS_PER_PAGE)
+
+
+def list_page(page, pages=LIST_PAGES):
+    """生成列表页；每三本有一本已完结，超出页数时返回空列表"""
+    cards = '' if page > pages else ''.join(
+        CARD.format(id=i, status='COMPLETED' if i % 3 == 0 else 'ONGOING', followers=i * 3, rating=4.5,
+                    pages=i % 900, views=i * 40, chapters=i % 300)
+        for i in page_ids(page)
+    )
+    return f"<html><body><div class='fiction-list'>{cards}</div></body></html>".encode('utf-8')
+
+
+def seed_books(pages=SEED_PAGES, base_url=''):
+    """评分更新脚本的初始数据：前 pages 页的书，尚无评分"""
+    return [
+        {'title': f"Book {i}", 'author': f"Author {i}", 'url': f"{base_url}/fiction/{i}/book-{i}",
+         'coverUrl': None, 'platformRating': None, 'status': 'ONGOING', 'chapters': i % 300, 'pages': i % 900,
+         'words': None, 'views': i * 40, 'followers': i * 3, 'synopsis': f"Synopsis of book {i}.", 'tags': 'Fantasy'}
+        for page in range(1, pages + 1) for i in page_ids(page)
+    ]
+
+
+class StandIn:
+    """替身服务器的页面和故障注入设置，以及按状态码统计的请求数"""
+
+    def __init__(self, latency=0.02, jitter=0.01, error_rate=0.0, throttle_rate=0.0, retry_after=1,
+                 pages=LIST_PAGES, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.pages = pages
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.details = [p.read_bytes() for p in sorted(FIXTURES_DIR.glob('fiction_*.html'))]
+        self.lists = {}
+        for path in FIXTURES_DIR.glob('best-rated-*.html'):
+            self.lists[int(path.stem.rsplit('-', 1)[1])] = path.read_bytes()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counts = {}
+
+    def draw(self):
+        """本次请求的延迟和注入的状态码（None 为正常）"""
+        with self.lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            roll = self.random.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 503
+        return delay, None
+
+    def page(self, url):
+        """(状态码, 正文)"""
+        parts = urlsplit(url)
+        if parts.path.rstrip('/') == '/fictions/best-rated':
+            page = int(parse_qs(parts.query).get('page', ['1'])[0])
+            return 200, self.lists.get(page) or list_page(page, self.pages)
+        match = RE_FICTION_PATH.match(parts.path)
+        if match:
+            return 200, self.details[int(match.group(1)) % len(self.details)]
+        return 404, b"<html><body>Not Found</body></html>"
+
+    def record(self, status):
+        with self.lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+
+
+def make_handler(standin):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            delay, injected = standin.draw()
+            time.sleep(delay)
+            if injected:
+                status, body = injected, b"<html><body>Unavailable</body></html>"
+            else:
+                status, body = standin.page(self.path)
+            standin.record(status)
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if status == 429:
+                self.send_header('Retry-After', str(standin.retry_after))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 子进程退出时断开长连接属正常情况
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve(standin):
+    server = StandInServer(('127.0.0.1', 0), make_handler(standin))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# 场景：名称 -> 说明；子进程中由 run_scenario 执行
+SCENARIOS = {
+    'scrape_rr': "scrape_rr.scrape_bestRated（8 页，同步）",
+    'scrape_rr_async': "scrape_rr.scrape_bestRated_async（8 页，异步 + 解析进程）",
+    'scrape_rr_best50': "scrape_rr_best50.scrape_bestRated_completed",
+    'scrape_completed_top50': "scrape_completed_top50.scrape_bestRated",
+    'get_best_rated_order': "update_rr_ratings.get_best_rated_order",
+    'reorder_by_best_rated': "reorder_by_best_rated.get_best_rated_order",
+    'rr_crawl': "rr_crawl 一次爬取产出 best_rated、best50_completed、completed_top50",
+    'fetch_ratings': "fetch_ratings.main",
+    'update_ratings_only': "update_ratings_only.main",
+    'retry_missing_ratings': "retry_missing_ratings.main",
+    'update_rr_ratings': "update_rr_ratings.main",
+}
+
+
+def rated_rows():
+    from rr_db import read_books
+    return int(read_books()['platformRating'].notna().sum())
+
+
+def run_scenario(name):
+    """在子进程中（工作目录为临时 scripts 副本）运行一个场景，返回产出条数"""
+    if name == 'scrape_rr':
+        from scrape_rr import scrape_bestRated
+        return len(scrape_bestRated(pages=SEED_PAGES))
+    if name == 'scrape_rr_async':
+        import asyncio
+        from scrape_rr import scrape_bestRated_async
+        return len(asyncio.run(scrape_bestRated_async(pages=SEED_PAGES)))
+    if name == 'scrape_rr_best50':
+        from scrape_rr_best50 import scrape_bestRated_completed
+        return len(scrape_bestRated_completed())
+    if name == 'scrape_completed_top50':
+        from scrape_completed_top50 import scrape_bestRated
+        return len(scrape_bestRated())
+    if name == 'get_best_rated_order':
+        from update_rr_ratings import get_best_rated_order
+        return len(get_best_rated_order())
+    if name == 'reorder_by_best_rated':
+        from reorder_by_best_rated import get_best_rated_order
+        from rr_http import get_session
+        return len(get_best_rated_order(get_session()))
+
+    if name == 'rr_crawl':
+        from rr_crawl import crawl, standard_consumers
+        from scrape_rr import get_book_details
+        consumers = list(standard_consumers().values())
+        crawl(consumers, details=lambda book: get_book_details(book['url']))
+        return sum(len(c.books) for c in consumers)
+
+    import importlib
+    importlib.import_module(name).main()
+    return rated_rows()
+
+
+def child_main(name):
+    from rr_metrics import metrics_run
+    with metrics_run(name, Path('.cache') / 'metrics' / f"{name}.jsonl"):
+        items = run_scenario(name)
+    with open(RESULT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'items': items}, f)
+    return 0
+
+
+def read_summary(workdir, name):
+    path = workdir / '.cache' / 'metrics' / f"{name}.jsonl"
+    if not path.exists():
+        return {}
+    lines = path.read_text(encoding='utf-8').splitlines()
+    return json.loads(lines[-1]) if lines else {}
+
+
+def prepare(workdir, base_url):
+    """重建临时 scripts 副本：只保留代码和初始数据库"""
+    shutil.rmtree(workdir, ignore_errors=True)
+    workdir.mkdir(parents=True)
+    for path in SCRIPTS_DIR.glob('*.py'):
+        shutil.copy2(path, workdir / path.name)
+
+    import pandas as pd
+    from rr_db import write_books
+    write_books(pd.DataFrame(seed_books(base_url=base_url)), path=workdir / 'rr_books.sqlite')
+
+
+def measure(name, workdir, base_url, standin, timeout, log):
+    """在子进程中运行场景，返回计时、资源占用和请求统计"""
+    env = dict(os.environ, RR_BASE_URL=base_url, RR_RATE_SCALE=str(RATE_SCALE), PYTHONDONTWRITEBYTECODE='1')
+    standin.reset()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, str(workdir / Path(__file__).name), '--child', name],
+                            cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        _, status, usage = os.wait4(proc.pid, 0)
+    finally:
+        timer.cancel()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+
+    requests = sum(standin.counts.values())
+    result_path = workdir / RESULT_FILE
+    items = json.loads(result_path.read_text())['items'] if result_path.exists() else None
+    summary = read_summary(workdir, name)
+    return {
+        'ok': proc.returncode == 0 and items is not None,
+        'wall': round(elapsed, 3),
+        'requests': requests,
+        'rps': round(requests / elapsed, 1) if elapsed else None,
+        'cpu': round(usage.ru_utime + usage.ru_stime, 3),
+        'rss_mb': round(usage.ru_maxrss / 1024, 1),
+        'items': items,
+        'status': {str(k): v for k, v in sorted(standin.counts.items())},
+        'retries': summary.get('retries'),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """墙钟时间和 CPU 时间比基准慢超过 tolerance 的场景"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before or not result['ok']:
+            continue
+        for key in ('wall', 'cpu'):
+            if before[key] and result[key] > before[key] * (1 + tolerance):
+                regressions.append(f"{name} {key}: {before[key]:.2f}s -> {result[key]:.2f}s "
+                                   f"(+{result[key] / before[key] - 1:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="抓取脚本端到端基准（本地替身服务器）", formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="场景:\n" + '\n'.join(f"  {name:<24} {desc}" for name, desc in SCENARIOS.items()))
+    parser.add_argument('scenarios', nargs='*', help="场景（默认全部）")
+    parser.add_argument('--latency', type=float, default=0.02, help="每个响应的延迟（秒）")
+    parser.add_argument('--jitter', type=float, default=0.01, help="延迟的随机抖动（秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="返回 503 的比例")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="返回 429 的比例")
+    parser.add_argument('--retry-after', type=int, default=1, help="429 响应的 Retry-After（秒）")
+    parser.add_argument('--seed', type=int, default=42, help="延迟和故障注入的随机种子")
+    parser.add_argument('--timeout', type=float, default=600, help="单个场景的超时（秒）")
+    parser.add_argument('--json', help="把结果写入 JSON 文件")
+    parser.add_argument('--compare', help="与之前 --json 保存的结果对比")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="允许的变慢比例")
+    parser.add_argument('-v', '--verbose', action='store_true', help="显示脚本自身的输出")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child_main(args.child)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"未知场景: {', '.join(unknown)}")
+
+    standin = StandIn(args.latency, args.jitter, args.error_rate, args.throttle_rate, args.retry_after,
+                      seed=args.seed)
+    server = serve(standin)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    log = None if args.verbose else subprocess.DEVNULL
+
+    print("=" * 96)
+    print(f"⏱ 抓取脚本基准（替身服务器 {base_url}，延迟 {args.latency * 1000:.0f}±{args.jitter * 1000:.0f}ms，"
+          f"503 {args.error_rate:.0%}，429 {args.throttle_rate:.0%}）")
+    print("=" * 96)
+    print(f"{'场景':<24} {'墙钟':>8} {'请求':>6} {'请求/秒':>8} {'CPU':>8} {'峰值RSS':>9} {'产出':>6} {'重试':>5}  状态码")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp) / 'scripts'
+        for name in names:
+            prepare(workdir, base_url)
+            result = measure(name, workdir, base_url, standin, args.timeout, log)
+            results[name] = result
+            status = ', '.join(f"{k}×{v}" for k, v in result['status'].items())
+            mark = '' if result['ok'] else '  ❌ 运行失败（-v 查看输出）'
+            print(f"{name:<24} {result['wall']:>7.2f}s {result['requests']:>6} {result['rps'] or 0:>8.1f} "
+                  f"{result['cpu']:>7.2f}s {result['rss_mb']:>7.1f}MB {result['items'] if result['items'] is not None else '-':>6} "
+                  f"{result['retries'] if result['retries'] is not None else '-':>5}  {status}{mark}")
+    server.shutdown()
+
+    report = {
+        'settings': {k: getattr(args, k) for k in ('latency', 'jitter', 'error_rate', 'throttle_rate', 'retry_after', 'seed')},
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存到 {args.json}")
+
+    failed = [name for name, result in results.items() if not result['ok']]
+    if failed:
+        print(f"\n❌ 运行失败: {', '.join(failed)}")
+        return 1
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ 比 {args.compare} 慢超过 {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"\n✅ 与 {args.compare} 相比没有超过 {args.tolerance:.0%} 的变慢")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
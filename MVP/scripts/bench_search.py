@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+搜索框查询基准：逐条 lower().includes() 扫描与预生成倒排索引（search_index）对比
+用 data/books.json 复制出指定本数（默认 2 万本，标题加序号区分），
+对同一组查询分别计时，并检查索引结果覆盖扫描能找到的整词匹配。
+
+用法：
+    python3 scripts/bench_search.py [本数]
+"""
+
+import json
+import sys
+import time
+
+from build_shards import Catalog
+from search_index import SearchIndex, build_search_index, tokenize
+
+QUERIES = ['mother', 'mother of learning', 'wildbow', 'time loop', 'dungeon core', 'pale', 'the', 'xyzzy']
+TYPOS = ['mothr', 'wanderng inn', 'progresion', 'dungen core']
+# 搜索框每类只显示前几条
+LIMIT = 10
+
+
+def make_catalog(count):
+    catalog = Catalog.load()
+    novels = []
+    for i in range(count):
+        novel = dict(catalog.novels[i % len(catalog.novels)])
+        if i >= len(catalog.novels):
+            novel['id'] = f"{novel['id']}-{i}"
+            novel['title'] = f"{novel['title']} {i}"
+        novels.append(novel)
+    return novels, catalog.stacks
+
+
+def linear_search(novels, stacks, query):
+    """SearchModal 原来的写法"""
+    q = query.lower()
+    found = [n for n in novels if q in n['title'].lower() or q in n['author'].lower()]
+    found += [s for s in stacks if q in s['title'].lower()]
+    return found
+
+
+def timed(func, *args, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    novels, stacks = make_catalog(count)
+
+    build_ms, data = timed(build_search_index, novels, stacks, repeat=1)
+    size = len(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    index = SearchIndex(data)
+
+    print("=" * 64)
+    print(f"⏱ 搜索基准（{count:,} 本书，索引 {size / 1024:,.0f} KB，生成 {build_ms:.0f} ms）")
+    print("=" * 64)
+    print(f"{'查询':<22} {'扫描':>10} {'索引':>10} {'命中':>8}")
+
+    missing = 0
+    for query in QUERIES:
+        scan_ms, scanned = timed(linear_search, novels, stacks, query)
+        index_ms, _ = timed(index.search, query, LIMIT)
+        results = index.search(query)
+        print(f"{query:<22} {scan_ms:>7.2f} ms {index_ms:>7.2f} ms {len(results):>8}")
+        # 扫描命中且查询词是整词的结果，索引必须也能找到
+        found = {doc[1] for _, doc in results}
+        words = tokenize(query)
+        for item in scanned:
+            text = tokenize(f"{item['title']} {item.get('author', '')}")
+            if all(word in text for word in words) and item['id'] not in found:
+                missing += 1
+
+    print("\n拼写容错（扫描无结果）：")
+    for query in TYPOS:
+        index_ms, _ = timed(index.search, query, LIMIT)
+        results = index.search(query)
+        top = results[0][1][2] if results else '-'
+        print(f"{query:<22} {index_ms:>7.2f} ms  {len(linear_search(novels, stacks, query)):>3} -> {len(results):<6} {top[:30]}")
+
+    print("✅ 索引覆盖扫描的整词匹配" if not missing else f"❌ 索引漏掉 {missing} 条整词匹配")
+    return 0 if not missing else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+书籍表存储基准：openpyxl 读写 xlsx 与 SQLite（rr_db）对比
+用 rr_best_rated.xlsx 复制出指定行数（默认 1 万行，URL 中的小说 ID 各不相同）
+
+用法：
+    python3 scripts/bench_storage.py [行数]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from rr_db import read_books, update_books, write_books
+
+SOURCE = Path(__file__).parent / 'rr_best_rated.xlsx'
+
+
+def make_books(rows):
+    """按行数复制样例表，并改写 URL 让每行的小说 ID 唯一"""
+    base = pd.read_excel(SOURCE)
+    df = pd.concat([base] * (rows // len(base) + 1), ignore_index=True).head(rows)
+    df['url'] = [f"https://www.royalroad.com/fiction/{i}/book-{i}" for i in range(1, rows + 1)]
+    return df
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    df = make_books(rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx = Path(tmp) / 'books.xlsx'
+        db = Path(tmp) / 'books.sqlite'
+
+        xlsx_write, _ = timed(lambda: df.to_excel(xlsx, index=False, engine='openpyxl'))
+        xlsx_read, _ = timed(pd.read_excel, xlsx)
+        # xlsx 改一列也要整本重写
+        xlsx_update = xlsx_write
+
+        db_write, _ = timed(write_books, df, 'books', db)
+        db_read, loaded = timed(read_books, 'books', db)
+        ratings = df[['url']].assign(platformRating=df['platformRating'].fillna(0) + 0.01)
+        db_update, _ = timed(update_books, ratings, ['platformRating'], 'books', db)
+
+        # 往返后内容应一致
+        same = loaded[df.columns].astype(object).where(loaded[df.columns].notna(), None) \
+            .equals(df.astype(object).where(df.notna(), None))
+
+        print("=" * 64)
+        print(f"⏱ 书籍表存储基准（{rows:,} 行，xlsx {xlsx.stat().st_size / 1024:,.0f} KB，"
+              f"sqlite {db.stat().st_size / 1024:,.0f} KB）")
+        print("=" * 64)
+        print(f"{'操作':<12} {'openpyxl':>12} {'sqlite':>12} {'提速':>8}")
+        for name, slow, fast in [('整表写入', xlsx_write, db_write),
+                                 ('整表读取', xlsx_read, db_read),
+                                 ('更新一列', xlsx_update, db_update)]:
+            print(f"{name:<12} {slow:>9.1f} ms {fast:>9.1f} ms {slow / fast:>7.1f}x")
+        print("✅ 往返数据一致" if same else "❌ 往返数据不一致")
+        return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
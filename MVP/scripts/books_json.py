@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+books.json 的流式读取与增量合并
+- 逐条读取 JSON 数组中的对象（只保留当前一条），不整体 json.load
+- 按 ID 应用变更集：已有的书更新指定字段，新书按 ID 顺序插入
+- 未变化的书原样拷贝原文，不重新序列化；结果先写临时文件再原子替换
+- 也可以只输出差异文件（patch），不改动 books.json
+
+输出格式与 json.dump(books, ensure_ascii=False, indent=2) 完全一致。
+
+命令行用法（把一个变更文件应用到 books.json，变更文件是 Novel 对象数组）：
+    python3 scripts/books_json.py data/books.json changes.json
+    python3 scripts/books_json.py data/books.json changes.json --fields coverImage   # 已有的书只更新封面
+    python3 scripts/books_json.py data/books.json changes.json --diff data/books.patch.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+CHUNK_SIZE = 64 * 1024
+INDENT = '  '
+
+_decoder = json.JSONDecoder()
+
+
+def iter_records(path, chunk_size=CHUNK_SIZE):
+    """逐条读取 JSON 数组，产出 (对象, 原文)；内存只与单条记录大小有关"""
+    with open(path, encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        def skip_space():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        fill()
+        skip_space()
+        if buffer[pos:pos + 1] != '[':
+            raise ValueError(f"{path} 不是 JSON 数组")
+        pos += 1
+
+        expect_item = True
+        while True:
+            skip_space()
+            if pos >= len(buffer):
+                raise ValueError(f"{path} 意外结束")
+            if buffer[pos] == ']':
+                return
+            if buffer[pos] == ',' and not expect_item:
+                pos += 1
+                expect_item = True
+                continue
+            while True:
+                try:
+                    record, end = _decoder.raw_decode(buffer, pos)
+                    # 数字可能被截断在块边界上，块未读完时要确认后面还有分隔符
+                    if end == len(buffer) and not eof:
+                        raise ValueError
+                    break
+                except ValueError:
+                    if eof:
+                        raise
+                    fill()
+            yield record, buffer[pos:end]
+            pos = end
+            expect_item = False
+
+
+def _indented(text):
+    """把对象原文放到数组第一层缩进下"""
+    return text.replace('\n', '\n' + INDENT)
+
+
+def dumps_record(record):
+    """与 json.dump(list, indent=2) 中单个元素的写法一致"""
+    return _indented(json.dumps(record, ensure_ascii=False, indent=2))
+
+
+class ArrayWriter:
+    """按 json.dump(indent=2) 的格式逐条写出 JSON 数组"""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def write_raw(self, text):
+        """写入已是数组元素格式的原文（来自同格式的文件，不重新序列化）"""
+        self.f.write(('[\n' if self.count == 0 else ',\n') + INDENT + text)
+        self.count += 1
+
+    def write(self, record):
+        self.write_raw(dumps_record(record))
+
+    def close(self):
+        self.f.write('\n]' if self.count else '[]')
+
+
+class atomic_write:
+    """在目标目录写临时文件，成功后 os.replace 原子替换"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix='.tmp')
+        self.f = os.fdopen(fd, 'w', encoding='utf-8')
+        return self.f
+
+    def __exit__(self, exc_type, exc, tb):
+        self.f.close()
+        if exc_type is None:
+            os.replace(self.tmp, self.path)
+        else:
+            os.unlink(self.tmp)
+
+
+class ChangeSet:
+    """按书籍 ID 的变更集
+
+    upsert(novel, fields)：书已存在时只用 fields 中的字段更新（None 表示所有字段），不存在时整条插入
+    """
+
+    def __init__(self):
+        self.patches = {}
+        self.inserts = {}
+
+    def __len__(self):
+        return len(self.inserts)
+
+    def upsert(self, novel, fields=None):
+        book_id = novel['id']
+        if fields is None:
+            patch = dict(novel)
+        else:
+            patch = {key: novel[key] for key in fields if key in novel}
+        self.patches.setdefault(book_id, {}).update(patch)
+        self.inserts[book_id] = novel
+
+
+class MergeResult:
+    """合并统计"""
+
+    def __init__(self):
+        self.matched = set()     # 已存在并应用了变更的 ID
+        self.changed = 0         # 内容确实变化的书
+        self.inserted = 0
+        self.total = 0
+        self.streamed = True     # False 表示原文件未按 ID 排序，退回整体排序
+
+
+_MISSING = object()
+
+
+class _Unsorted(Exception):
+    """原文件未按 ID 排序，无法流式归并"""
+
+
+def _patched(record, patch):
+    """应用补丁，返回 (新对象, 变化的字段)"""
+    changed = {key: value for key, value in patch.items() if record.get(key, _MISSING) != value}
+    if not changed:
+        return record, changed
+    record = dict(record)
+    record.update(changed)
+    return record, changed
+
+
+def merge_file(path, changes, output=None):
+    """把变更集合并进 books.json（按 ID 排序输出）
+
+    原文件已按 ID 排序时流式归并；否则整体读入排序一次（之后文件即为有序）
+    """
+    output = output or path
+    result = MergeResult()
+    if not Path(path).exists():
+        with atomic_write(output) as f:
+            writer = ArrayWriter(f)
+            for book_id in sorted(changes.inserts):
+                writer.write(changes.inserts[book_id])
+                result.inserted += 1
+            writer.close()
+        result.total = result.inserted
+        return result
+
+    pending = sorted(changes.inserts)
+    try:
+        with atomic_write(output) as f:
+            writer = ArrayWriter(f)
+            i = 0
+            last_id = None
+            for record, raw in iter_records(path):
+                book_id = record['id']
+                if last_id is not None and book_id <= last_id:
+                    raise _Unsorted
+                last_id = book_id
+                # 先插入排在它前面的新书
+                while i < len(pending) and pending[i] < book_id:
+                    writer.write(changes.inserts[pending[i]])
+                    result.inserted += 1
+                    i += 1
+                if i < len(pending) and pending[i] == book_id:
+                    i += 1
+                if book_id in changes.patches:
+                    result.matched.add(book_id)
+                    record, changed = _patched(record, changes.patches[book_id])
+                    if changed:
+                        result.changed += 1
+                        writer.write(record)
+                        continue
+                writer.write_raw(raw)
+            for book_id in pending[i:]:
+                writer.write(changes.inserts[book_id])
+                result.inserted += 1
+            writer.close()
+            result.total = writer.count
+    except _Unsorted:
+        return _merge_in_memory(path, changes, output)
+    return result
+
+
+def patch_file(path, patches, output=None):
+    """按 ID 更新已有书籍的字段，保持原有顺序，不插入新书
+
+    patches 为 {id: {字段: 值}}；不在 patches 中或值未变化的书原样拷贝
+    """
+    output = output or path
+    result = MergeResult()
+    with open(path, 'rb') as src:
+        src.seek(-1, os.SEEK_END)
+        trailing_newline = src.read(1) == b'\n'
+    with atomic_write(output) as f:
+        writer = ArrayWriter(f)
+        for record, raw in iter_records(path):
+            patch = patches.get(record['id'])
+            if patch is not None:
+                result.matched.add(record['id'])
+                record, changed = _patched(record, patch)
+                if changed:
+                    result.changed += 1
+                    writer.write(record)
+                    continue
+            writer.write_raw(raw)
+        writer.close()
+        # 保留原文件末尾的换行
+        if trailing_newline:
+            f.write('\n')
+        result.total = writer.count
+    return result
+
+
+def _merge_in_memory(path, changes, output):
+    """原文件未按 ID 排序时的退路：整体读入、合并、排序"""
+    print(f"⚠️ {path} 未按 ID 排序，本次整体排序后写回")
+    result = MergeResult()
+    result.streamed = False
+    books = {}
+    for record, _ in iter_records(path):
+        book_id = record['id']
+        if book_id in changes.patches:
+            result.matched.add(book_id)
+            record, changed = _patched(record, changes.patches[book_id])
+            if changed:
+                result.changed += 1
+        books[book_id] = record
+    for book_id, novel in changes.inserts.items():
+        if book_id not in books:
+            books[book_id] = novel
+            result.inserted += 1
+    with atomic_write(output) as f:
+        writer = ArrayWriter(f)
+        for book_id in sorted(books):
+            writer.write(books[book_id])
+        writer.close()
+    result.total = len(books)
+    return result
+
+
+def diff_file(path, changes, patch_path):
+    """只计算差异并写出 patch 文件，不改动 books.json
+
+    patch 是操作数组：{"op": "add", "id", "value": 整条记录} 或 {"op": "update", "id", "value": 变化的字段}
+    """
+    result = MergeResult()
+    seen = set()
+    with atomic_write(patch_path) as f:
+        writer = ArrayWriter(f)
+        if Path(path).exists():
+            for record, _ in iter_records(path):
+                book_id = record['id']
+                seen.add(book_id)
+                result.total += 1
+                if book_id not in changes.patches:
+                    continue
+                result.matched.add(book_id)
+                _, changed = _patched(record, changes.patches[book_id])
+                if changed:
+                    result.changed += 1
+                    writer.write({'op': 'update', 'id': book_id, 'value': changed})
+        for book_id in sorted(changes.inserts):
+            if book_id not in seen:
+                result.inserted += 1
+                writer.write({'op': 'add', 'id': book_id, 'value': changes.inserts[book_id]})
+        writer.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把变更文件按 ID 合并进 books.json")
+    parser.add_argument('books', help="books.json 路径")
+    parser.add_argument('changes', help="变更文件（Novel 对象数组）")
+    parser.add_argument('--fields', nargs='+', help="已存在的书只更新这些字段（默认全部字段）")
+    parser.add_argument('--diff', metavar='PATCH', help="只输出差异文件，不修改 books.json")
+    args = parser.parse_args()
+
+    changes = ChangeSet()
+    for novel, _ in iter_records(args.changes):
+        changes.upsert(novel, args.fields)
+
+    if args.diff:
+        result = diff_file(args.books, changes, args.diff)
+        print(f"✅ 差异已写入 {args.diff}: 新增 {result.inserted}，更新 {result.changed}")
+    else:
+        result = merge_file(args.books, changes)
+        print(f"✅ 已更新 {args.books}: 新增 {result.inserted}，更新 {result.changed}，共 {result.total} 本")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
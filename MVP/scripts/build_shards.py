@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+为 Next.js 页面生成按路由拆分的 JSON 数据
+读取 data/books.json、src/data/stacks.json、src/data/curators.json（以及 similarity.py
+生成的 data/similar.json、rising.py 生成的 data/rising.json、cover_images.py 生成的
+data/covers.json），输出到 public/data/：
+
+    home.json             首页 { featured, picks, rising }（书单摘要 + 前几本书）
+    novel/<id>.json       NovelDetailData   { novel, stacks, similarNovels, relatedNovels }
+    stack/<id>.json       StackDetailData   { stack, curator, novels, relatedStacks }
+    theme/<slug>.json     { theme, novels, stacks }（书籍/书单摘要）
+    platform/<slug>.json  { platform, novels, stacks }
+    search.json           搜索框用的倒排索引（见 search_index.py）
+
+页面只按需请求自己的分片，不再把整个书目打进客户端包。
+封面清单里有的书带 cover 字段（尺寸、模糊占位图、AVIF / WebP 的 srcset），页面据此输出 <picture>，
+不用把整个清单打进客户端包。
+只用标准库，可在 npm run build 前（prebuild）直接运行；内容没变的文件不重写。
+
+用法：
+    python3 scripts/build_shards.py [--out public/data]
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import quote
+
+from search_index import build_search_index
+
+ROOT = Path(__file__).resolve().parent.parent
+BOOKS_JSON = ROOT / 'data' / 'books.json'
+STACKS_JSON = ROOT / 'src' / 'data' / 'stacks.json'
+CURATORS_JSON = ROOT / 'src' / 'data' / 'curators.json'
+# similarity.py 离线算好的相似作品 / 相关书单（可选）
+SIMILAR_JSON = ROOT / 'data' / 'similar.json'
+# rising.py 根据历史快照算好的上升书单（可选）
+RISING_JSON = ROOT / 'data' / 'rising.json'
+# cover_images.py 生成的封面清单（可选）
+COVERS_JSON = ROOT / 'data' / 'covers.json'
+OUT_DIR = ROOT / 'public' / 'data'
+
+SIMILAR_COUNT = 8
+RELATED_STACKS = 3
+# 同一作者 / 同一系列的作品数
+RELATED_NOVELS = 6
+# 首页：精选书单展示的书数、其他书单卡片展示的书数
+HOME_FEATURED_NOVELS = 4
+HOME_STACK_NOVELS = 3
+
+# 按 ID 一个文件的分片目录；prune 只清理这些目录（--out 可能是共用目录）
+SHARD_DIRS = ('novel', 'stack', 'theme', 'platform')
+
+# 可以直接作为文件名的 ID
+RE_SAFE_ID = re.compile(r'^[a-z0-9][a-z0-9._-]*$')
+# 书名中系列名之后的部分：冒号、" - " 副标题、方括号 / 圆括号注释
+RE_SERIES_SUFFIX = re.compile(r'\s*(?::|\s-\s|\[|\().*$')
+
+# 摘要中保留的字段
+NOVEL_SUMMARY_FIELDS = ('id', 'title', 'author', 'coverImage', 'cover', 'coverGradient', 'status', 'themes')
+STACK_SUMMARY_FIELDS = ('id', 'title', 'description', 'coverGradient', 'curatorId', 'themes', 'platforms')
+HOME_STACK_FIELDS = ('id', 'title', 'description', 'curatorId', 'curatorNote')
+
+
+def shard_name(item_id):
+    """分片文件名；不安全的 ID 转义后使用（与 app/lib/shards.ts 的 shardName 一致）"""
+    if RE_SAFE_ID.match(item_id):
+        return item_id
+    return quote(item_id, safe='-_.').replace('%', '_')
+
+
+def responsive_cover(manifest, source):
+    """封面的多尺寸版本（与 types.ts 的 ResponsiveCover 一致）；清单里没有时返回 None"""
+    key = manifest['sources'].get(source) if source else None
+    image = manifest['images'].get(key) if key else None
+    if not image:
+        return None
+    return {
+        'width': image['width'],
+        'height': image['height'],
+        'blurDataURL': image['blur'],
+        'sources': [
+            [f"image/{fmt}", ', '.join(f"{manifest['path']}/{key}-{w}.{fmt} {w}w" for w in image['widths'])]
+            for fmt in manifest['formats']
+        ],
+    }
+
+
+def with_cover(novel, cover):
+    """带 cover 字段的书籍副本；没有多尺寸版本时原样返回"""
+    return dict(novel, cover=cover) if cover else novel
+
+
+def novel_summary(novel):
+    return {key: novel[key] for key in NOVEL_SUMMARY_FIELDS if key in novel}
+
+
+def stack_summary(stack):
+    summary = {key: stack[key] for key in STACK_SUMMARY_FIELDS if key in stack}
+    summary['novelCount'] = len(stack.get('entries', []))
+    return summary
+
+
+def novel_platforms(novel):
+    return [link['platform'] for link in novel.get('links', [])]
+
+
+def series_key(title):
+    """系列名：小写书名去掉副标题和注释；太短的（如 "Re: ..."）不算系列，返回 None"""
+    key = RE_SERIES_SUFFIX.sub('', title.lower()).strip()
+    return key if len(key) > 3 else None
+
+
+class Catalog:
+    """书籍、书单、策展人以及它们之间的反向索引"""
+
+    def __init__(self, novels, stacks, curators, similar=None, rising=None, covers=None):
+        if covers:
+            novels = [with_cover(novel, responsive_cover(covers, novel.get('coverImage'))) for novel in novels]
+        self.novels = novels
+        self.stacks = stacks
+        self.similar = similar or {'novels': {}, 'stacks': {}}
+        self.rising = rising or {'days': 7, 'stat': 'followers', 'stacks': []}
+        self.stacks_by_id = {stack['id']: stack for stack in stacks}
+        self.novels_by_id = {novel['id']: novel for novel in novels}
+        self.curators_by_id = {curator['id']: curator for curator in curators}
+        self.position = {novel['id']: i for i, novel in enumerate(novels)}
+
+        # 书籍 -> 收录它的书单；书单 -> 书籍 ID 集合
+        self.stacks_by_novel = defaultdict(list)
+        self.stack_novels = {}
+        for stack in stacks:
+            ids = [entry['novelId'] for entry in sorted(stack.get('entries', []), key=lambda e: e.get('order', 0))]
+            self.stack_novels[stack['id']] = ids
+            for novel_id in dict.fromkeys(ids):
+                self.stacks_by_novel[novel_id].append(stack)
+
+        # 主题 / 平台 / 作者 / 系列 -> 书籍
+        self.novels_by_theme = defaultdict(list)
+        self.novels_by_platform = defaultdict(list)
+        self.novels_by_author = defaultdict(list)
+        self.novels_by_series = defaultdict(list)
+        for novel in novels:
+            self.novels_by_author[novel['author'].lower()].append(novel)
+            series = series_key(novel['title'])
+            if series:
+                self.novels_by_series[series].append(novel)
+            for theme in novel.get('themes', []):
+                self.novels_by_theme[theme].append(novel)
+            for platform in dict.fromkeys(novel_platforms(novel)):
+                self.novels_by_platform[platform].append(novel)
+
+    @classmethod
+    def load(cls, books=BOOKS_JSON, stacks=STACKS_JSON, curators=CURATORS_JSON, similar=SIMILAR_JSON,
+             rising=RISING_JSON, covers=COVERS_JSON):
+        def read(path):
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+
+        def optional(path):
+            return read(path) if path and Path(path).exists() else None
+
+        return cls(read(books), read(stacks)['stacks'], read(curators)['curators'], optional(similar),
+                   optional(rising), optional(covers))
+
+    def missing_similar(self):
+        """similar.json 中没有的书籍数（书目更新后需要重新运行 similarity.py）"""
+        return sum(1 for novel in self.novels if novel['id'] not in self.similar['novels'])
+
+    def similar_novels(self, novel, count=SIMILAR_COUNT):
+        """相似作品：优先用 similar.json，没有时按共同主题、共同平台、书目顺序"""
+        precomputed = self.similar['novels'].get(novel['id'])
+        if precomputed is not None:
+            return [self.novels_by_id[i] for i in precomputed if i in self.novels_by_id][:count]
+        themes = set(novel.get('themes', []))
+        platforms = set(novel_platforms(novel))
+        candidates = {}
+        for theme in themes:
+            for other in self.novels_by_theme[theme]:
+                candidates[other['id']] = other
+        candidates.pop(novel['id'], None)
+
+        def score(other):
+            shared_themes = len(themes.intersection(other.get('themes', [])))
+            shared_platforms = len(platforms.intersection(novel_platforms(other)))
+            return (-shared_themes, -shared_platforms, self.position[other['id']])
+
+        return sorted(candidates.values(), key=score)[:count]
+
+    def related_novels(self, novel, count=RELATED_NOVELS):
+        """同一作者或同一系列（series_key 相同）的作品，按书目顺序"""
+        candidates = {other['id']: other for other in self.novels_by_author[novel['author'].lower()]}
+        series = series_key(novel['title'])
+        if series:
+            candidates.update((other['id'], other) for other in self.novels_by_series[series])
+        candidates.pop(novel['id'], None)
+        return sorted(candidates.values(), key=lambda other: self.position[other['id']])[:count]
+
+    def related_stacks(self, stack, count=RELATED_STACKS):
+        """相关书单：优先用 similar.json，没有时按共同书籍、共同主题、原顺序"""
+        precomputed = self.similar['stacks'].get(stack['id'])
+        if precomputed is not None:
+            return [self.stacks_by_id[i] for i in precomputed if i in self.stacks_by_id][:count]
+        novels = set(self.stack_novels[stack['id']])
+        themes = set(stack.get('themes', []))
+        ranked = []
+        for i, other in enumerate(self.stacks):
+            if other['id'] == stack['id']:
+                continue
+            shared_novels = len(novels.intersection(self.stack_novels[other['id']]))
+            shared_themes = len(themes.intersection(other.get('themes', [])))
+            ranked.append((-shared_novels, -shared_themes, i, other))
+        ranked.sort(key=lambda item: item[:3])
+        return [item[3] for item in ranked[:count]]
+
+    def novel_detail(self, novel):
+        return {
+            'novel': novel,
+            'stacks': self.stacks_by_novel.get(novel['id'], []),
+            'similarNovels': self.similar_novels(novel),
+            'relatedNovels': self.related_novels(novel),
+        }
+
+    def stack_detail(self, stack):
+        return {
+            'stack': stack,
+            'curator': self.curators_by_id.get(stack.get('curatorId')),
+            'novels': [self.novels_by_id[i] for i in self.stack_novels[stack['id']] if i in self.novels_by_id],
+            'relatedStacks': self.related_stacks(stack),
+        }
+
+    def home_stack(self, stack, novel_ids, count=HOME_STACK_NOVELS, synopsis=False):
+        """首页书单卡片：书单摘要和前 count 本书的摘要"""
+        novels = []
+        for novel_id in novel_ids:
+            novel = self.novels_by_id.get(novel_id)
+            if novel is None:
+                continue
+            summary = novel_summary(novel)
+            if synopsis:
+                summary['synopsis'] = novel.get('synopsis', '')
+            novels.append(summary)
+            if len(novels) == count:
+                break
+        data = {key: stack[key] for key in HOME_STACK_FIELDS if stack.get(key)}
+        data['novelCount'] = len(stack.get('entries', []))
+        data['novels'] = novels
+        return data
+
+    def home_page(self):
+        """首页：精选书单（isFeatured 的第一个）、其余编辑精选、上升中的书单"""
+        featured = next((s for s in self.stacks if s.get('isFeatured')), self.stacks[0])
+        rising = []
+        for item in self.rising.get('stacks', []):
+            stack = self.stacks_by_id.get(item['id'])
+            if stack is not None:
+                rising.append(dict(self.home_stack(stack, item['novels']), gained=item['gained'],
+                                   growth=item['growth']))
+        return {
+            'featured': self.home_stack(featured, self.stack_novels[featured['id']], HOME_FEATURED_NOVELS,
+                                        synopsis=True),
+            'picks': [
+                self.home_stack(s, self.stack_novels[s['id']]) for s in self.stacks
+                if s.get('isEditorPick') and s['id'] != featured['id']
+            ],
+            'rising': {
+                'days': self.rising.get('days', 7),
+                'stat': self.rising.get('stat', 'followers'),
+                'stacks': rising,
+            },
+        }
+
+    def theme_page(self, theme):
+        return {
+            'theme': theme,
+            'novels': [novel_summary(n) for n in self.novels_by_theme.get(theme, [])],
+            'stacks': [stack_summary(s) for s in self.stacks if theme in s.get('themes', [])],
+        }
+
+    def platform_page(self, platform):
+        novel_ids = {n['id'] for n in self.novels_by_platform.get(platform, [])}
+        return {
+            'platform': platform,
+            'novels': [novel_summary(n) for n in self.novels_by_platform.get(platform, [])],
+            'stacks': [
+                stack_summary(s) for s in self.stacks
+                if platform in s.get('platforms', []) or novel_ids.intersection(self.stack_novels[s['id']])
+            ],
+        }
+
+
+class ShardWriter:
+    """写出分片：内容不变的文件不重写，本次没生成的旧分片删除"""
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        self.written = set()
+        self.changed = 0
+        self.sizes = {}
+
+    def write(self, relative, data):
+        path = self.out_dir / relative
+        content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.written.add(path)
+        self.sizes[relative] = len(content)
+        if path.exists() and path.read_bytes() == content:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        self.changed += 1
+
+    def prune(self):
+        """删除 SHARD_DIRS 中上次生成、这次不再需要的分片；--out 下的其他文件不动"""
+        removed = 0
+        for directory in SHARD_DIRS:
+            for path in (self.out_dir / directory).glob('*.json'):
+                if path not in self.written:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+
+def build(catalog, out_dir=OUT_DIR):
+    writer = ShardWriter(out_dir)
+    for novel in catalog.novels:
+        writer.write(f"novel/{shard_name(novel['id'])}.json", catalog.novel_detail(novel))
+    for stack in catalog.stacks:
+        writer.write(f"stack/{shard_name(stack['id'])}.json", catalog.stack_detail(stack))
+    for theme in catalog.novels_by_theme:
+        writer.write(f"theme/{shard_name(theme)}.json", catalog.theme_page(theme))
+    for platform in catalog.novels_by_platform:
+        writer.write(f"platform/{shard_name(platform)}.json", catalog.platform_page(platform))
+    writer.write('home.json', catalog.home_page())
+    writer.write('search.json', build_search_index(catalog.novels, catalog.stacks))
+    removed = writer.prune()
+    return writer, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成按路由拆分的 JSON 数据")
+    parser.add_argument('--out', default=str(OUT_DIR), help="输出目录")
+    args = parser.parse_args()
+
+    catalog = Catalog.load()
+    missing = sorted({i for ids in catalog.stack_novels.values() for i in ids if i not in catalog.novels_by_id})
+    if missing:
+        print(f"⚠️ 书单引用了 {len(missing)} 本不存在的书: {', '.join(missing[:5])}")
+    if not SIMILAR_JSON.exists():
+        print(f"⚠️ 没有 {SIMILAR_JSON.name}，相似作品按共同主题计算（可运行 scripts/similarity.py）")
+    elif catalog.missing_similar():
+        print(f"⚠️ {SIMILAR_JSON.name} 缺少 {catalog.missing_similar()} 本书，建议重新运行 scripts/similarity.py")
+
+    writer, removed = build(catalog, args.out)
+
+    sizes = writer.sizes
+    catalog_size = BOOKS_JSON.stat().st_size + STACKS_JSON.stat().st_size
+    largest = max(sizes, key=sizes.get)
+    print(f"✅ 已生成 {len(sizes)} 个分片到 {args.out}（更新 {writer.changed} 个，删除 {removed} 个旧分片）")
+    print(f"   书籍 {len(catalog.novels)}，书单 {len(catalog.stacks)}，"
+          f"主题 {len(catalog.novels_by_theme)}，平台 {len(catalog.novels_by_platform)}")
+    print(f"   首页 {sizes['home.json'] / 1024:.1f} KB，搜索索引 {sizes['search.json'] / 1024:.1f} KB，最大分片 {largest} {sizes[largest] / 1024:.1f} KB，"
+          f"完整书目 {catalog_size / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
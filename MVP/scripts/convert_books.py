@@ -4,9 +4,13 @@
 """
 
 import pandas as pd
-import json
+import argparse
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
+
+from books_json import ChangeSet, diff_file, iter_records, merge_file
+from derived_counters import update_counters
 
 # 平台映射表
 PLATFORM_MAPPING = {
@@ -26,6 +30,9 @@ STATUS_MAPPING = {
     'DEAD': 'dropped',
 }
 
+# Excel 中已有的书只更新这些字段
+UPDATE_FIELDS = ('coverImage', 'curatorNote')
+
 # 常见标签到主题的映射
 THEME_MAPPING = {
     'time loop': 'time-loop',
@@ -48,52 +55,73 @@ THEME_MAPPING = {
     'completed': 'completed',
 }
 
-def parse_tags(tags_str: str) -> List[str]:
-    """解析标签字符串，返回主题列表"""
-    if pd.isna(tags_str) or not tags_str:
-        return []
-
-    themes = []
-    tags = str(tags_str).split(',')
-
-    for tag in tags:
-        tag_lower = tag.strip().lower()
-        # 查找匹配的主题
-        for key, value in THEME_MAPPING.items():
-            if key in tag_lower or tag_lower in key:
-                if value not in themes:
-                    themes.append(value)
-
+@lru_cache(maxsize=None)
+def tag_themes(tag_lower: str) -> Tuple[str, ...]:
+    """单个标签（已去空格、小写）对应的主题：标签与 THEME_MAPPING 的键互相包含即匹配；每个不同的标签只计算一次"""
+    return tuple(value for key, value in THEME_MAPPING.items() if key in tag_lower or tag_lower in key)
+
+def parse_tags_column(tags: pd.Series) -> List[List[str]]:
+    """把整列逗号分隔的标签解析为主题列表，与输入同序；空值和空字符串没有主题
+
+    整列切分后按不同的标签去重查表（去空格、小写也只对不同的标签做一次），
+    不再对每一行做 标签 × THEME_MAPPING 的双重循环
+    """
+    tags = tags.reset_index(drop=True).astype(object)
+    valid = tags.notna() & tags.astype(bool)
+    tokens = tags[valid].map(str).str.split(',').explode()
+    lookup = {token: tag_themes(token.strip().lower()) for token in tokens.unique()}
+
+    themes = [[] for _ in range(len(tags))]
+    for row, token in zip(tokens.index.tolist(), tokens.tolist()):
+        row_themes = themes[row]
+        for theme in lookup[token]:
+            if theme not in row_themes:
+                row_themes.append(theme)
     return themes
 
-def convert_to_novel(row: pd.Series) -> Dict:
-    """将单行数据转换为 Novel 格式"""
-    platform_raw = row['platform']
-    platform = PLATFORM_MAPPING.get(platform_raw, 'personal-site')
-
-    status_raw = row['status']
-    status = STATUS_MAPPING.get(status_raw, 'ongoing')
-
-    # 解析标签为主题
-    themes = parse_tags(row.get('tags', ''))
-
-    # 获取英文编辑语
-    curator_note = str(row['curator_note_en']) if pd.notna(row.get('curator_note_en')) else None
-
-    # 直接使用 Excel 中的 cover_url
-    cover_image = str(row['cover_url']) if pd.notna(row.get('cover_url')) else None
-
-    # 构建 Novel 对象
+def _text_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """等价于逐行 str(row[column])"""
+    return df[column].astype(object).map(str)
+
+def _optional_column(df: pd.DataFrame, column: str) -> List:
+    """等价于逐行 str(row[column]) if pd.notna(row.get(column)) else None"""
+    if column not in df.columns:
+        return [None] * len(df)
+    values = df[column].astype(object)
+    return [str(value) if present else None for value, present in zip(values.tolist(), values.notna().tolist())]
+
+def convert_frame(df: pd.DataFrame) -> List[Dict]:
+    """整表转换为 Novel 列表（与原来逐行转换的结果完全一致，见 bench_convert.py）"""
+    df = df.reset_index(drop=True)
+
+    ids = _text_column(df, 'id').str.lower().str.replace(' ', '-', regex=False)
+    platforms = df['platform'].astype(object).map(PLATFORM_MAPPING).fillna('personal-site')
+    statuses = df['status'].astype(object).map(STATUS_MAPPING).fillna('ongoing')
+    if 'tags' in df.columns:
+        themes = parse_tags_column(df['tags'])
+    else:
+        themes = [[] for _ in range(len(df))]
+
+    # 逐元素遍历 pandas 字符串数组很慢，先转成 Python 列表再组装
+    columns = zip(
+        ids.tolist(), _text_column(df, 'title').tolist(), _text_column(df, 'author').tolist(), themes,
+        platforms.tolist(), _text_column(df, 'url').tolist(), statuses.tolist(),
+        _optional_column(df, 'cover_url'), _optional_column(df, 'curator_note_en')
+    )
+    return [_novel(*values) for values in columns]
+
+def _novel(book_id, title, author, book_themes, platform, url, status, cover_image, curator_note) -> Dict:
+    """组装单本书的 Novel 字典"""
     novel = {
-        "id": str(row['id']).lower().replace(' ', '-'),
-        "title": str(row['title']),
-        "author": str(row['author']),
-        "synopsis": "",  # Excel 中没有此字段，留空
-        "themes": themes,
+        "id": book_id,
+        "title": title,
+        "author": author,
+        "synopsis": "",
+        "themes": book_themes,
         "links": [
             {
                 "platform": platform,
-                "url": str(row['url']),
+                "url": url,
                 "isCanonical": True
             }
         ],
@@ -101,16 +129,17 @@ def convert_to_novel(row: pd.Series) -> Dict:
         "stackCount": 0,
         "savedCount": 0
     }
-
-    # 只添加有值的字段
     if cover_image:
         novel["coverImage"] = cover_image
     if curator_note:
         novel["curatorNote"] = curator_note
-
     return novel
 
 def main():
+    parser = argparse.ArgumentParser(description="从 Excel 更新 data/books.json")
+    parser.add_argument('--diff', metavar='PATCH', help="只输出差异文件，不修改 books.json")
+    args = parser.parse_args()
+
     excel_path = "/Users/chengwen/Documents/Sonar files/SB+SV+Sites-books_final.xlsx"
     output_path = "/Users/chengwen/Projects/solo-sonar/data/books.json"
 
@@ -118,79 +147,50 @@ def main():
     df = pd.read_excel(excel_path)
     print(f"✓ 成功读取 {len(df)} 本书籍")
 
-    # 读取现有的 books.json
-    existing_books = {}
-    try:
-        with open(output_path, 'r', encoding='utf-8') as f:
-            existing_books_list = json.load(f)
-            # 创建 ID 到书籍的映射
-            for book in existing_books_list:
-                existing_books[book['id']] = book
-        print(f"✓ 成功读取 {len(existing_books)} 本现有书籍")
-    except FileNotFoundError:
-        print("⚠️  未找到现有 books.json，将创建新文件")
-        existing_books = {}
-
     print("\n🔄 正在转换并更新书籍...")
-    updated_books = {}
-    new_count = 0
-    updated_count = 0
-
-    for _, row in df.iterrows():
-        excel_novel = convert_to_novel(row)
-        book_id = excel_novel['id']
-
-        if book_id in existing_books:
-            # 更新现有书籍：只更新新字段，保留原有字段
-            existing_book = existing_books[book_id]
-
-            # 更新 coverImage（如果有）
-            if 'coverImage' in excel_novel:
-                existing_book['coverImage'] = excel_novel['coverImage']
-
-            # 更新 curatorNote（如果有）
-            if 'curatorNote' in excel_novel:
-                existing_book['curatorNote'] = excel_novel['curatorNote']
-
-            updated_books[book_id] = existing_book
-            updated_count += 1
-        else:
-            # 新书籍：添加完整的 Excel 数据
-            updated_books[book_id] = excel_novel
-            new_count += 1
-
-    # 添加 Excel 里没有的现有书籍
-    for book_id, book in existing_books.items():
-        if book_id not in updated_books:
-            updated_books[book_id] = book
-
-    # 转换为列表并排序
-    novels = list(updated_books.values())
-    novels.sort(key=lambda x: x['id'])
+    excel_novels = convert_frame(df)
 
-    print(f"✓ 新增书籍: {new_count} 本")
-    print(f"✓ 更新书籍: {updated_count} 本")
-    print(f"✓ 保留书籍: {len(existing_books) - updated_count} 本")
-    print(f"✓ 总计: {len(novels)} 本")
+    # 已有的书只更新 coverImage / curatorNote，新书整条添加；Excel 里没有的书原样保留
+    changes = ChangeSet()
+    for novel in excel_novels:
+        changes.upsert(novel, fields=UPDATE_FIELDS)
 
-    # 创建输出目录
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    if not Path(output_path).exists():
+        print("⚠️  未找到现有 books.json，将创建新文件")
+
+    if args.diff:
+        result = diff_file(output_path, changes, args.diff)
+        print(f"✓ 新增书籍: {result.inserted} 本")
+        print(f"✓ 内容有变化的书籍: {result.changed} 本")
+        print(f"\n💾 差异已写入 {args.diff}（books.json 未修改）")
+        return
 
-    # 保存 JSON
+    # 流式合并：未变化的书原样拷贝，结果原子替换
     print(f"\n💾 正在保存到 {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(novels, f, ensure_ascii=False, indent=2)
+    result = merge_file(output_path, changes)
+
+    updated_count = sum(1 for novel in excel_novels if novel['id'] in result.matched)
+    new_count = len(excel_novels) - updated_count
+    existing_count = result.total - result.inserted
+    print(f"✓ 新增书籍: {new_count} 本")
+    print(f"✓ 更新书籍: {updated_count} 本（内容有变化 {result.changed} 本）")
+    print(f"✓ 保留书籍: {existing_count - len(result.matched)} 本")
+    print(f"✓ 总计: {result.total} 本")
+
+    # 书单计数与书单平台由 stacks.json 派生，书籍变化后一并更新
+    counters = update_counters(books_path=output_path)
+    print(f"✓ 派生计数: 书籍 {len(counters.novels)} 本、书单 {len(counters.stacks)} 个、策展人 {len(counters.curators)} 位有变化")
 
     print("✓ 转换完成！")
 
     # 打印一些统计信息
     print(f"\n📊 统计信息:")
-    print(f"  总书籍数: {len(novels)}")
+    print(f"  总书籍数: {result.total}")
     platform_counts = {}
     status_counts = {}
     theme_counts = {}
 
-    for novel in novels:
+    for novel, _ in iter_records(output_path):
         # 统计平台
         for link in novel['links']:
             platform = link['platform']
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+封面图片处理：下载、去重、缩放并生成多尺寸 AVIF / WebP
+- 并发下载 books.json 中的 coverImage（AsyncFetcher：按主机限速、响应缓存和条件请求）；
+  远程地址的文件名与 public/covers 中的原图同名时直接读原图
+- 按内容哈希命名输出文件，相同内容只处理一次；内容未变且文件齐全时跳过编码
+- 感知哈希（dHash）相近的图片视为同一封面，只保留分辨率最高的一份
+- 编码在进程池中进行，与下载并行
+- 清单 data/covers.json 记录每个来源对应的图片、原始尺寸和模糊占位图，
+  BookCover.tsx 据此输出 <picture> 和 srcset
+
+输出：
+    public/covers/opt/<哈希>-<宽度>.avif / .webp
+    data/covers.json   { v, path, formats, sources: {来源: 哈希}, images: {哈希: {...}}, aliases }
+
+用法：
+    python3 scripts/cover_images.py                 # 处理 books.json 中的全部封面
+    python3 scripts/cover_images.py --offline       # 不发请求，只用本地原图和缓存
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from PIL import Image, ImageOps
+
+from books_json import atomic_write, iter_records
+from build_shards import BOOKS_JSON, ROOT
+from rr_async import AsyncFetcher
+from rr_cache import configure_cache
+from rr_metrics import metrics_run
+from rr_ratelimit import AdaptiveRateLimiter
+
+FORMAT_VERSION = 1
+
+PUBLIC_DIR = ROOT / 'public'
+ORIGINALS_DIR = PUBLIC_DIR / 'covers'
+OUT_DIR = ORIGINALS_DIR / 'opt'
+URL_PATH = '/covers/opt'
+MANIFEST_PATH = ROOT / 'data' / 'covers.json'
+
+# 输出宽度：列表缩略图 100px、详情页 180px 的 1x / 2x，以及封面弹窗
+WIDTHS = (120, 240, 480)
+# 按优先级排列，<picture> 中靠前的格式优先
+FORMATS = {
+    'avif': {'quality': 50, 'speed': 6},
+    'webp': {'quality': 75, 'method': 6},
+}
+PLACEHOLDER_WIDTH = 10
+
+# dHash 汉明距离不超过该值视为同一封面（64 位分 4 段，距离 ≤3 时至少一段完全相同）
+HASH_DISTANCE = 3
+HASH_BANDS = 4
+
+# 图床允许的速率比 Royal Road 页面高
+CONCURRENCY = 8
+START_RATE = 2.0
+MAX_RATE = 8.0
+
+
+def content_key(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def variant_name(key, width, fmt):
+    return f"{key}-{width}.{fmt}"
+
+
+def target_widths(width, widths=WIDTHS):
+    """不放大：只保留不超过原图宽度的尺寸，原图比最小尺寸还窄时输出原宽"""
+    return [w for w in widths if w <= width] or [width]
+
+
+def dhash(image):
+    """差值哈希：9×8 灰度图相邻像素比较，返回 64 位整数"""
+    pixels = list(image.convert('L').resize((9, 8), Image.Resampling.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def to_rgb(image):
+    """透明部分铺白底，调色板图转 RGB"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def placeholder(image):
+    """宽 10px 的低质量 WebP，作为 data URL 内联"""
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    small = image.resize((PLACEHOLDER_WIDTH, height), Image.Resampling.BILINEAR)
+    buffer = io.BytesIO()
+    small.save(buffer, format='WEBP', quality=30)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def encode(key, data, out_dir=OUT_DIR, widths=WIDTHS):
+    """解码一张图片并写出各尺寸、各格式的文件（在子进程中运行）"""
+    image = to_rgb(Image.open(io.BytesIO(data)))
+    sizes = target_widths(image.width, widths)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for width in sizes:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt, options in FORMATS.items():
+            path = out_dir / variant_name(key, width, fmt)
+            tmp = path.with_name(path.name + '.tmp')
+            resized.save(tmp, format=fmt.upper(), **options)
+            os.replace(tmp, path)
+    return {
+        'width': image.width,
+        'height': image.height,
+        'widths': sizes,
+        'blur': placeholder(image),
+        'dhash': f"{dhash(image):016x}",
+    }
+
+
+def has_variants(key, entry, out_dir=OUT_DIR):
+    return all((Path(out_dir) / variant_name(key, w, fmt)).exists() for w in entry['widths'] for fmt in FORMATS)
+
+
+class PerceptualIndex:
+    """按 dHash 分段分桶，查找汉明距离不超过 HASH_DISTANCE 的图片"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.hashes = {}
+
+    @staticmethod
+    def bands(value):
+        bits = 64 // HASH_BANDS
+        mask = (1 << bits) - 1
+        return [(i, (value >> (i * bits)) & mask) for i in range(HASH_BANDS)]
+
+    def find(self, value):
+        for band in self.bands(value):
+            for key in self.buckets.get(band, ()):
+                if bin(self.hashes[key] ^ value).count('1') <= HASH_DISTANCE:
+                    return key
+        return None
+
+    def add(self, key, value):
+        self.hashes[key] = value
+        for band in self.bands(value):
+            self.buckets.setdefault(band, []).append(key)
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get('v') == FORMAT_VERSION else None
+
+
+def cover_sources(path=BOOKS_JSON):
+    """books.json 中出现的全部封面地址（去重，保持顺序）"""
+    sources = {}
+    for novel, _ in iter_records(path):
+        if novel.get('coverImage'):
+            sources.setdefault(novel['coverImage'], novel['id'])
+    return list(sources)
+
+
+def local_path(source, originals=ORIGINALS_DIR):
+    """站内路径或与原图同名的远程地址 -> 本地文件；否则 None"""
+    if source.startswith('/'):
+        path = PUBLIC_DIR / source.lstrip('/')
+        return path if path.is_file() else None
+    if originals is None:
+        return None
+    stem = Path(urlsplit(source).path).stem
+    for suffix in ('.png', '.jpg', '.jpeg', '.webp'):
+        path = Path(originals) / f"{stem}{suffix}"
+        if path.is_file():
+            return path
+    return None
+
+
+class CoverPipeline:
+    """下载 -> 内容哈希 -> 编码（进程池），同一内容只编码一次"""
+
+    def __init__(self, manifest, fetcher, pool, originals=ORIGINALS_DIR, out_dir=OUT_DIR):
+        manifest = manifest or {}
+        self.old_images = manifest.get('images', {})
+        self.old_sources = manifest.get('sources', {})
+        self.aliases = dict(manifest.get('aliases', {}))
+        self.fetcher = fetcher
+        self.pool = pool
+        self.originals = originals
+        self.out_dir = out_dir
+        self.images = {}
+        self.pending = {}
+        self.encoded = 0
+        self.reused = 0
+        self.failed = []
+
+    async def read(self, source):
+        path = local_path(source, self.originals)
+        if path is not None:
+            return await asyncio.to_thread(path.read_bytes)
+        return await self.fetcher.fetch(source)
+
+    async def image(self, key, data):
+        """内容哈希对应的图片信息；已有且文件齐全时不重新编码"""
+        key = self.aliases.get(key, key)
+        entry = self.old_images.get(key)
+        if entry and has_variants(key, entry, self.out_dir):
+            self.reused += 1
+            self.images[key] = entry
+            return key
+        if key not in self.pending:
+            loop = asyncio.get_running_loop()
+            self.pending[key] = loop.run_in_executor(self.pool, encode, key, data, self.out_dir)
+        self.images[key] = await self.pending[key]
+        return key
+
+    async def process(self, source):
+        try:
+            data = await self.read(source)
+            return source, await self.image(content_key(data), data)
+        except Exception as e:
+            # 取不到时沿用上次的结果（文件仍在），都没有时页面直接用原地址
+            self.failed.append((source, str(e) or type(e).__name__))
+            key = self.old_sources.get(source)
+            if key in self.old_images and has_variants(key, self.old_images[key], self.out_dir):
+                self.images[key] = self.old_images[key]
+                return source, key
+            return source, None
+
+    async def run(self, sources):
+        results = await asyncio.gather(*(self.process(s) for s in sources))
+        self.encoded = len(self.pending)
+        return {source: key for source, key in results if key is not None}
+
+
+def merge_duplicates(sources, images, aliases):
+    """感知哈希相近的图片合并到像素最多的一份，返回被合并的哈希"""
+    index = PerceptualIndex()
+    order = sorted(images, key=lambda k: (-images[k]['width'] * images[k]['height'], k))
+    merged = set()
+    for key in order:
+        value = int(images[key]['dhash'], 16)
+        canonical = index.find(value)
+        if canonical is None:
+            index.add(key, value)
+            continue
+        aliases[key] = canonical
+        merged.add(key)
+    for source, key in sources.items():
+        sources[source] = aliases.get(key, key)
+    for key in merged:
+        del images[key]
+    # 别名链指向最终保留的图片
+    for key, target in aliases.items():
+        while target in aliases:
+            target = aliases[target]
+        aliases[key] = target
+    return merged
+
+
+def prune(images, out_dir=OUT_DIR):
+    """删除清单不再引用的输出文件"""
+    keep = {variant_name(k, w, fmt) for k, e in images.items() for w in e['widths'] for fmt in FORMATS}
+    removed = 0
+    for path in Path(out_dir).glob('*'):
+        if path.is_file() and path.name not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+async def build(sources, manifest, originals=ORIGINALS_DIR, out_dir=OUT_DIR,
+                concurrency=CONCURRENCY, retries=3, workers=None):
+    limiter = AdaptiveRateLimiter(start_rate=START_RATE, max_rate=MAX_RATE)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with AsyncFetcher(concurrency=concurrency, limiter=limiter, retry_count=retries) as fetcher:
+            pipeline = CoverPipeline(manifest, fetcher, pool, originals, out_dir)
+            mapping = await pipeline.run(sources)
+
+    images = {key: pipeline.images[key] for key in set(mapping.values())}
+    aliases = {k: v for k, v in pipeline.aliases.items() if v in images}
+    merged = merge_duplicates(mapping, images, aliases)
+    result = {
+        'v': FORMAT_VERSION,
+        'path': URL_PATH,
+        'formats': list(FORMATS),
+        'sources': dict(sorted(mapping.items())),
+        'images': dict(sorted(images.items())),
+        'aliases': dict(sorted(aliases.items())),
+    }
+    return result, pipeline, merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="下载封面并生成多尺寸 AVIF / WebP")
+    parser.add_argument('--offline', action='store_true', help="不发请求，只用本地原图和响应缓存")
+    parser.add_argument('--no-originals', action='store_true', help="不使用 public/covers 中的同名原图")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help="并发下载数")
+    parser.add_argument('--retries', type=int, default=3, help="每个地址的重试次数")
+    parser.add_argument('--workers', type=int, help="编码进程数（默认 CPU 核数）")
+    args = parser.parse_args()
+
+    if args.offline:
+        configure_cache(offline=True)
+
+    start = time.perf_counter()
+    sources = cover_sources()
+    manifest = load_manifest()
+    originals = None if args.no_originals else ORIGINALS_DIR
+    print(f"🖼️ 处理 {len(sources)} 个封面地址...")
+
+    result, pipeline, merged = asyncio.run(build(
+        sources, manifest, originals,
+        concurrency=args.concurrency, retries=args.retries, workers=args.workers,
+    ))
+    with atomic_write(MANIFEST_PATH) as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    removed = prune(result['images'])
+
+    elapsed = time.perf_counter() - start
+    size = sum(p.stat().st_size for p in OUT_DIR.glob('*') if p.is_file()) if OUT_DIR.exists() else 0
+    print(f"✅ 已写入 {MANIFEST_PATH}（{elapsed:.1f} 秒）")
+    print(f"   封面 {len(result['sources'])}/{len(sources)}，图片 {len(result['images'])}"
+          f"（新编码 {pipeline.encoded}，沿用 {pipeline.reused}，相似合并 {len(merged)}）")
+    print(f"   输出 {size / 1024 / 1024:.1f} MB，删除旧文件 {removed} 个")
+    if pipeline.failed:
+        print(f"⚠️ {len(pipeline.failed)} 个地址获取失败，页面继续使用原地址：")
+        for source, error in pipeline.failed[:10]:
+            print(f"   {source}: {error[:80]}")
+    return 0
+
+
+if __name__ == "__main__":
+    with metrics_run('cover_images'):
+        status = main()
+    sys.exit(status)
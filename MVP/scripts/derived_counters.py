@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+派生计数：书籍的 stackCount、策展人的 stackCount、书单的 platforms
+这些值都能从 stacks.json 的条目和 books.json 的链接算出来，不再手工维护。
+
+- 一次遍历书单建立 书籍 -> 书单数、策展人 -> 书单数 的哈希索引
+- 一次流式读取 books.json 建立 书籍 -> 平台 的索引（只读需要的书）
+- 与上次运行的状态（.cache/derived_state.json）对比，只重算成员或策展人有变化的书单；
+  books.json 本身变了（链接、新书）或没有状态文件时全部重算
+- books.json 只改 stackCount 变化的书，其余原样拷贝；stacks.json / curators.json 只改对应字段
+- 书单引用了 books.json 中没有的书时，不知道那本书的平台，该书单的 platforms 保持原值
+
+savedCount 是用户收藏数，仓库里没有数据来源，保持原值。
+
+用法：
+    python3 scripts/derived_counters.py            # 增量更新
+    python3 scripts/derived_counters.py --full     # 全部重算
+    python3 scripts/derived_counters.py --check    # 只检查，有不一致时返回 1
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from books_json import atomic_write, iter_records, patch_file
+from build_shards import BOOKS_JSON, CURATORS_JSON, STACKS_JSON
+
+STATE_PATH = Path(__file__).parent / '.cache' / 'derived_state.json'
+
+# 与 src/types/types.ts 中 Platform 的顺序一致
+PLATFORM_ORDER = (
+    'royal-road', 'spacebattles', 'sufficient-velocity', 'scribble-hub', 'ao3', 'amazon', 'personal-site',
+)
+
+RE_CURATOR_FIELD = re.compile(r'"(id|stackCount)":\s*("(?:[^"\\]|\\.)*"|-?\d+)')
+
+
+def stack_members(stack):
+    """书单中的书籍 ID（按 order 排序、去重）"""
+    entries = sorted(stack.get('entries', []), key=lambda e: e.get('order', 0))
+    return list(dict.fromkeys(entry['novelId'] for entry in entries))
+
+
+def sort_platforms(platforms):
+    rank = {platform: i for i, platform in enumerate(PLATFORM_ORDER)}
+    return sorted(set(platforms), key=lambda p: (rank.get(p, len(rank)), p))
+
+
+def stack_signature(stack):
+    """决定派生值的部分：成员和策展人"""
+    return {'members': stack_members(stack), 'curatorId': stack.get('curatorId')}
+
+
+def file_signature(path):
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def scan_books(path, ids=None):
+    """流式读取 books.json -> ({id: 平台列表}, {id: 当前 stackCount})；ids 为 None 时读全部"""
+    platforms = {}
+    counts = {}
+    for record, _ in iter_records(path):
+        book_id = record['id']
+        counts[book_id] = record.get('stackCount')
+        if ids is None or book_id in ids:
+            platforms[book_id] = [link['platform'] for link in record.get('links', [])]
+    return platforms, counts
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_state(state, path=STATE_PATH):
+    with atomic_write(path) as f:
+        json.dump(state, f, ensure_ascii=False)
+
+
+class Counters:
+    """由书单一次遍历得到的计数"""
+
+    def __init__(self, stacks):
+        self.members = {stack['id']: stack_members(stack) for stack in stacks}
+        self.novel_stacks = Counter(novel_id for ids in self.members.values() for novel_id in ids)
+        self.curator_stacks = Counter(stack.get('curatorId') for stack in stacks)
+
+
+class Update:
+    """一次计算的结果：需要写回的字段"""
+
+    def __init__(self):
+        self.novels = {}        # id -> 新 stackCount
+        self.stacks = {}        # id -> 新 platforms
+        self.curators = {}      # id -> 新 stackCount
+        self.missing = set()    # 书单引用了但 books.json 中没有的书
+        self.kept = set()       # 因缺书保留原 platforms 的书单
+        self.full = True
+
+    def __bool__(self):
+        return bool(self.novels or self.stacks or self.curators)
+
+
+def compute(stacks, curators, books_path=BOOKS_JSON, state=None):
+    """计算需要更新的派生值；state 为上次的状态，给出时只重算变化的书单"""
+    update = Update()
+    counters = Counters(stacks)
+    previous = (state or {}).get('stacks')
+    update.full = previous is None or (state or {}).get('books') != file_signature(books_path)
+
+    if update.full:
+        changed = {stack['id'] for stack in stacks}
+        affected = None
+    else:
+        changed = {s['id'] for s in stacks if previous.get(s['id']) != stack_signature(s)}
+        removed = set(previous) - {s['id'] for s in stacks}
+        # 成员有进出的书需要重新计数
+        affected = set()
+        for stack_id in changed | removed:
+            affected.update(counters.members.get(stack_id, []))
+            affected.update(previous.get(stack_id, {}).get('members', []))
+
+    needed = None if update.full else {i for s in changed for i in counters.members[s]}
+    platforms, current_counts = scan_books(books_path, needed)
+
+    for novel_id, current in current_counts.items():
+        if affected is not None and novel_id not in affected:
+            continue
+        count = counters.novel_stacks.get(novel_id, 0)
+        if current != count:
+            update.novels[novel_id] = count
+
+    for stack in stacks:
+        members = counters.members[stack['id']]
+        missing = [i for i in members if i not in current_counts]
+        update.missing.update(missing)
+        if stack['id'] not in changed:
+            continue
+        # 缺书的平台未知，重算只会丢平台，保留原值
+        if missing:
+            update.kept.add(stack['id'])
+            continue
+        value = sort_platforms(p for i in members for p in platforms.get(i, []))
+        if stack.get('platforms') != value:
+            update.stacks[stack['id']] = value
+
+    for curator in curators:
+        count = counters.curator_stacks.get(curator['id'], 0)
+        if curator.get('stackCount') != count:
+            update.curators[curator['id']] = count
+    return update
+
+
+def patch_curators_text(text, counts):
+    """只替换 curators.json 中的 stackCount 数值，保留手写格式"""
+    current = None
+
+    def replace(match):
+        nonlocal current
+        key, value = match.groups()
+        if key == 'id':
+            current = json.loads(value)
+            return match.group(0)
+        if current in counts:
+            return match.group(0)[:-len(value)] + str(counts[current])
+        return match.group(0)
+
+    return RE_CURATOR_FIELD.sub(replace, text)
+
+
+def write_json_like(path, data, original):
+    """按 indent=2 写回，保持原文件末尾是否有换行"""
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if original.endswith('\n'):
+        text += '\n'
+    with atomic_write(path) as f:
+        f.write(text)
+
+
+def update_counters(books_path=BOOKS_JSON, stacks_path=STACKS_JSON, curators_path=CURATORS_JSON,
+                    full=False, state_path=STATE_PATH):
+    """计算并写回派生计数，返回 Update"""
+    stacks_text = Path(stacks_path).read_text(encoding='utf-8')
+    curators_text = Path(curators_path).read_text(encoding='utf-8')
+    stacks_data = json.loads(stacks_text)
+    stacks = stacks_data['stacks']
+    curators = json.loads(curators_text)['curators']
+
+    update = compute(stacks, curators, books_path, None if full else load_state(state_path))
+
+    if update.novels:
+        patch_file(books_path, {i: {'stackCount': c} for i, c in update.novels.items()})
+    if update.stacks:
+        for stack in stacks:
+            if stack['id'] in update.stacks:
+                stack['platforms'] = update.stacks[stack['id']]
+        write_json_like(stacks_path, stacks_data, stacks_text)
+    if update.curators:
+        with atomic_write(curators_path) as f:
+            f.write(patch_curators_text(curators_text, update.curators))
+
+    save_state({
+        'books': file_signature(books_path),
+        'stacks': {stack['id']: stack_signature(stack) for stack in stacks},
+    }, state_path)
+    return update
+
+
+def report(update):
+    for novel_id, count in sorted(update.novels.items()):
+        print(f"   📚 {novel_id}: stackCount -> {count}")
+    for stack_id, platforms in sorted(update.stacks.items()):
+        print(f"   📋 {stack_id}: platforms -> {', '.join(platforms) or '（无）'}")
+    for curator_id, count in sorted(update.curators.items()):
+        print(f"   👤 {curator_id}: stackCount -> {count}")
+    if update.missing:
+        print(f"⚠️ 书单引用了 books.json 中没有的书: {', '.join(sorted(update.missing))}")
+    if update.kept:
+        print(f"   这些书单的 platforms 保持原值: {', '.join(sorted(update.kept))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重新计算 stackCount 与书单平台")
+    parser.add_argument('--full', action='store_true', help="忽略上次状态，全部重算")
+    parser.add_argument('--check', action='store_true', help="只检查，不写文件")
+    args = parser.parse_args()
+
+    if args.check:
+        stacks = json.loads(STACKS_JSON.read_text(encoding='utf-8'))['stacks']
+        curators = json.loads(CURATORS_JSON.read_text(encoding='utf-8'))['curators']
+        update = compute(stacks, curators)
+        report(update)
+        print("❌ 派生计数与数据不一致" if update else "✅ 派生计数一致")
+        return 1 if update else 0
+
+    update = update_counters(full=args.full)
+    report(update)
+    mode = "全部重算" if update.full else "增量"
+    print(f"✅ 派生计数已更新（{mode}）：书籍 {len(update.novels)}，书单 {len(update.stacks)}，策展人 {len(update.curators)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+在书籍数据库（rr_books.sqlite）和 Excel 之间导入导出
+抓取脚本只读写数据库，需要人工查看或整理时导出为 xlsx。
+
+用法：
+    python3 scripts/export_books.py                                  # 导出 best_rated -> rr_best_rated.xlsx
+    python3 scripts/export_books.py completed_top50 -o top50.xlsx     # 导出指定表
+    python3 scripts/export_books.py --import rr_best_rated.xlsx best_rated   # 从 xlsx 导入
+    python3 scripts/export_books.py --list                            # 查看已有的表
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from rr_db import BOOKS_DB, DEFAULT_TABLE, list_tables, read_books, write_books
+
+
+def export_table(table, output):
+    """把一张表导出为 xlsx"""
+    df = read_books(table)
+    df.to_excel(output, index=False, engine='openpyxl')
+    print(f"✅ 已导出 {len(df)} 本书: {table} -> {output}")
+
+
+def import_table(source, table):
+    """从 xlsx 导入一张表（整表替换）"""
+    df = pd.read_excel(source)
+    count = write_books(df, table)
+    print(f"✅ 已导入 {count} 本书: {source} -> {table}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="书籍数据库与 Excel 的导入导出")
+    parser.add_argument('table', nargs='?', default=DEFAULT_TABLE, help="表名")
+    parser.add_argument('-o', '--output', help="导出文件，默认 rr_<表名>.xlsx")
+    parser.add_argument('--import', dest='source', metavar='XLSX', help="从 xlsx 导入到表中")
+    parser.add_argument('--list', action='store_true', help="列出数据库中的表")
+    args = parser.parse_args()
+
+    if args.list:
+        print(f"📂 {BOOKS_DB}")
+        for table in list_tables():
+            print(f"   - {table} ({len(read_books(table))} 本)")
+        return 0
+
+    if args.source:
+        import_table(args.source, args.table)
+        return 0
+
+    output = args.output or Path(__file__).parent / f"rr_{args.table}.xlsx"
+    export_table(args.table, output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,64 +2,35 @@
 """
 高效抓取 Royal Road 书籍评分
 优化版本：减少延迟，更快完成
+异步抓取详情页，原始页面交给解析进程池，解析不再和请求抢同一批线程
 """
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import random
-import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.9',
-    'Connection': 'keep-alive'
-}
+from rr_async import AsyncFetcher, ParseStage
+from rr_db import BOOKS_DB, DEFAULT_TABLE, read_books, update_books
+from rr_history import record_snapshot
+from rr_journal import ScrapeJournal
+from rr_metrics import metrics_run
+from rr_parse import parse_fiction_page
+from rr_store import BookStore
 
+MAX_WORKERS = 3
 
-def get_book_rating(book_info):
+
+def parse_rating(content):
+    """详情页 -> 评分（在解析进程中运行）"""
+    return parse_fiction_page(content).rating
+
+
+async def get_book_rating(book_info, fetcher, parser):
     """获取单本书的评分"""
     url = book_info['url']
     title = book_info['title']
 
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # 查找评分 - Royal Road 评分在 meta 标签中
-        rating = None
-
-        # 方法1: 从 meta 标签提取
-        meta_rating = soup.find('meta', property='books:rating:value')
-        if meta_rating and meta_rating.get('content'):
-            try:
-                rating = float(meta_rating['content'])
-            except:
-                pass
-
-        # 方法2: 从 JSON-LD 提取
-        if not rating:
-            json_ld = soup.find('script', type='application/ld+json')
-            if json_ld:
-                import json
-                try:
-                    data = json.loads(json_ld.string)
-                    if 'aggregateRating' in data:
-                        rating = float(data['aggregateRating']['ratingValue'])
-                except:
-                    pass
-
-        # 方法3: 从 HTML 文本中查找
-        if not rating:
-            # 查找 books:rating:value 格式
-            pattern = r'books:rating:value"\s+content="(\d+\.\d+)"'
-            match = re.search(pattern, str(soup))
-            if match:
-                rating = float(match.group(1))
+        content = await fetcher.fetch(url)
+        rating = await parser.parse(parse_rating, content)
 
         return {
             'url': url,
@@ -78,6 +49,14 @@ def get_book_rating(book_info):
         }
 
 
+async def fetch_all_ratings(books, on_result, concurrency=MAX_WORKERS, workers=None):
+    """并发抓取（限制并发数为3，避免被封），每完成一本调用 on_result(序号, 结果)"""
+    async with AsyncFetcher(concurrency=concurrency, timeout=15) as fetcher, ParseStage(workers) as parser:
+        tasks = [get_book_rating(book, fetcher, parser) for book in books]
+        for i, task in enumerate(asyncio.as_completed(tasks), 1):
+            on_result(i, await task)
+
+
 def main():
     """主函数"""
     print("=" * 80)
@@ -85,54 +64,45 @@ def main():
     print("=" * 80)
 
     # 读取数据
-    input_file = '/Users/chengwen/Projects/solo-sonar/scripts/rr_best_rated.xlsx'
-    print(f"\n📂 读取文件: {input_file}")
+    table = DEFAULT_TABLE
+    print(f"\n📂 读取数据库: {BOOKS_DB.name} / {table}")
 
-    df = pd.read_excel(input_file)
+    store = BookStore(read_books(table))
+    df = store.frame()
     print(f"✅ 读取成功，共 {len(df)} 本书")
 
-    # 准备数据
-    books = df[['title', 'url']].to_dict('records')
+    # 准备数据；进度日志中已有评分的书不再请求
+    journal = ScrapeJournal('fetch_ratings')
+    ratings = {book['url']: journal.get(book['url']) for book in df[['url']].to_dict('records')
+               if book['url'] in journal}
+    books = [book for book in df[['title', 'url']].to_dict('records') if book['url'] not in ratings]
 
     print(f"\n🚀 开始抓取评分...")
     print(f"⏱ 预计完成时间: {len(books) * 3 / 60:.1f} 分钟")
 
-    ratings = {}
-    success_count = 0
+    success_count = len(ratings)
     fail_count = 0
 
-    # 使用线程池并发抓取（限制并发数为3，避免被封）
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        # 提交所有任务
-        future_to_book = {executor.submit(get_book_rating, book): book for book in books}
-
-        # 处理完成的任务
-        for i, future in enumerate(as_completed(future_to_book), 1):
-            try:
-                result = future.result()
-
-                if result['success']:
-                    ratings[result['url']] = result['rating']
-                    if result['rating']:
-                        success_count += 1
-                        print(f"[{i}/{len(books)}] ✅ {result['title'][:30]:<30} 评分: {result['rating']}")
-                    else:
-                        fail_count += 1
-                        print(f"[{i}/{len(books)}] ⚠️ {result['title'][:30]:<30} 未找到评分")
-                else:
-                    ratings[result['url']] = None
-                    fail_count += 1
-                    print(f"[{i}/{len(books)}] ❌ {result['title'][:30]:<30} 失败: {result.get('error', 'Unknown')[:20]}")
-
-                # 添加小延迟，避免请求过快
-                time.sleep(random.uniform(0.5, 1.5))
-
-            except Exception as e:
+    def on_result(i, result):
+        nonlocal success_count, fail_count
+        if result['success']:
+            ratings[result['url']] = result['rating']
+            if result['rating']:
+                journal.record(result['url'], result['rating'])
+                success_count += 1
+                print(f"[{i}/{len(books)}] ✅ {result['title'][:30]:<30} 评分: {result['rating']}")
+            else:
                 fail_count += 1
-                print(f"[{i}/{len(books)}] ❌ 处理失败: {e}")
+                print(f"[{i}/{len(books)}] ⚠️ {result['title'][:30]:<30} 未找到评分")
+        else:
+            ratings[result['url']] = None
+            fail_count += 1
+            print(f"[{i}/{len(books)}] ❌ {result['title'][:30]:<30} 失败: {result.get('error', 'Unknown')[:20]}")
+
+    asyncio.run(fetch_all_ratings(books, on_result))
 
     # 添加评分列
-    df['platformRating'] = df['url'].map(ratings)
+    df['platformRating'] = store.map(ratings).to_numpy()
 
     # 调整列顺序
     if 'notes' in df.columns:
@@ -156,10 +126,11 @@ def main():
     df = df[columns_order]
 
     # 保存文件
-    output_file = input_file
-    print(f"\n💾 正在保存到 {output_file}...")
-    df.to_excel(output_file, index=False, engine='openpyxl')
+    print(f"\n💾 正在更新数据库中的评分列...")
+    update_books(df, ['platformRating'], table)
+    record_snapshot({'url': url, 'platformRating': rating} for url, rating in ratings.items())
     print("✅ 保存成功！")
+    journal.finish()
 
     # 显示统计
     print("\n" + "=" * 80)
@@ -181,7 +152,8 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        with metrics_run('fetch_ratings'):
+            main()
     except KeyboardInterrupt:
         print("\n\n⚠️ 用户中断")
     except Exception as e:
@@ -1,68 +1,220 @@
 #!/usr/bin/env python3
-"""创建 ID 到图片文件名的映射"""
+"""
+创建 ID 到图片文件名的映射（data/image_mapping.json）
+- 对封面文件名只建一次索引：规范化 slug（去序号、去系列前缀的后缀形式）-> 图片，词 -> 图片
+- 每本书只从索引里取候选（slug 相同、首词相同、共享大部分词），用编辑距离相似度和前缀包含打分，
+  不再逐本扫描全部文件
+- 全部 (书, 图片) 候选按得分统一分配，一张图只给一本书；结果与文件顺序无关
+- 最高分和次高分接近的书、最佳图片被别的书占用的书单独列出，便于人工确认
 
-import pandas as pd
-import os
+用法：
+    python3 scripts/map_images.py                          # 书目取自 data/books.json
+    python3 scripts/map_images.py --excel books.xlsx       # 书目取自 Excel（id、title 列）
+"""
+
+import argparse
 import json
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from books_json import atomic_write, iter_records
+from build_shards import BOOKS_JSON, ROOT
+from search_index import edit_distance, tokenize
+
+COVERS_DIR = ROOT / 'public' / 'covers'
+OUTPUT_PATH = ROOT / 'data' / 'image_mapping.json'
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.webp')
+
+# 低于该得分不匹配
+MIN_SCORE = 0.8
+# 最高分与次高分相差不到该值时报告为有歧义
+AMBIGUITY_MARGIN = 0.04
+# 文件名去掉前面 n 个词（系列前缀，如 worm-、wildbow-1-）后的形式，得分乘以 SUFFIX_WEIGHT ** n
+SUFFIX_WEIGHT = 0.95
+# 一方的词是另一方开头（如 cordyceps 与 cordyceps-too-clever-...）时的得分
+PREFIX_WEIGHT = 0.85
+
+STOPWORDS = frozenset({'a', 'an', 'the', 'of', 'and', 'to', 'in', 'for', 'on'})
+
+
+def words(tokens):
+    """去掉纯数字（系列序号）"""
+    return [t for t in tokens if not t.isdigit()]
+
+
+def image_keys(stem):
+    """文件名的各种规范化形式 -> [(词列表, 权重)]"""
+    tokens = tokenize(stem)
+    plain = words(tokens)
+    keys = {tuple(tokens): 1.0, tuple(plain): 1.0}
+    for i in range(1, len(plain)):
+        keys.setdefault(tuple(plain[i:]), SUFFIX_WEIGHT ** i)
+    return [(list(k), w) for k, w in keys.items() if k]
+
+
+def book_keys(book_id, title):
+    keys = {tuple(tokenize(book_id.replace('-', ' '))), tuple(tokenize(title))}
+    return [list(k) for k in keys if k]
+
+
+def similarity(a, b, floor=MIN_SCORE):
+    """两组词的相似度：slug 的编辑距离相似度，或一方是另一方开头时的前缀得分；不到 floor 时返回 0"""
+    if a == b:
+        return 1.0
+    short, long = (a, b) if len(a) <= len(b) else (b, a)
+    prefix = PREFIX_WEIGHT if long[:len(short)] == short and any(t not in STOPWORDS for t in short) else 0.0
+    floor = max(floor, prefix)
+    x, y = '-'.join(a), '-'.join(b)
+    length = max(len(x), len(y))
+    # 相似度 > floor 要求编辑距离 < (1 - floor) * 长度，长度差已超出时不必计算
+    limit = int(length * (1 - floor))
+    if abs(len(x) - len(y)) > limit:
+        return prefix
+    distance = edit_distance(x, y, limit)
+    edit = 1 - distance / length if distance <= limit else 0.0
+    return max(edit, prefix)
+
+
+class CoverIndex:
+    """封面文件名索引"""
+
+    def __init__(self, files):
+        self.files = sorted(files)
+        self.keys = {}
+        self.exact = defaultdict(list)    # slug -> [(文件, 权重)]
+        self.prefixes = defaultdict(set)  # 完整 slug 的各个词前缀 -> {文件}
+        self.tokens = defaultdict(set)    # 词 -> {文件}
+        for name in self.files:
+            keys = image_keys(Path(name).stem)
+            self.keys[name] = keys
+            for key, weight in keys:
+                self.exact['-'.join(key)].append((name, weight))
+                if weight == 1.0:
+                    for i in range(1, len(key)):
+                        self.prefixes['-'.join(key[:i])].add(name)
+            for token in words(tokenize(Path(name).stem)):
+                if token not in STOPWORDS:
+                    self.tokens[token].add(name)
+
+    @classmethod
+    def from_dir(cls, path=COVERS_DIR):
+        return cls(p.name for p in Path(path).iterdir() if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+
+    def candidates(self, keys):
+        """slug 相同、一方是另一方开头，或共享至少三分之二的词的文件"""
+        found = set()
+        for key in keys:
+            slug = '-'.join(key)
+            found.update(self.prefixes.get(slug, ()))
+            for i in range(1, len(key) + 1):
+                found.update(name for name, _ in self.exact.get('-'.join(key[:i]), ()))
+            distinct = {t for t in words(key) if t not in STOPWORDS}
+            need = max(1, -(-2 * len(distinct) // 3))
+            shared = Counter(name for t in distinct for name in self.tokens.get(t, ()))
+            found.update(name for name, count in shared.items() if count >= need)
+        return found
 
-# 读取 Excel
-excel_path = "/Users/chengwen/Documents/Sonar files/SB+SV+Sites-books_final.xlsx"
-df = pd.read_excel(excel_path)
-
-# 读取本地图片文件
-covers_dir = "/Users/chengwen/Projects/solo-sonar/public/covers"
-image_files = [f for f in os.listdir(covers_dir) if f.endswith('.png')]
-
-# 创建映射
-id_to_image = {}
-
-for _, row in df.iterrows():
-    book_id = str(row['id']).lower().replace(' ', '-')
-    title = str(row['title']).lower()
-
-    # 尝试多种匹配方式
-    matched_image = None
-
-    # 1. 精确匹配 ID
-    exact_match = f"{book_id}.png"
-    if exact_match in image_files:
-        matched_image = exact_match
-
-    # 2. 模糊匹配：文件名包含 ID，或处理序号问题
-    if not matched_image:
-        for img in image_files:
-            img_name = img.lower().replace('.png', '')
-            # 处理特殊情况：the-last-angel-2-ascension 匹配 the-last-angel-ascension
-            img_normalized = img_name.replace('-2-', '-').replace('-3-', '-').replace('-1-', '-')
-            if book_id in img_name or img_normalized == book_id or img_name in book_id:
-                matched_image = img
+    def score(self, keys, name):
+        """各形式两两比较取最高；权重不可能超过当前最高分的形式不再比较"""
+        best = 0.0
+        for image_key, weight in sorted(self.keys[name], key=lambda k: -k[1]):
+            if weight <= best or weight < MIN_SCORE:
                 break
+            for key in keys:
+                best = max(best, weight * similarity(key, image_key, max(MIN_SCORE, best) / weight))
+        return best
+
+    def ranked(self, book_id, title):
+        """[(得分, 文件)]，按得分从高到低、同分按文件名"""
+        keys = book_keys(book_id, title)
+        scored = ((self.score(keys, name), name) for name in self.candidates(keys))
+        return sorted(((s, n) for s, n in scored if s >= MIN_SCORE), key=lambda x: (-x[0], x[1]))
+
+
+class MatchResult:
+    def __init__(self):
+        self.mapping = {}         # id -> 文件名或 None
+        self.scores = {}
+        self.ambiguous = {}       # id -> [(得分, 文件)]
+        self.displaced = {}       # id -> (最佳文件, 占用它的书)
+
+
+def match_covers(books, index):
+    """books 为 [(id, title)]；一张图只分配给得分最高的书（同分按 ID）"""
+    ranked = {book_id: index.ranked(book_id, title) for book_id, title in books}
+    result = MatchResult()
+    for book_id, options in ranked.items():
+        if len(options) > 1 and options[0][0] - options[1][0] < AMBIGUITY_MARGIN:
+            result.ambiguous[book_id] = options[:3]
+
+    pairs = sorted((-score, book_id, name) for book_id, options in ranked.items() for score, name in options)
+    owner = {}
+    for negative, book_id, name in pairs:
+        if book_id in result.mapping or name in owner:
+            continue
+        owner[name] = book_id
+        result.mapping[book_id] = name
+        result.scores[book_id] = -negative
+
+    for book_id, options in ranked.items():
+        if options and result.mapping.get(book_id) != options[0][1]:
+            result.displaced[book_id] = (options[0][1], owner[options[0][1]])
+        result.mapping.setdefault(book_id, None)
+    return result
+
+
+def read_books(excel=None, path=BOOKS_JSON):
+    """[(id, title)]，保持原顺序"""
+    if excel:
+        import pandas as pd
+        df = pd.read_excel(excel)
+        ids = df['id'].astype(str).str.lower().str.replace(' ', '-')
+        return list(zip(ids, df['title'].astype(str)))
+    return [(novel['id'], novel.get('title', '')) for novel, _ in iter_records(path)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="为书籍匹配 public/covers 中的封面文件")
+    parser.add_argument('--excel', help="从 Excel 读取书目（默认 data/books.json）")
+    parser.add_argument('--covers', default=str(COVERS_DIR), help="封面目录")
+    parser.add_argument('-o', '--output', default=str(OUTPUT_PATH), help="输出文件")
+    parser.add_argument('--quiet', action='store_true', help="不逐本打印匹配结果")
+    args = parser.parse_args()
+
+    books = read_books(args.excel)
+    index = CoverIndex.from_dir(args.covers)
+    result = match_covers(books, index)
+
+    if not args.quiet:
+        for book_id, title in books:
+            name = result.mapping[book_id]
+            if name:
+                print(f"✓ {book_id} -> {name} ({result.scores[book_id]:.2f})")
+            else:
+                print(f"✗ {book_id} ({title}) - NO MATCH")
+
+    id_to_image = {book_id: f"/covers/{name}" if name else None for book_id, name in result.mapping.items()}
+    with atomic_write(args.output) as f:
+        json.dump(id_to_image, f, ensure_ascii=False, indent=2)
+
+    matched = sum(1 for v in id_to_image.values() if v)
+    print(f"\n映射已保存到 {args.output}")
+    print(f"总计: {len(id_to_image)} 本书")
+    print(f"有图片: {matched} 本")
+    print(f"无图片: {len(id_to_image) - matched} 本")
+    print(f"未使用的图片: {len(index.files) - matched} 张")
+
+    if result.ambiguous:
+        print(f"\n⚠️ 有歧义的匹配（最高分与次高分相差不到 {AMBIGUITY_MARGIN}）:")
+        for book_id, options in sorted(result.ambiguous.items()):
+            print(f"   {book_id}: " + ', '.join(f"{name} ({score:.2f})" for score, name in options))
+    if result.displaced:
+        print("\n⚠️ 最佳图片已分配给其他书:")
+        for book_id, (name, owner) in sorted(result.displaced.items()):
+            print(f"   {book_id}: {name} -> 已给 {owner}，改用 {result.mapping[book_id] or '无'}")
+    return 0
+
 
-    # 3. 模糊匹配：文件名包含标题关键词
-    if not matched_image:
-        title_words = title.split()
-        for img in image_files:
-            img_name = img.lower().replace('.png', '')
-            # 检查是否包含主要关键词
-            if len(title_words) > 0:
-                first_word = title_words[0]
-                if first_word in img_name and len(first_word) > 3:
-                    matched_image = img
-                    break
-
-    if matched_image:
-        id_to_image[book_id] = f"/covers/{matched_image}"
-        print(f"✓ {book_id} -> {matched_image}")
-    else:
-        print(f"✗ {book_id} ({row['title']}) - NO MATCH")
-        id_to_image[book_id] = None
-
-# 保存映射
-output_path = "/Users/chengwen/Projects/solo-sonar/data/image_mapping.json"
-with open(output_path, 'w', encoding='utf-8') as f:
-    json.dump(id_to_image, f, ensure_ascii=False, indent=2)
-
-print(f"\n映射已保存到 {output_path}")
-print(f"总计: {len(id_to_image)} 本书")
-print(f"有图片: {sum(1 for v in id_to_image.values() if v)} 本")
-print(f"无图片: {sum(1 for v in id_to_image.values() if not v)} 本")
+if __name__ == "__main__":
+    sys.exit(main())
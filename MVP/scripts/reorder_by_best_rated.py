@@ -4,74 +4,33 @@
 使用非常保守的策略以避免被网站封禁
 """
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import random
 import re
-from urllib.parse import urljoin
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
-# User-Agent 模拟浏览器访问
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.9',
-    'Accept-Encoding': 'gzip, deflate, br',
-    'Connection': 'keep-alive',
-    'Upgrade-Insecure-Requests': '1'
-}
-
-BASE_URL = "https://www.royalroad.com"
-
 
-def create_session():
-    """创建带重试机制的 Session"""
-    session = requests.Session()
-
-    retry_strategy = Retry(
-        total=5,
-        backoff_factor=10,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["HEAD", "GET", "OPTIONS"]
-    )
+from bs4 import BeautifulSoup
 
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    session.headers.update(HEADERS)
+from rr_db import BOOKS_DB, DEFAULT_TABLE, read_books, write_books
+from rr_http import BASE_URL, fetch, get_session
+from rr_journal import ScrapeJournal
+from rr_ratelimit import configure_limiter
+from rr_store import BookStore
 
-    return session
 
+# 非常保守：起步约 25 秒一个请求，最快 20 秒一个
+START_RATE = 1 / 25
+MAX_RATE = 1 / 20
 
-def get_soup(session, url, retry_count=3):
-    """获取页面并返回 BeautifulSoup 对象"""
-    for attempt in range(retry_count):
-        try:
-            response = session.get(url, timeout=30)
-            response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
-        except Exception as e:
-            print(f"    ❌ 请求失败 (尝试 {attempt + 1}/{retry_count}): {e}")
-            if attempt < retry_count - 1:
-                wait_time = (attempt + 1) * 15
-                print(f"    ⏱ 等待 {wait_time} 秒后重试...")
-                time.sleep(wait_time)
-            else:
-                raise
 
+def get_soup(session, url):
+    """获取页面并返回 BeautifulSoup 对象（重试和等待由 fetch 与限速器负责）"""
+    response = fetch(url, timeout=30, session=session)
+    return BeautifulSoup(response.content, 'lxml')
 
-def random_delay(min_sec=20, max_sec=30):
-    """随机延迟，避免被封"""
-    delay = random.uniform(min_sec, max_sec)
-    print(f"    ⏱ 等待 {delay:.1f} 秒...")
-    time.sleep(delay)
 
+def get_best_rated_order(session, journal=None):
+    """获取 Best Rated 榜单的书籍顺序（前8页）
 
-def get_best_rated_order(session):
-    """获取 Best Rated 榜单的书籍顺序（前8页）"""
+    传入 journal 时，每页的小说 ID 列表抓取后立即写入日志，重新运行时跳过已完成的页
+    """
     print("🚀 正在获取 Best Rated 榜单顺序...")
     print("=" * 80)
 
@@ -83,6 +42,13 @@ def get_best_rated_order(session):
 
         url = f"{BASE_URL}/fictions/best-rated?page={page}"
 
+        if journal is not None and url in journal:
+            unique_ids = journal.get(url)
+            for fiction_id in unique_ids:
+                ordered_books.setdefault(f"{BASE_URL}/fiction/{fiction_id}", len(ordered_books) + 1)
+            print(f"    ♻️ 已从进度日志恢复 {len(unique_ids)} 本，累计 {len(ordered_books)} 本")
+            continue
+
         try:
             soup = get_soup(session, url)
 
@@ -92,6 +58,8 @@ def get_best_rated_order(session):
 
             # 去重
             unique_ids = list(dict.fromkeys(fiction_ids))
+            if journal is not None and unique_ids:
+                journal.record(url, unique_ids)
 
             for fiction_id in unique_ids:
                 full_url = f"{BASE_URL}/fiction/{fiction_id}"
@@ -115,10 +83,6 @@ def get_best_rated_order(session):
             print(f"    ❌ 第 {page} 页抓取失败: {e}")
             continue
 
-        # 页面之间延迟
-        if page < 8:
-            random_delay()
-
     print(f"\n✅ 共获取 {len(ordered_books)} 本书的榜单顺序")
     return ordered_books
 
@@ -130,21 +94,30 @@ def main():
     print("=" * 80)
 
     # 读取现有的 Excel 文件
-    input_file = '/Users/chengwen/Projects/solo-sonar/scripts/rr_best_rated.xlsx'
-    print(f"\n📂 读取文件: {input_file}")
+    table = DEFAULT_TABLE
+    print(f"\n📂 读取数据库: {BOOKS_DB.name} / {table}")
 
-    df = pd.read_excel(input_file)
+    store = BookStore(read_books(table))
+    df = store.frame()
     print(f"✅ 读取成功，共 {len(df)} 本书")
 
     # 创建 Session
-    session = create_session()
+    session = get_session()
     print("✅ 已创建 HTTP Session")
 
-    # 获取 Best Rated 榜单的原始顺序
-    ordered_books = get_best_rated_order(session)
+    # 之后由限速器根据响应在 START_RATE 与 MAX_RATE 之间调整
+    configure_limiter(start_rate=START_RATE, max_rate=MAX_RATE)
+
+    # 获取 Best Rated 榜单的原始顺序（进度日志保证中断后不必从头再来）
+    journal = ScrapeJournal('reorder_best_rated')
+    try:
+        ordered_books = get_best_rated_order(session, journal)
+    finally:
+        journal.close()
 
     # 为每本书添加榜单排名
-    df['best_rank'] = df['url'].map(ordered_books)
+    # 榜单 URL 不带 slug，按小说 ID 匹配
+    df['best_rank'] = store.map(ordered_books).to_numpy()
 
     # 统计有多少本书找到了排名
     found_rank = df['best_rank'].notna().sum()
@@ -178,11 +151,11 @@ def main():
     df_sorted = df_sorted[columns_order]
 
     # 保存更新后的文件
-    output_file = input_file
-    print(f"\n💾 正在保存到 {output_file}...")
+    print(f"\n💾 正在保存到 {BOOKS_DB.name} / {table}...")
 
-    df_sorted.to_excel(output_file, index=False, engine='openpyxl')
+    write_books(df_sorted, table)
     print("✅ 保存成功！")
+    journal.finish()
 
     # 显示预览
     print("\n" + "=" * 80)
@@ -192,7 +165,7 @@ def main():
 
     print("\n" + "=" * 80)
     print("✅ 完成！")
-    print(f"📁 文件已更新: {output_file}")
+    print(f"📁 数据库已更新: {BOOKS_DB.name} / {table}（导出 Excel: python3 scripts/export_books.py）")
     print(f"📚 共 {len(df_sorted)} 本书")
     print(f"📈 按 Best Rated 榜单顺序排列")
     print("=" * 80)
@@ -4,72 +4,30 @@
 只处理那些 platformRating 为空的书
 """
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import random
-import re
-import json
-
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.9',
-    'Connection': 'keep-alive'
-}
+from rr_db import BOOKS_DB, DEFAULT_TABLE, read_books, update_books
+from rr_history import record_snapshot
+from rr_http import fetch
+from rr_metrics import metrics_run
+from rr_parse import parse_fiction_page
+from rr_ratelimit import configure_limiter
+from rr_store import BookStore
+
+
+# 这些书之前抓取失败过：起步约 7 秒一个请求，最快 5 秒一个
+START_RATE = 1 / 7
+MAX_RATE = 1 / 5
 
 
 def get_book_rating(url, title):
-    """获取单本书的评分"""
+    """获取单本书的评分（重试和等待由 fetch 与限速器负责）"""
     try:
-        # 增加超时时间和重试
-        for attempt in range(3):
-            try:
-                response = requests.get(url, headers=HEADERS, timeout=30)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                rating = None
-
-                # 方法1: 从 meta 标签提取
-                meta_rating = soup.find('meta', property='books:rating:value')
-                if meta_rating and meta_rating.get('content'):
-                    rating = float(meta_rating['content'])
-
-                # 方法2: 从 JSON-LD 提取
-                if not rating:
-                    json_ld = soup.find('script', type='application/ld+json')
-                    if json_ld:
-                        try:
-                            data = json.loads(json_ld.string)
-                            if 'aggregateRating' in data:
-                                rating = float(data['aggregateRating']['ratingValue'])
-                        except:
-                            pass
-
-                # 方法3: 从 HTML 文本中查找
-                if not rating:
-                    pattern = r'books:rating:value"\s+content="(\d+\.\d+)"'
-                    match = re.search(pattern, str(soup))
-                    if match:
-                        rating = float(match.group(1))
-
-                return {
-                    'url': url,
-                    'title': title,
-                    'rating': rating,
-                    'success': True
-                }
-
-            except requests.exceptions.RequestException as e:
-                if attempt < 2:
-                    # 失败后等待更长时间
-                    wait_time = (attempt + 1) * 10
-                    print(f"      ⚠️ 连接失败，等待 {wait_time} 秒后重试...")
-                    time.sleep(wait_time)
-                else:
-                    raise
+        response = fetch(url, timeout=30)
+        return {
+            'url': url,
+            'title': title,
+            'rating': parse_fiction_page(response.content).rating,
+            'success': True
+        }
 
     except Exception as e:
         return {
@@ -88,10 +46,11 @@ def main():
     print("=" * 80)
 
     # 读取数据
-    input_file = '/Users/chengwen/Projects/solo-sonar/scripts/rr_best_rated.xlsx'
-    print(f"\n📂 读取文件: {input_file}")
+    table = DEFAULT_TABLE
+    print(f"\n📂 读取数据库: {BOOKS_DB.name} / {table}")
 
-    df = pd.read_excel(input_file)
+    store = BookStore(read_books(table))
+    df = store.frame()
     print(f"✅ 读取成功，共 {len(df)} 本书")
 
     # 检查哪些书没有评分
@@ -108,7 +67,9 @@ def main():
         return
 
     print(f"\n🚀 开始重新抓取 {len(missing_ratings)} 本书的评分...")
-    print(f"⏱ 预计完成时间: {len(missing_ratings) * 15 / 60:.1f} 分钟")
+
+    configure_limiter(start_rate=START_RATE, max_rate=MAX_RATE)
+    print(f"⏱ 预计完成时间: {len(missing_ratings) / MAX_RATE / 60:.1f}~{len(missing_ratings) / START_RATE / 60:.1f} 分钟")
 
     ratings_map = {}
     success_count = 0
@@ -135,20 +96,14 @@ def main():
             fail_count += 1
             print(f"      ❌ 失败: {result.get('error', 'Unknown')[:40]}")
 
-        # 添加延迟，避免请求过快
-        if i < len(missing_ratings):
-            delay = random.uniform(5, 10)
-            print(f"      ⏱ 等待 {delay:.1f} 秒...")
-            time.sleep(delay)
-
-    # 更新数据
-    for url, rating in ratings_map.items():
-        df.loc[df['url'] == url, 'platformRating'] = rating
+    # 按小说 ID 一次性合并
+    store.upsert({url: {'platformRating': rating} for url, rating in ratings_map.items()})
+    df = store.frame()
 
     # 保存文件
-    output_file = input_file
-    print(f"\n💾 正在保存到 {output_file}...")
-    df.to_excel(output_file, index=False, engine='openpyxl')
+    print(f"\n💾 正在更新数据库中的评分列...")
+    update_books(df, ['platformRating'], table)
+    record_snapshot({'url': url, 'platformRating': rating} for url, rating in ratings_map.items())
     print("✅ 保存成功！")
 
     # 显示统计
@@ -179,7 +134,8 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        with metrics_run('retry_missing_ratings'):
+            main()
     except KeyboardInterrupt:
         print("\n\n⚠️ 用户中断")
     except Exception as e:
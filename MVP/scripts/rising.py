@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+首页“上升中”书单（data/rising.json）
+只读 rr_history.py 的历史快照，不需要重新抓取：
+- 每本书按链接中的 Royal Road 小说 ID 取最近 N 天的关注（或浏览）增长
+- 书单的增长率 = 成员增长之和 / 窗口开始时成员的总数，至少有 MIN_TRACKED 本成员有历史才参与排序
+
+用法：
+    python3 scripts/rising.py                        # 最近 7 天的关注增长
+    python3 scripts/rising.py --days 30 --stat views
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from books_json import atomic_write
+from build_shards import RISING_JSON, Catalog
+from derived_counters import stack_members
+from rr_history import COUNTERS, HISTORY_DB, growth
+from rr_store import fiction_id
+
+RISING_NOVELS = 20
+RISING_STACKS = 6
+# 书单至少要有几本成员有历史记录
+MIN_TRACKED = 2
+
+
+def novel_fiction_id(novel):
+    """书籍链接里的 Royal Road 小说 ID，没有时返回 None"""
+    for link in novel.get('links', []):
+        book_id = fiction_id(link.get('url'))
+        if book_id is not None:
+            return book_id
+    return None
+
+
+def build_rising(catalog, changes, novels=RISING_NOVELS, stacks=RISING_STACKS):
+    """changes 为 rr_history.growth 的结果，返回 {novels, stacks}"""
+    by_fiction = {int(row.fictionId): row for row in changes.itertuples(index=False)}
+    tracked = {}
+    for novel in catalog.novels:
+        book_id = novel_fiction_id(novel)
+        if book_id in by_fiction:
+            row = by_fiction[book_id]
+            tracked[novel['id']] = {'id': novel['id'], 'fictionId': book_id, 'before': int(row.before),
+                                    'after': int(row.after), 'gained': int(row.gained)}
+
+    rising_novels = sorted((n for n in tracked.values() if n['gained'] > 0), key=lambda n: -n['gained'])
+
+    rising_stacks = []
+    for stack in catalog.stacks:
+        members = [tracked[m] for m in stack_members(stack) if m in tracked]
+        before = sum(m['before'] for m in members)
+        gained = sum(m['gained'] for m in members)
+        if len(members) < MIN_TRACKED or before <= 0 or gained <= 0:
+            continue
+        members.sort(key=lambda m: -m['gained'])
+        rising_stacks.append({
+            'id': stack['id'],
+            'gained': gained,
+            'growth': round(gained / before, 4),
+            'tracked': len(members),
+            'novels': [m['id'] for m in members if m['gained'] > 0],
+        })
+    rising_stacks.sort(key=lambda s: (-s['growth'], -s['gained']))
+    return {'novels': rising_novels[:novels], 'stacks': rising_stacks[:stacks]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="根据历史快照计算首页上升中的书单")
+    parser.add_argument('--db', default=str(HISTORY_DB), help="历史数据库")
+    parser.add_argument('--days', type=int, default=7, help="时间窗口（天）")
+    parser.add_argument('--stat', default='followers', choices=COUNTERS, help="按哪项计数的增长排序")
+    parser.add_argument('-o', '--output', default=str(RISING_JSON), help="输出文件")
+    args = parser.parse_args()
+
+    if Path(args.db).exists():
+        rising = build_rising(Catalog.load(), growth(args.stat, args.days, path=args.db))
+    else:
+        print(f"⚠️ 没有历史数据库 {args.db}，输出空列表（运行抓取或评分脚本后会自动记录）")
+        rising = {'novels': [], 'stacks': []}
+    with atomic_write(args.output) as f:
+        json.dump({'days': args.days, 'stat': args.stat, **rising}, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+    print(f"✅ 已写入 {args.output}")
+    print(f"   最近 {args.days} 天 {args.stat} 上升: {len(rising['novels'])} 本书，{len(rising['stacks'])} 个书单")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
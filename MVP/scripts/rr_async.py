@@ -0,0 +1,238 @@
+"""
+Royal Road 异步抓取引擎
+列表页解析与详情页抓取流水线并行，用信号量限制并发、自适应限速器控制每个主机的请求速率
+传入 ParseStage 时 HTML 解析在进程池中进行，不占用事件循环，吞吐随 CPU 核数增长
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from rr_cache import CacheMiss, get_cache
+from rr_http import HEADERS, RETRY_STATUS
+from rr_metrics import CACHE_BYPASS, CACHE_HIT, CACHE_MISS, CACHE_REVALIDATED, get_metrics, timed_extractor
+from rr_ratelimit import get_limiter
+from rr_store import fiction_id
+
+# 默认并发数，速率由共享的自适应限速器控制
+CONCURRENCY = 4
+
+
+# 每个解析进程排队的页面数，超出后抓取端等待（限制内存中的原始页面数量）
+QUEUE_PER_WORKER = 4
+
+
+@timed_extractor
+def list_records(content, find_cards, extract_card):
+    """解析列表页原始字节，返回书籍字典列表（在解析进程中运行）"""
+    soup = BeautifulSoup(content, 'lxml')
+    books = (extract_card(elem) for elem in find_cards(soup))
+    return [book for book in books if book and book['url']]
+
+
+def _run_timed(func, content):
+    """在解析进程中运行 func，连同解析耗时一起返回"""
+    start = time.perf_counter()
+    result = func(content)
+    return result, time.perf_counter() - start
+
+
+def _extractor_name(func):
+    return getattr(getattr(func, 'func', func), '__name__', repr(func))
+
+
+class ParseStage:
+    """解析阶段：抓取端把原始字节放进有界队列，解析进程池取出解析并返回精简结果
+
+    func 需是模块级函数（或其 partial），以便传给子进程；需在 async with 中使用
+    """
+
+    def __init__(self, workers=None, queue_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.workers * QUEUE_PER_WORKER
+        self.pool = None
+        self.queue = None
+        self.tasks = []
+        self.parsed = 0
+
+    async def __aenter__(self):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, *exc):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            func, content, future, queued = await self.queue.get()
+            try:
+                result, seconds = await loop.run_in_executor(self.pool, _run_timed, func, content)
+                get_metrics().parse(_extractor_name(func), seconds, len(content),
+                                    queued=time.perf_counter() - queued - seconds)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.parsed += 1
+                self.queue.task_done()
+
+    async def parse(self, func, content):
+        """排队解析 content，队列满时等待"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((func, content, future, time.perf_counter()))
+        return await future
+
+
+class AsyncFetcher:
+    """异步抓取器，需在 async with 中使用"""
+
+    def __init__(self, concurrency=CONCURRENCY, limiter=None, cache=None, use_cache=True,
+                 retry_count=5, timeout=30, session=None):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = limiter or get_limiter()
+        self.cache = (cache or get_cache()) if use_cache else None
+        self.retry_count = retry_count
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = session
+        self._owns_session = session is None
+
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(headers=HEADERS, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._owns_session:
+            await self.session.close()
+
+    async def fetch(self, url):
+        """抓取页面并返回原始字节
+
+        优先使用缓存（过期时发条件请求重新验证），遇到限流或服务端错误时由限速器降速后重试
+        """
+        metrics = get_metrics()
+        entry = self.cache.get(url) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            metrics.request(url, 200, len(entry.content), cache=CACHE_HIT)
+            return entry.content
+        if self.cache and self.cache.offline:
+            raise CacheMiss(f"离线模式缓存未命中: {url}")
+        headers = entry.conditional_headers() if entry else {}
+        fetched = CACHE_MISS if self.cache else CACHE_BYPASS
+
+        waited = 0.0
+        network = 0.0
+        for attempt in range(self.retry_count):
+            waited += await self.limiter.wait_async(url)
+            async with self.semaphore:
+                sent = time.perf_counter()
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        self.limiter.record(url, response.status, response.headers.get('Retry-After'))
+                        if response.status == 304 and entry:
+                            network += time.perf_counter() - sent
+                            metrics.request(url, 304, len(entry.content), network, waited, attempt, CACHE_REVALIDATED)
+                            self.cache.touch(url)
+                            return entry.content
+                        if response.status not in RETRY_STATUS:
+                            if not response.ok:
+                                metrics.request(url, response.status, 0, network + time.perf_counter() - sent,
+                                                waited, attempt, fetched, f"HTTP {response.status}")
+                            response.raise_for_status()
+                            content = await response.read()
+                            network += time.perf_counter() - sent
+                            metrics.request(url, response.status, len(content), network, waited, attempt, fetched)
+                            if self.cache and response.status == 200:
+                                self.cache.put(url, content, response.headers)
+                            return content
+                        error = f"HTTP {response.status}"
+                except aiohttp.ClientResponseError:
+                    raise
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self.limiter.record(url, None)
+                    error = str(e) or type(e).__name__
+                network += time.perf_counter() - sent
+            print(f"    ❌ 请求失败 (尝试 {attempt + 1}/{self.retry_count}): {error}")
+        metrics.request(url, None, 0, network, waited, self.retry_count - 1, fetched, error)
+        raise aiohttp.ClientError(f"{url}: {error}")
+
+    async def get_soup(self, url):
+        """获取页面并返回 BeautifulSoup 对象"""
+        content = await self.fetch(url)
+        return BeautifulSoup(content, 'lxml')
+
+    async def scrape_list(self, list_urls, find_cards, extract_card, parse_details, journal=None, reuse=None,
+                          parser=None):
+        """抓取列表页，并为每本书抓取详情页
+
+        find_cards(soup) 返回书籍元素列表，extract_card(element) 返回书籍字典，
+        parse_details(content) 接收详情页原始字节，返回要合并进书籍字典的详情字段。
+        每个列表页解析完成后立即调度其详情页，结果保持榜单顺序；
+        同一本书（小说 ID 相同）出现在多个列表页时只抓一次详情、只保留第一次出现的位置。
+        传入 journal（ScrapeJournal）时，已记录的书直接复用，新完成的书立即写入日志；
+        reuse(book) 返回详情字段时跳过该书的详情页请求（增量刷新）。
+        传入 parser（ParseStage）时列表页和详情页都在解析进程中解析，三个函数需是模块级函数。
+        """
+        async def parse(func, content):
+            if parser is None:
+                return func(content)
+            return await parser.parse(func, content)
+
+        parse_list = partial(list_records, find_cards=find_cards, extract_card=extract_card)
+
+        async def detail(book):
+            if journal is not None and book['url'] in journal:
+                book.update(journal.get(book['url']))
+                return book
+            details = reuse(book) if reuse else None
+            if details is not None:
+                book.update(details)
+                return book
+            try:
+                content = await self.fetch(book['url'])
+                book.update(await parse(parse_details, content))
+                if journal is not None:
+                    journal.record(book['url'], book)
+                print(f"    ✓ {book['title'][:30]}...")
+            except Exception as e:
+                print(f"      ⚠️ 获取详情失败: {book['title'][:30]}... {e}")
+            return book
+
+        claimed = {}    # 小说 ID -> 详情任务（翻页时榜单变动，同一本书可能出现在相邻两页）
+
+        def claim(book):
+            book_id = fiction_id(book['url'])
+            if book_id is None:
+                return detail(book)
+            if book_id not in claimed:
+                claimed[book_id] = asyncio.ensure_future(detail(book))
+            return claimed[book_id]
+
+        async def list_page(url):
+            books = await parse(parse_list, await self.fetch(url))
+            print(f"    📚 {url} 找到 {len(books)} 本书")
+            return await asyncio.gather(*(claim(book) for book in books))
+
+        pages = await asyncio.gather(*(list_page(url) for url in list_urls))
+        results, seen = [], set()
+        for book in (book for page in pages for book in page):
+            book_id = fiction_id(book['url'])
+            if book_id is not None:
+                if book_id in seen:
+                    continue
+                seen.add(book_id)
+            results.append(book)
+        return results
@@ -0,0 +1,216 @@
+"""
+磁盘 HTTP 响应缓存（SQLite）
+按规范化 URL 索引，正文按内容哈希去重并 zlib 压缩；
+支持 TTL、ETag/Last-Modified 条件请求、按容量 LRU 淘汰以及离线回放模式
+（环境变量 RR_OFFLINE=1 时所有脚本只回放缓存）
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+CACHE_PATH = Path(__file__).parent / '.cache' / 'responses.sqlite'
+CACHE_TTL = 6 * 3600               # 6 小时内直接使用缓存，不发请求
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # 压缩后正文总大小上限
+
+# 列表页的统计（关注、评分、排名）变化快，增量抓取靠它判断哪些书要重抓：
+# 这些路径不按 TTL 直接使用，每次都发条件请求重新验证
+REVALIDATE_PATHS = ('/fictions/',)
+
+# 环境变量 RR_OFFLINE=1 时只回放缓存，未命中时抛出 CacheMiss
+OFFLINE = os.environ.get('RR_OFFLINE', '').lower() not in ('', '0', 'false', 'no')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body_hash TEXT NOT NULL REFERENCES bodies(hash),
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+"""
+
+
+class CacheMiss(Exception):
+    """离线模式下缓存未命中"""
+
+
+def normalize_url(url, params=None):
+    """规范化 URL：小写协议和主机、排序查询参数、去掉锚点和末尾斜杠"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((k, str(v)) for k, v in params.items())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), path,
+        urlencode(sorted(query)), ''
+    ))
+
+
+class CachedResponse:
+    """缓存中的一条响应"""
+
+    def __init__(self, url, content, etag, last_modified, content_type, fetched_at):
+        self.url = url
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_type = content_type
+        self.fetched_at = fetched_at
+
+    def age(self, now=None):
+        return (now or time.time()) - self.fetched_at
+
+    def conditional_headers(self):
+        """用于重新验证的条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite 响应缓存，可在多线程间共享"""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, offline=OFFLINE,
+                 revalidate_paths=REVALIDATE_PATHS):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.revalidate_paths = tuple(revalidate_paths)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def get(self, url, params=None):
+        """读取缓存，不存在时返回 None；命中时更新访问时间"""
+        key = normalize_url(url, params)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT b.data, r.etag, r.last_modified, r.content_type, r.fetched_at "
+                "FROM responses r JOIN bodies b ON b.hash = r.body_hash WHERE r.url = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), key))
+            self.conn.commit()
+        data, etag, last_modified, content_type, fetched_at = row
+        return CachedResponse(key, zlib.decompress(data), etag, last_modified, content_type, fetched_at)
+
+    def is_fresh(self, entry):
+        """是否仍在 TTL 内；离线模式下缓存永远新鲜，列表页（REVALIDATE_PATHS）永远需要重新验证"""
+        if self.offline:
+            return True
+        if urlsplit(entry.url).path.startswith(self.revalidate_paths):
+            return False
+        return entry.age() < self.ttl
+
+    def put(self, url, content, headers=None, params=None):
+        """写入一条 200 响应"""
+        headers = headers or {}
+        key = normalize_url(url, params)
+        body_hash = hashlib.sha256(content).hexdigest()
+        data = zlib.compress(content, 6)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO bodies (hash, data, size) VALUES (?, ?, ?)",
+                (body_hash, data, len(data))
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body_hash, etag, last_modified, content_type, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body_hash, headers.get('ETag'), headers.get('Last-Modified'),
+                 headers.get('Content-Type'), now, now)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def touch(self, url, params=None):
+        """304 Not Modified 后刷新抓取时间"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, normalize_url(url, params))
+            )
+            self.conn.commit()
+
+    def total_bytes(self):
+        row = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()
+        return row[0]
+
+    def _evict(self):
+        """超出容量时按最近访问时间淘汰，直到降到上限的 90%"""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self.conn.execute(
+            "SELECT r.url, r.body_hash, b.size FROM responses r JOIN bodies b ON b.hash = r.body_hash "
+            "ORDER BY r.accessed_at"
+        ).fetchall()
+        # 正文可能被多个 URL 共享，引用全部淘汰后才真正释放空间
+        refs = {}
+        for _, body_hash, _ in rows:
+            refs[body_hash] = refs.get(body_hash, 0) + 1
+        evicted = []
+        for url, body_hash, size in rows:
+            if total <= target:
+                break
+            evicted.append((url,))
+            refs[body_hash] -= 1
+            if refs[body_hash] == 0:
+                total -= size
+        self.conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+        self.conn.execute(
+            "DELETE FROM bodies WHERE hash NOT IN (SELECT body_hash FROM responses)"
+        )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """获取进程内共享的响应缓存"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def configure_cache(**kwargs):
+    """用新参数替换共享缓存（例如 offline=True 只回放缓存）"""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = ResponseCache(**kwargs)
+    return _cache
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Royal Road 榜单爬取：多个使用方共享一次翻页
+- 每个使用方（ListConsumer）声明读哪些榜单、最多翻几页、要几本、用什么条件筛选，
+  以及怎样找卡片、提取字段（与对应脚本单独运行时一致）
+- 各榜单按页顺序只抓一遍，每页的书按小说 ID 去重后分给仍需要的使用方；同一本书跨榜单也只抓详情一次
+- 所有使用方都满足（达到目标数量或翻到页数上限）后立即停止，不再请求后面的页
+
+单独运行时一次爬取同时产出 best_rated、best50_completed、completed_top50 三张表：
+    python3 scripts/rr_crawl.py
+    python3 scripts/rr_crawl.py best50_completed completed_top50
+"""
+
+import argparse
+import importlib
+import sys
+
+from rr_http import BASE_URL, get_soup
+from rr_metrics import metrics_run
+from rr_store import fiction_id
+
+# 榜单名 -> 路径
+LISTS = {
+    'best-rated': '/fictions/best-rated',
+    'trending': '/fictions/trending',
+    'active': '/fictions/active-popular',
+    'complete': '/fictions/complete',
+}
+
+# 没有指定页数上限的使用方最多翻到第几页
+MAX_PAGES = 50
+
+
+def list_url(name, page):
+    return f"{BASE_URL}{LISTS[name]}?page={page}"
+
+
+def is_completed(book):
+    return book.get('status') == 'COMPLETED'
+
+
+def is_finished(book):
+    """已完结，包括 STUBBED（列表页状态识别为 STUB）"""
+    return book.get('status') in ('COMPLETED', 'STUB')
+
+
+class ListConsumer:
+    """榜单的一个使用方
+
+    predicate(book) 为 True 的书才收下；target 为 None 时收完 max_pages 页为止；
+    details 为 True 时收下的书会合并详情页字段。find_cards / extract_card 不传时用爬取器的默认函数。
+    books 按榜单顺序保存收下的书，ranks 为 {url: 在榜单中的名次}（不经筛选，第一个出现的榜单为准）
+    """
+
+    def __init__(self, name, lists=('best-rated',), predicate=None, target=None, max_pages=None, details=False,
+                 find_cards=None, extract_card=None):
+        unknown = [n for n in lists if n not in LISTS]
+        if unknown:
+            raise ValueError(f"未知榜单: {', '.join(unknown)}")
+        self.name = name
+        self.lists = tuple(lists)
+        self.predicate = predicate
+        self.target = target
+        self.max_pages = max_pages or MAX_PAGES
+        self.details = details
+        self.find_cards = find_cards
+        self.extract_card = extract_card
+        self.books = []
+        self.ranks = {}
+        self.seen = set()
+
+    @property
+    def full(self):
+        return self.target is not None and len(self.books) >= self.target
+
+    def wants(self, list_name, page):
+        return not self.full and list_name in self.lists and page <= self.max_pages
+
+    def offer(self, book, book_id, rank):
+        """收下则返回 True；同一本书只收一次"""
+        if book_id in self.seen or self.full:
+            return False
+        self.seen.add(book_id)
+        self.ranks.setdefault(book['url'], rank)
+        if self.predicate is not None and not self.predicate(book):
+            return False
+        self.books.append(book)
+        return True
+
+
+class ListCrawler:
+    """按榜单翻页，把每页的书分给各使用方
+
+    find_cards(soup) 返回书籍元素列表，extract_card(element) 返回书籍字典（需含 url），
+    两者是没有自己设置的使用方的默认值；每页对每组不同的 (find_cards, extract_card) 各解析一次。
+    details(book) 返回详情字段（只为 details=True 的使用方收下的书调用，每本书一次）
+    """
+
+    def __init__(self, consumers, find_cards=None, extract_card=None, details=None):
+        self.consumers = list(consumers)
+        self.find_cards = find_cards
+        self.extract_card = extract_card
+        self.details = details
+        self.records = {}        # (提取函数, 小说 ID) -> 书籍字典（跨榜单共享）
+        self.detailed = {}       # 小说 ID -> 详情字段
+        self.pages = 0
+
+    def run(self):
+        lists = list(dict.fromkeys(name for c in self.consumers for name in c.lists))
+        for list_name in lists:
+            self._crawl(list_name)
+        return self.consumers
+
+    def _parsers(self, consumers):
+        """按 (find_cards, extract_card) 分组"""
+        groups = {}
+        for c in consumers:
+            key = (c.find_cards or self.find_cards, c.extract_card or self.extract_card)
+            groups.setdefault(key, []).append(c)
+        return groups
+
+    def _crawl(self, list_name):
+        ranks = {}
+        page = 1
+        while True:
+            active = [c for c in self.consumers if c.wants(list_name, page)]
+            if not active:
+                break
+
+            print(f"\n📖 正在抓取 {list_name} 第 {page} 页...")
+            try:
+                soup = get_soup(list_url(list_name, page))
+            except Exception as e:
+                print(f"    ❌ 第 {page} 页抓取失败: {e}")
+                break
+            self.pages += 1
+
+            groups = self._parsers(active)
+            found = 0
+            for key, consumers in groups.items():
+                find_cards, extract_card = key
+                cards = find_cards(soup)
+                found += len(cards)
+                names = f"（{', '.join(c.name for c in consumers)}）" if len(groups) > 1 else ""
+                print(f"    📚 找到 {len(cards)} 本书{names}")
+                for elem in cards:
+                    book = extract_card(elem)
+                    book_id = fiction_id(book['url']) if book and book.get('url') else None
+                    if book_id is None:
+                        continue
+                    rank = ranks[key] = ranks.get(key, 0) + 1
+                    book = self.records.setdefault((extract_card, book_id), book)
+                    takers = [c for c in consumers if c.offer(book, book_id, rank)]
+                    if takers:
+                        print(f"    ✓ {book['title'][:30]}... [{book.get('status')}] -> {', '.join(c.name for c in takers)}")
+                        if self.details and any(c.details for c in takers):
+                            self._fetch_details(book_id, book)
+            if not found:
+                break
+            page += 1
+
+    def _fetch_details(self, book_id, book):
+        if book_id not in self.detailed:
+            try:
+                self.detailed[book_id] = self.details(book) or {}
+            except Exception as e:
+                print(f"      ⚠️ 获取详情失败: {e}")
+                self.detailed[book_id] = {}
+            if self.detailed[book_id].get('platformRating'):
+                print(f"       ⭐ 评分: {self.detailed[book_id]['platformRating']}")
+        book.update(self.detailed[book_id])
+
+
+def crawl(consumers, find_cards=None, extract_card=None, details=None):
+    """一次爬取喂给所有使用方，返回 ListCrawler（可查看抓取页数）"""
+    crawler = ListCrawler(consumers, find_cards, extract_card, details)
+    crawler.run()
+    return crawler
+
+
+# 表名 -> 保存该表的抓取脚本（用其 save_books）
+SAVERS = {
+    'best_rated': 'scrape_rr',
+    'best50_completed': 'scrape_rr_best50',
+    'completed_top50': 'scrape_completed_top50',
+}
+
+
+def standard_consumers():
+    """三个抓取脚本的使用方：表名、卡片查找和字段提取都与各脚本单独运行时一致"""
+    scripts = {table: importlib.import_module(module) for table, module in SAVERS.items()}
+
+    def parsing(table):
+        script = scripts[table]
+        return {'find_cards': script.find_book_elements,
+                'extract_card': getattr(script, 'extract_card', script.extract_book_info)}
+
+    return {
+        'best_rated': ListConsumer('best_rated', max_pages=8, details=True, **parsing('best_rated')),
+        'best50_completed': ListConsumer('best50_completed', predicate=is_completed, target=50,
+                                         max_pages=10, details=True, **parsing('best50_completed')),
+        'completed_top50': ListConsumer('completed_top50', predicate=is_finished, target=50,
+                                        max_pages=15, details=True, **parsing('completed_top50')),
+    }
+
+
+def main():
+    consumers = standard_consumers()
+    parser = argparse.ArgumentParser(description="一次爬取 Best Rated 榜单，同时产出多张书籍表")
+    parser.add_argument('tables', nargs='*', help=f"要产出的表（默认全部）: {', '.join(consumers)}")
+    args = parser.parse_args()
+    unknown = [t for t in args.tables if t not in consumers]
+    if unknown:
+        parser.error(f"未知的表: {', '.join(unknown)}")
+    selected = [consumers[t] for t in args.tables or consumers]
+
+    from scrape_rr import get_book_details
+
+    print(f"🚀 一次爬取产出 {len(selected)} 张表: {', '.join(c.name for c in selected)}")
+    print("=" * 60)
+    crawler = crawl(selected, details=lambda book: get_book_details(book['url']))
+    print("\n" + "=" * 60)
+    print(f"✅ 爬取完成！共请求 {crawler.pages} 个列表页、{len(crawler.detailed)} 个详情页")
+
+    for consumer in selected:
+        if consumer.books:
+            importlib.import_module(SAVERS[consumer.name]).save_books(consumer.books, table=consumer.name)
+        else:
+            print(f"❌ {consumer.name} 没有抓取到任何数据")
+    return 0
+
+
+if __name__ == "__main__":
+    with metrics_run('crawl'):
+        status = main()
+    sys.exit(status)
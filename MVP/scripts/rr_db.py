@@ -0,0 +1,178 @@
+"""
+书籍数据的 SQLite 存储
+替代抓取流程中间环节的 Excel 文件：列有类型、按小说 ID 建主键，
+单列更新只改这一列，读写 1 万行在毫秒级。需要给人工整理时再导出为 xlsx。
+数据库不在仓库里：读一张还不存在的表时，如果有同名的 rr_<表名>.xlsx（如仓库中的 rr_best_rated.xlsx），先自动导入。
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from rr_store import fiction_ids
+
+BOOKS_DB = Path(__file__).parent / 'rr_books.sqlite'
+# 表不存在时从这里找 rr_<表名>.xlsx 导入
+SEED_DIR = Path(__file__).parent
+DEFAULT_TABLE = 'best_rated'
+
+# 抓取表格的列及其类型，顺序即导出顺序
+COLUMNS = {
+    'title': 'TEXT',
+    'author': 'TEXT',
+    'url': 'TEXT',
+    'coverUrl': 'TEXT',
+    'platformRating': 'REAL',
+    'status': 'TEXT',
+    'chapters': 'INTEGER',
+    'pages': 'INTEGER',
+    'words': 'INTEGER',
+    'views': 'INTEGER',
+    'followers': 'INTEGER',
+    'synopsis': 'TEXT',
+    'tags': 'TEXT',
+}
+RE_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _name(name):
+    """表名/列名只允许标识符字符，避免拼 SQL 时出问题"""
+    if not RE_IDENTIFIER.match(name):
+        raise ValueError(f"非法的表名或列名: {name!r}")
+    return f'"{name}"'
+
+
+def connect(path=BOOKS_DB):
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def table_columns(conn, table):
+    """表中已有的列（不含 fictionId / position），表不存在时返回 None"""
+    rows = conn.execute(f"PRAGMA table_info({_name(table)})").fetchall()
+    if not rows:
+        return None
+    return [row[1] for row in rows if row[1] not in ('fictionId', 'position')]
+
+
+def _ensure_table(conn, table, columns):
+    """建表并补齐缺少的列；不在 COLUMNS 中的额外列（如 notes）按 TEXT 存"""
+    existing = table_columns(conn, table)
+    if existing is None:
+        defs = ', '.join(f"{_name(c)} {COLUMNS.get(c, 'TEXT')}" for c in columns)
+        conn.execute(
+            f"CREATE TABLE {_name(table)} (fictionId INTEGER PRIMARY KEY, position INTEGER NOT NULL, {defs})"
+        )
+        return
+    for column in columns:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {_name(table)} ADD COLUMN {_name(column)} {COLUMNS.get(column, 'TEXT')}")
+
+
+def _ordered_columns(columns):
+    known = [c for c in COLUMNS if c in columns]
+    return known + [c for c in columns if c not in COLUMNS]
+
+
+def _rows(df, columns):
+    """DataFrame -> executemany 参数，缺失值转成 None，整数列转成 int"""
+    data = df[columns].astype(object).where(df[columns].notna(), None)
+    for column in columns:
+        if COLUMNS.get(column) == 'INTEGER':
+            data[column] = [int(v) if v is not None else None for v in data[column]]
+    return data.itertuples(index=False, name=None)
+
+
+def write_books(df, table=DEFAULT_TABLE, path=BOOKS_DB):
+    """整表写入（保留行顺序），返回写入行数"""
+    df = df.reset_index(drop=True)
+    ids = fiction_ids(df['url'])
+    keep = ids.notna() & ~ids.duplicated()
+    if not keep.all():
+        print(f"⚠️ 跳过 {int((~keep).sum())} 行（URL 中没有小说 ID 或重复）")
+    df, ids = df[keep].reset_index(drop=True), ids[keep].reset_index(drop=True)
+
+    columns = _ordered_columns(list(df.columns))
+    placeholders = ', '.join('?' for _ in range(len(columns) + 2))
+    names = ', '.join(_name(c) for c in columns)
+    conn = connect(path)
+    try:
+        with conn:
+            _ensure_table(conn, table, columns)
+            conn.execute(f"DELETE FROM {_name(table)}")
+            conn.executemany(
+                f"INSERT INTO {_name(table)} (fictionId, position, {names}) VALUES ({placeholders})",
+                ((int(i), pos) + row for pos, (i, row) in enumerate(zip(ids, _rows(df, columns))))
+            )
+    finally:
+        conn.close()
+    return len(df)
+
+
+def update_books(df, columns, table=DEFAULT_TABLE, path=BOOKS_DB):
+    """只更新指定列，按 URL 中的小说 ID 匹配已有行，返回更新行数"""
+    ids = fiction_ids(df['url'])
+    df = df[ids.notna()]
+    ids = ids[ids.notna()]
+    assignments = ', '.join(f"{_name(c)} = ?" for c in columns)
+    conn = connect(path)
+    try:
+        with conn:
+            _ensure_table(conn, table, columns)
+            cursor = conn.executemany(
+                f"UPDATE {_name(table)} SET {assignments} WHERE fictionId = ?",
+                (row + (int(i),) for i, row in zip(ids, _rows(df, columns)))
+            )
+            return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def seed_file(table):
+    """表对应的 xlsx（rr_<表名>.xlsx），不存在时返回 None"""
+    path = SEED_DIR / f"rr_{table}.xlsx"
+    return path if path.exists() else None
+
+
+def read_books(table=DEFAULT_TABLE, path=BOOKS_DB):
+    """按写入顺序读出整表；整数列为可空 Int64
+
+    表不存在时先从 rr_<表名>.xlsx 导入，没有该文件时抛出 FileNotFoundError
+    """
+    conn = connect(path)
+    try:
+        columns = table_columns(conn, table)
+    finally:
+        conn.close()
+    if columns is None:
+        seed = seed_file(table)
+        if seed is None:
+            raise FileNotFoundError(
+                f"{path} 中没有表 {table}，可先运行: python3 scripts/export_books.py --import <xlsx> {table}"
+            )
+        print(f"📥 {Path(path).name} 中还没有表 {table}，从 {seed.name} 导入")
+        write_books(pd.read_excel(seed), table, path)
+
+    conn = connect(path)
+    try:
+        columns = table_columns(conn, table)
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(_name(c) for c in columns)} FROM {_name(table)} ORDER BY position", conn
+        )
+    finally:
+        conn.close()
+    for column in columns:
+        if COLUMNS.get(column) == 'INTEGER':
+            df[column] = df[column].astype('Int64')
+    return df
+
+
+def list_tables(path=BOOKS_DB):
+    conn = connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+    finally:
+        conn.close()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+评分、关注、浏览等统计的历史快照（SQLite，只追加）
+各抓取脚本和评分更新脚本每次抓到的统计都追加一行，书籍表里的值照常覆盖，历史保存在这里：
+- 表按 (fictionId, ts) 聚簇（WITHOUT ROWID 主键），查一本书的一段时间只读连续的一段
+- 计数（关注、浏览、页数、章节、字数）存与上一次观测的差值：SQLite 整数按大小变长存储，
+  差值通常只占 0~3 字节（没变化的 0 不占空间），绝对值要 4~6 字节；
+  评分存 ×100 的整数，只在变化时写入
+- latest 表保存每本书各项的最新绝对值：追加时不用回读历史；
+  某时刻的值 = 最新值 - 该时刻之后的差值之和，每本书按主键只读时间窗口内的几行
+
+空值表示这次没有观测到该项（如评分脚本只有评分），不影响差值链。
+
+用法：
+    python3 scripts/rr_history.py stats
+    python3 scripts/rr_history.py series 21220 --days 90
+    python3 scripts/rr_history.py rising --days 7 --stat followers
+    python3 scripts/rr_history.py record best_rated      # 把书籍数据库当前的值记为一次观测
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from rr_store import fiction_id
+
+HISTORY_DB = Path(__file__).parent / 'rr_history.sqlite'
+
+# 按差值存储的计数列
+COUNTERS = ('followers', 'views', 'pages', 'chapters', 'words')
+# 评分按整数存储的倍数
+RATING_SCALE = 100
+
+DAY = 86400
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS observations (
+    fictionId INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    rating INTEGER,
+    {', '.join(f'{c} INTEGER' for c in COUNTERS)},
+    PRIMARY KEY (fictionId, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS latest (
+    fictionId INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    rating INTEGER,
+    {', '.join(f'{c} INTEGER' for c in COUNTERS)}
+);
+"""
+
+
+def connect(path=HISTORY_DB):
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _int(value):
+    """统计值 -> int；None / NaN / pd.NA / 无法识别时返回 None"""
+    if value is None or value is pd.NA:
+        return None
+    try:
+        if value != value:
+            return None
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rating(value):
+    """评分 -> ×100 的整数；空值和 0 视为没有评分"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return round(value * RATING_SCALE) if value == value and value > 0 else None
+
+
+def record_snapshot(books, ts=None, path=HISTORY_DB):
+    """追加一次观测，返回追加行数
+
+    books 为书籍字典列表（或 DataFrame），按 url 取小说 ID，取 platformRating 和 COUNTERS 中有的列；
+    同一本书 ts 不晚于已有记录时跳过（历史只按时间顺序追加）
+    """
+    if isinstance(books, pd.DataFrame):
+        books = books.to_dict('records')
+    ts = int(time.time()) if ts is None else int(ts)
+
+    observed = {}
+    for book in books:
+        book_id = fiction_id(book.get('url'))
+        if book_id is None:
+            continue
+        values = {c: _int(book.get(c)) for c in COUNTERS}
+        values['rating'] = _rating(book.get('platformRating'))
+        if any(v is not None for v in values.values()):
+            observed.setdefault(book_id, {}).update({k: v for k, v in values.items() if v is not None})
+    if not observed:
+        return 0
+
+    columns = ('rating',) + COUNTERS
+    conn = connect(path)
+    try:
+        with conn:
+            latest = {}
+            ids = list(observed)
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT fictionId, ts, {', '.join(columns)} FROM latest "
+                    f"WHERE fictionId IN ({', '.join('?' for _ in chunk)})", chunk
+                )
+                latest.update((row[0], row[1:]) for row in rows)
+
+            appended, states = [], []
+            for book_id, values in observed.items():
+                last_ts, *last = latest.get(book_id, (None,) * (len(columns) + 1))
+                if last_ts is not None and last_ts >= ts:
+                    continue
+                row, state = [], []
+                for column, previous in zip(columns, last):
+                    value = values.get(column)
+                    if value is None:
+                        row.append(None)
+                        state.append(previous)
+                    elif column == 'rating':
+                        row.append(value if value != previous else None)
+                        state.append(value)
+                    else:
+                        row.append(value - (previous or 0))
+                        state.append(value)
+                appended.append((book_id, ts, *row))
+                states.append((book_id, ts, *state))
+
+            placeholders = ', '.join('?' for _ in range(len(columns) + 2))
+            conn.executemany(
+                f"INSERT INTO observations (fictionId, ts, {', '.join(columns)}) VALUES ({placeholders})", appended
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO latest (fictionId, ts, {', '.join(columns)}) VALUES ({placeholders})", states
+            )
+    finally:
+        conn.close()
+    return len(appended)
+
+
+def series(book, start=None, end=None, path=HISTORY_DB):
+    """一本书在 [start, end]（Unix 秒）内的观测，按时间索引；计数为绝对值，评分沿用最近一次的值
+
+    没有记录时返回空 DataFrame
+    """
+    book_id = fiction_id(book)
+    start = 0 if start is None else int(start)
+    end = sys.maxsize if end is None else int(end)
+    columns = ('rating',) + COUNTERS
+    conn = connect(path)
+    try:
+        # 起点之前：各计数的差值和与观测次数、最近一次评分
+        before = conn.execute(
+            f"SELECT {', '.join(f'SUM({c}), COUNT({c})' for c in COUNTERS)} "
+            f"FROM observations WHERE fictionId = ? AND ts < ?", (book_id, start)
+        ).fetchone()
+        rating = conn.execute(
+            "SELECT rating FROM observations WHERE fictionId = ? AND ts < ? AND rating IS NOT NULL "
+            "ORDER BY ts DESC LIMIT 1", (book_id, start)
+        ).fetchone()
+        df = pd.read_sql_query(
+            f"SELECT ts, {', '.join(columns)} FROM observations "
+            f"WHERE fictionId = ? AND ts BETWEEN ? AND ? ORDER BY ts", conn, params=(book_id, start, end)
+        )
+    finally:
+        conn.close()
+
+    ratings = df['rating'].astype(float)
+    if rating is not None and len(df) and ratings.isna().iloc[0]:
+        ratings.iloc[0] = rating[0]
+    df['rating'] = ratings.ffill() / RATING_SCALE
+    for i, column in enumerate(COUNTERS):
+        base, count = before[2 * i] or 0, before[2 * i + 1]
+        deltas = df[column].astype('Int64')
+        values = (base + deltas.fillna(0).cumsum()).astype('Int64')
+        # 第一次观测到之前没有值
+        seen = count + deltas.notna().cumsum()
+        df[column] = values.mask(seen == 0)
+    df = df.rename(columns={'rating': 'platformRating'})
+    df.index = pd.to_datetime(df.pop('ts'), unit='s')
+    return df
+
+
+def growth(stat='followers', days=7, now=None, path=HISTORY_DB):
+    """各书在 (now - days, now] 内的计数变化：DataFrame[fictionId, before, after, gained]，按 gained 降序
+
+    now 默认为当前时间；只包含窗口开始前已观测到该项的书（第一次观测的差值就是绝对值，不能算作增长）
+    """
+    if stat not in COUNTERS:
+        raise ValueError(f"未知的计数: {stat}（可选: {', '.join(COUNTERS)}）")
+    now = sys.maxsize if now is None else int(now)
+    since = (int(time.time()) if now == sys.maxsize else now) - int(days * DAY)
+    conn = connect(path)
+    try:
+        # 某时刻的值 = 最新值 - 该时刻之后的差值之和；每本书的子查询都是主键上的范围查找
+        df = pd.read_sql_query(
+            f"""
+            SELECT fictionId, latest - after_start AS before, latest - after_end AS after FROM (
+                SELECT l.fictionId, l.{stat} AS latest,
+                       (SELECT SUM(o.{stat}) FROM observations o
+                        WHERE o.fictionId = l.fictionId AND o.ts > :since) AS after_start,
+                       (SELECT COALESCE(SUM(o.{stat}), 0) FROM observations o
+                        WHERE o.fictionId = l.fictionId AND o.ts > :now) AS after_end
+                FROM latest l WHERE l.{stat} IS NOT NULL
+            ) w
+            WHERE after_start IS NOT NULL AND EXISTS (
+                SELECT 1 FROM observations o
+                WHERE o.fictionId = w.fictionId AND o.ts <= :since AND o.{stat} IS NOT NULL)
+            """, conn, params={'since': since, 'now': now}
+        )
+    finally:
+        conn.close()
+    df['gained'] = df['after'] - df['before']
+    return df.sort_values('gained', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def summary(path=HISTORY_DB):
+    conn = connect(path)
+    try:
+        rows, books, first, last = conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT fictionId), MIN(ts), MAX(ts) FROM observations"
+        ).fetchone()
+        snapshots = conn.execute("SELECT COUNT(DISTINCT ts) FROM observations").fetchone()[0]
+    finally:
+        conn.close()
+    return {'rows': rows, 'books': books, 'snapshots': snapshots, 'first': first, 'last': last,
+            'bytes': Path(path).stat().st_size}
+
+
+def _fmt_ts(ts):
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(ts)) if ts else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="书籍统计历史快照")
+    parser.add_argument('--db', default=str(HISTORY_DB), help="历史数据库")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help="历史记录概况")
+    p = sub.add_parser('series', help="一本书的历史")
+    p.add_argument('book', help="小说 ID 或 URL")
+    p.add_argument('--days', type=float, help="只看最近几天")
+    p = sub.add_parser('rising', help="最近涨得最多的书")
+    p.add_argument('--days', type=float, default=7)
+    p.add_argument('--stat', default='followers', choices=COUNTERS)
+    p.add_argument('--limit', type=int, default=20)
+    p = sub.add_parser('record', help="把书籍数据库中的当前值记为一次观测")
+    p.add_argument('tables', nargs='*', help="表名（默认全部）")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        from rr_db import list_tables, read_books
+        total = 0
+        for table in args.tables or list_tables():
+            total += record_snapshot(read_books(table), path=args.db)
+        print(f"✅ 已追加 {total} 条观测")
+        return 0
+
+    if not Path(args.db).exists():
+        print(f"❌ 没有历史数据库 {args.db}，运行抓取或评分脚本后会自动创建")
+        return 1
+
+    if args.command == 'stats':
+        info = summary(args.db)
+        print(f"📊 {info['books']} 本书，{info['snapshots']} 次抓取，共 {info['rows']} 条观测")
+        print(f"   时间: {_fmt_ts(info['first'])} ~ {_fmt_ts(info['last'])}")
+        print(f"   文件: {info['bytes'] / 1024:.1f} KB（{info['bytes'] / max(info['rows'], 1):.1f} 字节/条）")
+    elif args.command == 'series':
+        start = time.time() - args.days * DAY if args.days else None
+        df = series(args.book, start, path=args.db)
+        if df.empty:
+            print(f"⚠️ 没有 {args.book} 的历史记录")
+            return 1
+        print(df.to_string())
+    else:
+        df = growth(args.stat, args.days, path=args.db).head(args.limit)
+        if df.empty:
+            print(f"⚠️ 最近 {args.days:g} 天没有可比较的 {args.stat} 记录")
+            return 1
+        df['pct'] = (df['gained'] / df['before'].where(df['before'] > 0)).map(
+            lambda v: f"{v:+.1%}" if v == v else '-'
+        )
+        print(df.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
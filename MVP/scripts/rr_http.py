@@ -0,0 +1,155 @@
+"""
+Royal Road 共享 HTTP 客户端
+所有抓取脚本共用同一个带连接池的 Session，复用 TCP/TLS 连接
+"""
+
+import os
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rr_cache import CacheMiss, get_cache
+from rr_metrics import CACHE_BYPASS, CACHE_HIT, CACHE_MISS, CACHE_REVALIDATED, get_metrics
+from rr_ratelimit import get_limiter
+
+# 统一的请求头（不声明 br，requests 默认无法解压 brotli）
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# 离线基准用环境变量 RR_BASE_URL 指向本地替身服务器
+BASE_URL = os.environ.get('RR_BASE_URL', "https://www.royalroad.com").rstrip('/')
+
+# 每个主机保持的长连接数（线程并发抓取时不应小于线程数）
+POOL_MAXSIZE = 10
+
+# 重试策略：连接错误由 HTTPAdapter 指数退避重试，
+# 限流和服务端错误交给自适应限速器降速后重试
+RETRY_TOTAL = 5
+RETRY_BACKOFF = 10
+RETRY_STATUS = [429, 500, 502, 503, 504]
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_maxsize=POOL_MAXSIZE, retry_total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF):
+    """创建带连接池和连接重试机制的 Session"""
+    session = requests.Session()
+
+    retry_strategy = Retry(
+        total=retry_total,
+        backoff_factor=backoff_factor,
+        allowed_methods=["HEAD", "GET", "OPTIONS"],
+        respect_retry_after_header=False  # 429 由限速器处理
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry_strategy
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+
+    return session
+
+
+def get_session(pool_maxsize=None):
+    """获取进程内共享的 Session，首次调用时创建
+
+    pool_maxsize 只在首次创建时生效
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session(pool_maxsize or POOL_MAXSIZE)
+    return _session
+
+
+def close_session():
+    """关闭共享 Session，释放连接池"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def cached_response(entry):
+    """把缓存条目包装成 Response 对象"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = entry.url
+    response._content = entry.content
+    response.headers['Content-Type'] = entry.content_type or 'text/html'
+    response.from_cache = True
+    return response
+
+
+def fetch(url, params=None, timeout=30, session=None, limiter=None, cache=None, use_cache=True):
+    """GET 请求并检查状态码，返回 Response
+
+    TTL 内的缓存直接返回，过期的缓存用 ETag/Last-Modified 发条件请求重新验证；
+    请求前由限速器控制节奏；遇到 429/5xx 时限速器降速并遵守 Retry-After，然后重试
+    """
+    session = session or get_session()
+    limiter = limiter or get_limiter()
+    cache = (cache or get_cache()) if use_cache else None
+    metrics = get_metrics()
+
+    entry = cache.get(url, params) if cache else None
+    if entry and cache.is_fresh(entry):
+        metrics.request(url, 200, len(entry.content), cache=CACHE_HIT)
+        return cached_response(entry)
+    if cache and cache.offline:
+        raise CacheMiss(f"离线模式缓存未命中: {url}")
+    headers = entry.conditional_headers() if entry else {}
+    fetched = CACHE_MISS if cache else CACHE_BYPASS
+
+    waited = 0.0
+    network = 0.0
+    for attempt in range(RETRY_TOTAL):
+        waited += limiter.wait(url)
+        sent = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=timeout, headers=headers)
+        except requests.RequestException as e:
+            limiter.record(url, None)
+            metrics.request(url, None, 0, network + time.perf_counter() - sent, waited, attempt, fetched, str(e))
+            raise
+        network += time.perf_counter() - sent
+
+        limiter.record(url, response.status_code, response.headers.get('Retry-After'))
+        if response.status_code in RETRY_STATUS and attempt < RETRY_TOTAL - 1:
+            print(f"    ⚠️ HTTP {response.status_code}，降速至 {limiter.current_rate(url):.2f} 请求/秒后重试...")
+            continue
+
+        if response.status_code == 304 and entry:
+            metrics.request(url, 304, len(entry.content), network, waited, attempt, CACHE_REVALIDATED)
+            cache.touch(url, params)
+            return cached_response(entry)
+
+        error = None if response.ok else f"HTTP {response.status_code}"
+        metrics.request(url, response.status_code, len(response.content), network, waited, attempt, fetched, error)
+        response.raise_for_status()
+        if cache and response.status_code == 200:
+            cache.put(url, response.content, response.headers, params)
+        return response
+
+
+def get_soup(url, params=None, timeout=30, session=None):
+    """获取页面并返回 BeautifulSoup 对象"""
+    response = fetch(url, params=params, timeout=timeout, session=session)
+    return BeautifulSoup(response.content, 'lxml')
@@ -0,0 +1,90 @@
+"""
+增量刷新：用列表页统计判断哪些书需要重新抓取详情页
+列表卡片上已有 followers / views / pages / chapters，与上次快照对比，
+统计没变且数据未过期的书直接复用上次的详情字段，不再请求详情页。
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+SNAPSHOT_PATH = Path(__file__).parent / '.cache' / 'list_snapshot.json'
+MAX_AGE = 7 * 24 * 3600     # 详情数据最长复用 7 天
+
+# 列表页统计字段 -> 允许的相对变化；views 每天都会涨，给一点容差
+LIST_STATS = {
+    'followers': 0,
+    'pages': 0,
+    'chapters': 0,
+    'views': 0.05,
+}
+# 只能从详情页拿到的字段
+DETAIL_FIELDS = ('author', 'words', 'platformRating')
+
+
+def stats_changed(old, new):
+    """比较两组列表页统计，返回发生变化的字段列表"""
+    changed = []
+    for name, tolerance in LIST_STATS.items():
+        before, after = old.get(name), new.get(name)
+        if before == after:
+            continue
+        if before is None or after is None or abs(after - before) > tolerance * before:
+            changed.append(name)
+    return changed
+
+
+class ListSnapshot:
+    """按书籍 URL 保存上次抓取详情时的列表统计和详情字段"""
+
+    def __init__(self, path=SNAPSHOT_PATH, max_age=MAX_AGE, clock=time.time):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.clock = clock
+        self.books = {}
+        self.reused = set()
+        self.reasons = {'new': 0, 'changed': 0, 'stale': 0}
+        if self.path.exists():
+            self.books = json.loads(self.path.read_text(encoding='utf-8'))
+
+    def reuse(self, book):
+        """统计未变且未过期时返回上次的详情字段，否则返回 None（需要抓详情页）"""
+        old = self.books.get(book['url'])
+        if old is None:
+            self.reasons['new'] += 1
+            return None
+        if stats_changed(old['stats'], book):
+            self.reasons['changed'] += 1
+            return None
+        if self.clock() - old['fetched_at'] > self.max_age:
+            self.reasons['stale'] += 1
+            return None
+        self.reused.add(book['url'])
+        return dict(old['details'])
+
+    def update(self, books):
+        """记录本次抓取了详情页的书；复用的书保留原快照，让 views 的缓慢增长能累计触发刷新"""
+        now = self.clock()
+        for book in books:
+            if book['url'] in self.reused:
+                continue
+            details = {name: book.get(name) for name in DETAIL_FIELDS}
+            if all(value is None for value in details.values()):
+                continue    # 详情页抓取失败，下次仍需抓取
+            self.books[book['url']] = {
+                'stats': {name: book.get(name) for name in LIST_STATS},
+                'details': details,
+                'fetched_at': now,
+            }
+
+    def save(self):
+        """原子写入快照文件"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.books, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+    def summary(self):
+        reasons = ', '.join(f"{name} {count}" for name, count in self.reasons.items())
+        return f"复用 {len(self.reused)} 本，需抓取详情（{reasons}）"
@@ -0,0 +1,77 @@
+"""
+抓取进度日志（JSONL，先写日志再继续）
+每完成一项就追加一行并 fsync，中断后重新运行时从日志恢复，跳过已完成的 URL；
+整个任务成功保存结果后调用 finish() 删除日志。
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+JOURNAL_DIR = Path(__file__).parent / '.cache' / 'journals'
+
+
+class ScrapeJournal:
+    """按 key（通常是 URL）记录已完成结果的追加式日志，可在多线程间共享"""
+
+    def __init__(self, name, path=None, resume=True):
+        self.path = Path(path) if path else JOURNAL_DIR / f"{name}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.entries = {}
+        self.lock = threading.Lock()
+        if resume:
+            self._load()
+        elif self.path.exists():
+            self.path.unlink()
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        """读取已有日志；最后一行可能因中断只写了一半，忽略无法解析的行"""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                self.entries[item['key']] = item['data']
+        if self.entries:
+            print(f"♻️ 从进度日志恢复 {len(self.entries)} 条记录: {self.path}")
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        return self.entries.get(key, default)
+
+    def record(self, key, data):
+        """记录一项完成结果，写入磁盘后才返回"""
+        line = json.dumps({'key': key, 'data': data, 'ts': time.time()}, ensure_ascii=False, default=str)
+        with self.lock:
+            self.entries[key] = data
+            self.file.write(line + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+    def finish(self):
+        """任务完成且结果已保存，删除日志"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,187 @@
+"""
+Royal Road 列表页卡片（BeautifulSoup）
+- 卡片切分：没有 fiction-card 类时按 /fiction/<id> 链接切分，每个链接只向上标记一次祖先，
+  整页一次遍历，不会把包着多张卡片的外层容器当成一张卡片
+- 卡片字段：各抓取脚本共用的 extract_book_info，只遍历一次卡片子树，统计和状态用一个正则一次扫描
+"""
+
+import re
+from urllib.parse import urljoin
+
+from rr_http import BASE_URL
+
+RE_FICTION_HREF = re.compile(r'^(?:https?://[^/]+)?/fiction/(\d+)(?:[/?#]|$)')
+
+STATUS_TYPES = ("COMPLETED", "ONGOING", "HIATUS", "STUB")  # 同时出现时按此顺序取
+NOT_TAGS = frozenset(STATUS_TYPES + ("Original", "Fan Fiction"))
+
+# 统计（数字 + 标签词）和状态词一次扫描
+RE_CARD_TEXT = re.compile(
+    r'([\d,]+)\s*(Followers?|Pages?|Views?|Chapters?)|(' + '|'.join(STATUS_TYPES) + ')'
+)
+STAT_KEYS = {'F': 'followers', 'P': 'pages', 'V': 'views', 'C': 'chapters'}
+
+# 卡片没有标签链接时，在正文里查找的常见标签（按此顺序输出）
+COMMON_TAGS = (
+    "Time Loop", "Adventure", "Fantasy", "Mystery", "Magic", "Comedy",
+    "Sci-fi", "Action", "Slice of Life", "Romance", "LitRPG",
+    "Reincarnation", "Portal Fantasy / Isekai", "Xianxia", "Urban Fantasy",
+    "Super Heroes", "Female Lead", "Male Lead", "Villainous Lead",
+    "Non-Human Lead", "Drama", "Horror", "High Fantasy", "Low Fantasy",
+    "Space Opera", "Cyberpunk", "Dungeon", "Strategy", "Progression",
+    "Virtual Reality", "GameLit", "Anti-Hero Lead", "Strong Lead"
+)
+
+# 没有长段落时从正文行中拼简介，含这些词的行视为统计信息
+RE_NOT_SYNOPSIS = re.compile(r'Followers|Pages|Views|Chapters|COMPLETED|ONGOING')
+
+# 祖先下有不止一本小说的链接
+_MIXED = object()
+
+
+def segment_cards(soup):
+    """按小说链接切分卡片，按文档顺序返回元素列表
+
+    一本小说的卡片是它的链接向上、不含其他小说链接的最高祖先；只保留包含 h2 标题的卡片（排除侧栏等处的零散链接）
+    """
+    owner = {}      # id(元素) -> 小说 ID 或 _MIXED
+    anchors = []    # [(小说 ID, a 元素)]
+    for a in soup.find_all('a', href=RE_FICTION_HREF):
+        fid = RE_FICTION_HREF.match(a['href']).group(1)
+        anchors.append((fid, a))
+        node = a
+        # 每个元素最多从未标记变为某本小说、再变为 _MIXED，遇到已标记的祖先即可停止
+        while node is not None:
+            mark = owner.get(id(node))
+            if mark is None:
+                owner[id(node)] = fid
+            elif mark is _MIXED or mark == fid:
+                break
+            else:
+                owner[id(node)] = _MIXED
+            node = node.parent
+
+    cards = []
+    found = set()
+    for fid, a in anchors:
+        if fid in found:
+            continue
+        node = a
+        while node.parent is not None and owner.get(id(node.parent)) == fid:
+            node = node.parent
+        if node.name != 'h2' and node.find('h2') is not None:
+            found.add(fid)
+            cards.append(node)
+    return cards
+
+
+def scan_text(text):
+    """一次扫描卡片正文：({统计名: 数字}, 状态)，每项取第一次出现"""
+    stats = {}
+    statuses = set()
+    for match in RE_CARD_TEXT.finditer(text):
+        if match.group(3):
+            statuses.add(match.group(3))
+            continue
+        key = STAT_KEYS[match.group(2)[0]]
+        if key not in stats:
+            digits = match.group(1).replace(',', '')
+            stats[key] = int(digits) if digits else None
+    status = next((s for s in STATUS_TYPES if s in statuses), "Unknown")
+    return stats, status
+
+
+def text_tags(text):
+    """正文中出现的常见标签"""
+    return [tag for tag in COMMON_TAGS if tag in text]
+
+
+def extract_book_info(book_element, guess_tags=True):
+    """从列表页书籍元素中提取信息
+
+    卡片子树只遍历一次，取第一个 h2、第一张图、标签链接、段落和正文；
+    guess_tags 为 True 时，没有标签链接的卡片从正文中匹配常见标签
+    """
+    try:
+        title_elem = cover_img = None
+        tag_links = []
+        paragraphs = []
+        strings = []
+        string_types = book_element.interesting_string_types
+        for node in book_element.descendants:
+            name = node.name
+            if name is None:
+                if type(node) in string_types:
+                    strings.append(node)
+            elif name == 'h2':
+                if title_elem is None:
+                    title_elem = node
+            elif name == 'a':
+                href = node.get('href')
+                if href and '/tags/' in str(href):
+                    tag_links.append(node)
+            elif name == 'img':
+                if cover_img is None:
+                    cover_img = node
+            elif name == 'p':
+                paragraphs.append(node)
+
+        # 获取链接和标题
+        if not title_elem:
+            return None
+        title_link = title_elem.find('a')
+        if not title_link:
+            return None
+
+        link = title_link.get('href')
+        full_url = urljoin(BASE_URL, link) if link else None
+        title = title_link.get_text(strip=True)
+        cover_url = cover_img.get('src') if cover_img else None
+
+        all_text = ''.join(strings)
+        stats, status = scan_text(all_text)
+
+        # 标签链接，过滤掉状态标签
+        tags = []
+        for tag_elem in tag_links:
+            tag_text = tag_elem.get_text(strip=True)
+            if tag_text and tag_text not in NOT_TAGS and tag_text not in tags:
+                tags.append(tag_text)
+        if not tags and guess_tags:
+            tags = text_tags(all_text)
+
+        # 简介：第一个较长的段落，没有时取正文中较长的非统计行
+        description = ""
+        for p in paragraphs:
+            text = p.get_text(strip=True)
+            if text and len(text) > 50:
+                description = text
+                break
+        if not description:
+            desc_lines = []
+            for line in all_text.split('\n'):
+                line = line.strip()
+                if line and len(line) > 30 and title not in line and not RE_NOT_SYNOPSIS.search(line):
+                    desc_lines.append(line)
+            description = ' '.join(desc_lines[:3])
+
+        return {
+            'title': title,
+            'author': None,  # 从详情页获取
+            'url': full_url,
+            'coverUrl': cover_url,
+            'status': status,
+            'chapters': stats.get('chapters'),
+            'pages': stats.get('pages'),
+            'views': stats.get('views'),
+            'followers': stats.get('followers'),
+            'words': None,  # 从详情页获取
+            'synopsis': description[:1000] if description else None,
+            'platformRating': None,  # 从详情页获取
+            'tags': ', '.join(tags[:10]) if tags else None  # 限制标签数量
+        }
+    except Exception as e:
+        print(f"    ⚠️ 解析书籍信息时出错: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+抓取运行的结构化指标（JSONL）
+- 每个请求一行：URL、主机、状态码、字节数、耗时、重试次数、缓存命中情况、限速等待时间
+- 每次解析一行：解析函数、耗时、页面字节数（进程池解析时另记排队时间）
+- 运行结束时打印汇总（延迟 p50/p95/p99、每分钟请求数、网络 / 等待 / 解析时间分布），并作为最后一行写入
+
+抓取脚本用 with metrics_run('名称'): 包住整个运行，日志写到 .cache/metrics/；
+未开始运行时记录调用直接返回。也可以汇总已有的日志：
+    python3 scripts/rr_metrics.py .cache/metrics/best_rated-20250101-120000.jsonl
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from urllib.parse import urlsplit
+
+METRICS_DIR = Path(__file__).parent / '.cache' / 'metrics'
+
+# 缓存状态
+CACHE_HIT = 'hit'                # TTL 内直接使用
+CACHE_REVALIDATED = 'revalidated'  # 条件请求返回 304
+CACHE_MISS = 'miss'              # 发出请求并取回正文
+CACHE_BYPASS = 'bypass'          # 未使用缓存
+
+
+def percentile(values, q):
+    """最近秩法百分位数"""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(1, -(-q * len(values) // 100))
+    return values[int(rank) - 1]
+
+
+class Metrics:
+    """进程内共享的指标记录器，可在多线程间使用；fork 出的子进程中不记录"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.file = None
+        self.path = None
+        self.name = None
+        self.pid = None
+        self.started = None
+        self.events = []
+
+    @property
+    def active(self):
+        return self.file is not None and os.getpid() == self.pid
+
+    def start(self, name, path=None):
+        path = Path(path) if path else METRICS_DIR / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            self.file = open(path, 'w', encoding='utf-8')
+            self.path = path
+            self.name = name
+            self.pid = os.getpid()
+            self.started = time.time()
+            self.events = []
+        return path
+
+    def _write(self, event):
+        event['t'] = round(time.time() - self.started, 4)
+        with self.lock:
+            if self.file is None:
+                return
+            self.events.append(event)
+            self.file.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    def request(self, url, status=None, nbytes=0, seconds=0.0, wait=0.0, retries=0, cache=CACHE_MISS, error=None):
+        if not self.active:
+            return
+        self._write({
+            'type': 'request', 'url': url, 'host': urlsplit(url).netloc, 'status': status, 'bytes': nbytes,
+            'seconds': round(seconds, 6), 'wait': round(wait, 6), 'retries': retries, 'cache': cache,
+            'error': error,
+        })
+
+    def parse(self, extractor, seconds, nbytes=0, queued=None):
+        if not self.active:
+            return
+        event = {'type': 'parse', 'extractor': extractor, 'seconds': round(seconds, 6), 'bytes': nbytes}
+        if queued is not None:
+            event['queued'] = round(queued, 6)
+        self._write(event)
+
+    def finish(self):
+        """写入汇总并关闭日志，返回汇总"""
+        with self.lock:
+            if self.file is None:
+                return None
+            elapsed = time.time() - self.started
+            events = self.events
+        result = summarize(events, elapsed)
+        result['name'] = self.name
+        self._write({'type': 'summary', **result})
+        with self.lock:
+            self.file.close()
+            self.file = None
+        return result
+
+
+def summarize(events, elapsed=None):
+    """由事件列表计算汇总"""
+    requests = [e for e in events if e['type'] == 'request']
+    parses = [e for e in events if e['type'] == 'parse']
+    if elapsed is None:
+        elapsed = max((e['t'] for e in events), default=0.0)
+
+    network = [e['seconds'] for e in requests if e['cache'] != CACHE_HIT]
+    extractors = defaultdict(list)
+    for e in parses:
+        extractors[e['extractor']].append(e['seconds'])
+
+    return {
+        'elapsed': round(elapsed, 3),
+        'requests': len(requests),
+        'per_minute': round(len(requests) / elapsed * 60, 1) if elapsed else None,
+        'cache': dict(Counter(e['cache'] for e in requests)),
+        'status': {str(k): v for k, v in Counter(e['status'] for e in requests).items()},
+        'retries': sum(e['retries'] for e in requests),
+        'errors': sum(1 for e in requests if e['error']),
+        'bytes': sum(e['bytes'] for e in requests if e['cache'] in (CACHE_MISS, CACHE_BYPASS)),
+        'latency': {f"p{q}": percentile(network, q) for q in (50, 95, 99)},
+        'parse': {
+            name: {'count': len(values), 'total': round(sum(values), 4),
+                   **{f"p{q}": percentile(values, q) for q in (50, 95, 99)}}
+            for name, values in sorted(extractors.items())
+        },
+        # 各阶段累计时间；并发时总和可以超过运行时长
+        'time': {
+            'network': round(sum(network), 3),
+            'wait': round(sum(e['wait'] for e in requests), 3),
+            'parse': round(sum(e['seconds'] for e in parses), 3),
+            'queued': round(sum(e.get('queued', 0) for e in parses), 3),
+        },
+    }
+
+
+def _ms(value):
+    return '-' if value is None else f"{value * 1000:.0f}ms"
+
+
+def print_summary(result):
+    cache = result['cache']
+    status = ', '.join(f"{k}×{v}" for k, v in sorted(result['status'].items()))
+    latency = result['latency']
+    spent = result['time']
+    print(f"\n📊 运行统计 {result.get('name') or ''}（{result['elapsed']:.1f} 秒）")
+    print(f"   请求 {result['requests']} 次（{result['per_minute'] or 0:.1f} 次/分钟）："
+          f"缓存命中 {cache.get(CACHE_HIT, 0)}，重新验证 {cache.get(CACHE_REVALIDATED, 0)}，"
+          f"下载 {cache.get(CACHE_MISS, 0) + cache.get(CACHE_BYPASS, 0)}，重试 {result['retries']}，失败 {result['errors']}")
+    print(f"   网络延迟 p50 {_ms(latency['p50'])} / p95 {_ms(latency['p95'])} / p99 {_ms(latency['p99'])}，"
+          f"下载 {result['bytes'] / 1024 / 1024:.1f} MB，状态码 {status or '-'}")
+    for name, stats in result['parse'].items():
+        print(f"   解析 {name}: {stats['count']} 次，p50 {_ms(stats['p50'])} / p95 {_ms(stats['p95'])}，共 {stats['total']:.2f} 秒")
+    print(f"   累计时间：网络 {spent['network']:.1f} 秒，限速等待 {spent['wait']:.1f} 秒，"
+          f"解析 {spent['parse']:.1f} 秒，解析排队 {spent['queued']:.1f} 秒")
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    """获取进程内共享的指标记录器"""
+    return _metrics
+
+
+@contextmanager
+def metrics_run(name, path=None):
+    """记录一次抓取运行，结束（包括中断）时打印并写入汇总"""
+    metrics = get_metrics()
+    path = metrics.start(name, path)
+    try:
+        yield metrics
+    finally:
+        result = metrics.finish()
+        if result and result['requests']:
+            print_summary(result)
+            print(f"   指标日志: {path}")
+
+
+_nesting = threading.local()
+
+
+def timed_extractor(func):
+    """记录解析函数耗时的装饰器（未开始运行时不计时；嵌套调用只记最外层）"""
+    @wraps(func)
+    def wrapper(content, *args, **kwargs):
+        metrics = get_metrics()
+        if not metrics.active or getattr(_nesting, 'depth', 0):
+            return func(content, *args, **kwargs)
+        _nesting.depth = 1
+        start = time.perf_counter()
+        try:
+            return func(content, *args, **kwargs)
+        finally:
+            _nesting.depth = 0
+            metrics.parse(func.__name__, time.perf_counter() - start, len(content))
+    return wrapper
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("用法: python3 scripts/rr_metrics.py <指标日志.jsonl>")
+        return 1
+    events = []
+    with open(sys.argv[1], encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event['type'] != 'summary':
+                events.append(event)
+    result = summarize(events)
+    result['name'] = Path(sys.argv[1]).stem
+    print_summary(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Royal Road 详情页解析（lxml + 预编译 XPath）
+一次解析取出详情页上的全部字段，替代各脚本里 BeautifulSoup html.parser 的逐项查找。
+章节目录和评论区占页面体积的大部分，所需字段都在目录之前，因此只解析目录之前的部分。
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from lxml import etree, html as lxml_html
+
+from rr_metrics import timed_extractor
+
+STATUS_TYPES = ["COMPLETED", "ONGOING", "HIATUS", "STUB", "STUBBED", "DROPPED"]
+
+# 统计栏中的标签 -> 字段名
+STAT_LABELS = {
+    'total views': 'views',
+    'views': 'views',
+    'followers': 'followers',
+    'pages': 'pages',
+    'words': 'words',
+    'chapters': 'chapters',
+}
+
+_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+X_OG_URL = etree.XPath("string(//meta[@property='og:url']/@content)")
+X_META_RATING = etree.XPath("string(//meta[@property='books:rating:value']/@content)")
+X_OG_IMAGE = etree.XPath("string(//meta[@property='og:image']/@content)")
+X_LD_JSON = etree.XPath("//script[@type='application/ld+json']/text()")
+X_TITLE = etree.XPath("normalize-space((//h1)[1])")
+X_AUTHOR = etree.XPath("normalize-space((//a[contains(@href, '/profile/')])[1])")
+X_COVER = etree.XPath(
+    "string((//img[@data-type='cover'] | //*[%s]//img | //img[%s])[1]/@src)"
+    % (_CLASS.format('cover-art-container'), _CLASS.format('img-responsive'))
+)
+X_STATUS_LABELS = etree.XPath("//*[%s]//span[%s]/text()" % (_CLASS.format('fiction-info'), _CLASS.format('label')))
+X_TAGS = etree.XPath("//a[%s or contains(@href, '/tags/')]" % _CLASS.format('fiction-tag'))
+X_SYNOPSIS = etree.XPath("(//div[%s])[1]//text()" % _CLASS.format('description'))
+X_STATS = etree.XPath("(//*[%s])[1]" % _CLASS.format('fiction-stats'))
+X_STAT_ITEMS = etree.XPath(".//li")
+X_SCORE = etree.XPath("string((//span[@data-original-title='Overall Score']/@data-content)[1])")
+X_CHAPTER_LABEL = etree.XPath("//span[contains(text(), 'Chapters')]/text()")
+
+# 统计栏文本的兜底格式："1,234 Words"，一个正则一次扫描全部字段
+RE_STAT_PAIR = re.compile(r'([\d,]+)\s*(Total Views|Views|Followers|Pages|Words|Chapters)\b', re.IGNORECASE)
+RE_NUMBER = re.compile(r'[\d,]*\d')
+RE_RATING = re.compile(r'(\d+(?:\.\d+)?)')
+RE_FICTION_ID = re.compile(r'/fiction/(\d+)')
+RE_TOC_START = re.compile(rb'<table[^>]*\bid=["\']chapters["\']')
+RE_CHAPTER_ROW = re.compile(rb'<tr[^>]*\bclass=["\'][^"\']*\bchapter-row\b')
+
+
+@dataclass
+class FictionPage:
+    """详情页解析结果"""
+    fiction_id: Optional[int] = None
+    title: Optional[str] = None
+    author: Optional[str] = None
+    cover_url: Optional[str] = None
+    status: Optional[str] = None
+    chapters: Optional[int] = None
+    pages: Optional[int] = None
+    words: Optional[int] = None
+    views: Optional[int] = None
+    followers: Optional[int] = None
+    synopsis: Optional[str] = None
+    rating: Optional[float] = None
+    tags: List[str] = field(default_factory=list)
+
+    def to_record(self):
+        """转换为与抓取表格同名的字段字典"""
+        return {
+            'title': self.title,
+            'author': self.author,
+            'coverUrl': self.cover_url,
+            'status': self.status,
+            'chapters': self.chapters,
+            'pages': self.pages,
+            'words': self.words,
+            'views': self.views,
+            'followers': self.followers,
+            'synopsis': self.synopsis,
+            'platformRating': self.rating,
+            'tags': ', '.join(self.tags[:10]) if self.tags else None
+        }
+
+
+def parse_number(text):
+    """解析数字字符串，如 '1,234,567' -> 1234567"""
+    if not text:
+        return None
+    match = RE_NUMBER.search(str(text))
+    return int(match.group(0).replace(',', '')) if match else None
+
+
+def parse_html(content):
+    """把响应正文解析为 lxml 文档"""
+    return lxml_html.fromstring(content)
+
+
+def _rating(doc):
+    """评分：meta 标签 -> JSON-LD -> Overall Score 星级"""
+    value = X_META_RATING(doc)
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+    for script in X_LD_JSON(doc):
+        try:
+            return float(json.loads(script)['aggregateRating']['ratingValue'])
+        except (ValueError, KeyError, TypeError):
+            continue
+
+    match = RE_RATING.search(X_SCORE(doc))
+    return float(match.group(1)) if match else None
+
+
+def _stats(doc):
+    """统计栏：优先按 “标签 / 数值” 成对的 li 解析，再用正则兜底"""
+    stats = {}
+    section = X_STATS(doc)
+    if not section:
+        return stats
+    section = section[0]
+
+    label = None
+    for item in X_STAT_ITEMS(section):
+        text = item.text_content().strip()
+        if label:
+            stats.setdefault(label, parse_number(text))
+            label = None
+            continue
+        label = STAT_LABELS.get(text.rstrip(' :').lower())
+
+    if not stats:
+        for number, name in RE_STAT_PAIR.findall(section.text_content()):
+            stats.setdefault(STAT_LABELS[name.lower()], parse_number(number))
+    return stats
+
+
+@timed_extractor
+def parse_fiction_page(content):
+    """解析详情页，返回 FictionPage"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    toc = RE_TOC_START.search(content)
+    doc = parse_html(content[:toc.start()] if toc else content)
+
+    status = None
+    for label in X_STATUS_LABELS(doc):
+        label = label.strip().upper()
+        if label in STATUS_TYPES:
+            status = label
+            break
+
+    tags = []
+    for tag_elem in X_TAGS(doc):
+        tag_text = tag_elem.text_content().strip()
+        if tag_text and tag_text not in tags:
+            tags.append(tag_text)
+
+    stats = _stats(doc)
+    chapters = stats.get('chapters')
+    if chapters is None:
+        for label in X_CHAPTER_LABEL(doc):
+            chapters = parse_number(label)
+            if chapters is not None:
+                break
+    if chapters is None and toc:
+        chapters = sum(1 for _ in RE_CHAPTER_ROW.finditer(content, toc.start())) or None
+
+    fiction_id = RE_FICTION_ID.search(X_OG_URL(doc))
+    synopsis = ' '.join(' '.join(X_SYNOPSIS(doc)).split())
+
+    return FictionPage(
+        fiction_id=int(fiction_id.group(1)) if fiction_id else None,
+        title=X_TITLE(doc) or None,
+        author=X_AUTHOR(doc) or None,
+        cover_url=X_COVER(doc) or X_OG_IMAGE(doc) or None,
+        status=status,
+        chapters=chapters,
+        pages=stats.get('pages'),
+        words=stats.get('words'),
+        views=stats.get('views'),
+        followers=stats.get('followers'),
+        synopsis=synopsis[:1000] if synopsis else None,
+        rating=_rating(doc),
+        tags=tags
+    )
+
+
+@timed_extractor
+def parse_book_details(content):
+    """详情页中列表页拿不到的字段（作者、字数、评分）"""
+    page = parse_fiction_page(content)
+    return {
+        'author': page.author,
+        'words': page.words,
+        'platformRating': page.rating
+    }
@@ -0,0 +1,156 @@
+"""
+自适应的按主机限速器（AIMD）
+响应正常时逐步加速，遇到 429/5xx 时减半速率，并遵守 Retry-After
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# 默认参数：起始每 2 秒一个请求，最快每秒 2 个，最慢每分钟 1 个
+START_RATE = 0.5
+MIN_RATE = 1 / 60
+MAX_RATE = 2.0
+INCREASE = 0.05      # 每次成功后速率增加量（请求/秒）
+DECREASE = 0.5       # 每次被限流后速率乘以该系数
+JITTER = 0.2         # 请求间隔的随机抖动比例
+
+BACKOFF_STATUS = {429, 500, 502, 503, 504}
+
+# 所有速率乘以该系数（环境变量 RR_RATE_SCALE）；离线基准调大它，对本地替身服务器不限速
+RATE_SCALE = float(os.environ.get('RR_RATE_SCALE', 1))
+
+
+def parse_retry_after(value, now=None):
+    """解析 Retry-After 头，返回需要等待的秒数（支持秒数和 HTTP 日期两种格式）"""
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_at - now)
+
+
+class HostState:
+    """单个主机的速率状态"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.next_time = None    # 下一个可用请求时间点
+        self.blocked_until = 0   # Retry-After 要求的最早时间
+        self.successes = 0
+        self.throttled = 0
+
+
+class AdaptiveRateLimiter:
+    """按主机维护请求速率的 AIMD 限速器
+
+    clock/sleep 可替换为假时钟，便于单元测试
+    """
+
+    def __init__(self, start_rate=START_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 increase=INCREASE, decrease=DECREASE, burst=1, jitter=JITTER,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.start_rate = start_rate * RATE_SCALE
+        self.min_rate = min_rate * RATE_SCALE
+        self.max_rate = max_rate * RATE_SCALE
+        self.increase = increase * RATE_SCALE
+        self.decrease = decrease
+        self.burst = burst
+        self.jitter = jitter
+        self.clock = clock
+        self.sleep = sleep
+        self.hosts = {}
+        self.history = []        # [(时间, 主机, 速率, 状态码)]
+        self.lock = threading.Lock()
+
+    def _state(self, url):
+        host = urlsplit(url).netloc or url
+        if host not in self.hosts:
+            self.hosts[host] = HostState(self.start_rate)
+        return host, self.hosts[host]
+
+    def reserve(self, url):
+        """预约下一个请求时间片，返回需要等待的秒数（不实际等待）"""
+        with self.lock:
+            _, state = self._state(url)
+            now = self.clock()
+            interval = 1 / state.rate
+            if self.jitter:
+                interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+            # GCRA：允许积攒 burst 个请求的额度
+            earliest = now - (self.burst - 1) * interval
+            slot = max(earliest, state.next_time if state.next_time is not None else earliest)
+            slot = max(slot, state.blocked_until)
+            state.next_time = slot + interval
+            return max(0.0, slot - now)
+
+    def wait(self, url):
+        """同步等待到可以发出请求，返回实际等待的秒数"""
+        delay = self.reserve(url)
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    async def wait_async(self, url):
+        """异步等待到可以发出请求，返回实际等待的秒数"""
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def record(self, url, status, retry_after=None):
+        """记录一次响应结果并调整速率
+
+        status 为 None 表示连接失败，按限流处理
+        """
+        with self.lock:
+            host, state = self._state(url)
+            now = self.clock()
+            if status is None or status in BACKOFF_STATUS:
+                state.throttled += 1
+                state.rate = max(self.min_rate, state.rate * self.decrease)
+                wait = parse_retry_after(retry_after)
+                if wait is not None:
+                    state.blocked_until = max(state.blocked_until, now + wait)
+            else:
+                state.successes += 1
+                state.rate = min(self.max_rate, state.rate + self.increase)
+            self.history.append((now, host, state.rate, status))
+            return state.rate
+
+    def current_rate(self, url):
+        """当前速率（请求/秒）"""
+        with self.lock:
+            return self._state(url)[1].rate
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """获取进程内共享的限速器"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = AdaptiveRateLimiter()
+    return _limiter
+
+
+def configure_limiter(**kwargs):
+    """用新参数替换共享限速器，脚本在开始抓取前调用"""
+    global _limiter
+    with _limiter_lock:
+        _limiter = AdaptiveRateLimiter(**kwargs)
+    return _limiter
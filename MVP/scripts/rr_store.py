@@ -0,0 +1,133 @@
+"""
+以 Royal Road 小说 ID 为主键的书籍表
+各脚本抓到的数据都按整数 ID 合并，不再用 URL 字符串逐行匹配：
+带 slug 的详情页 URL、不带 slug 的 /fiction/<id>、末尾斜杠等写法都能对上。
+"""
+
+import re
+
+import pandas as pd
+
+RE_FICTION_ID = re.compile(r'/fiction/(\d+)')
+
+
+def fiction_id(value):
+    """从 URL（或已是 ID 的值）中取出小说 ID，无法识别时返回 None"""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value)
+    if text.isdigit():
+        return int(text)
+    match = RE_FICTION_ID.search(text)
+    return int(match.group(1)) if match else None
+
+
+def fiction_ids(urls):
+    """向量化版本：URL 列 -> 可空整数 ID 列"""
+    urls = pd.Series(urls, dtype='string')
+    digits = urls.str.fullmatch(r'\d+')
+    ids = urls.str.extract(RE_FICTION_ID, expand=False)
+    ids = ids.mask(digits.fillna(False), urls)
+    return pd.to_numeric(ids).astype('Int64')
+
+
+def keyed(mapping):
+    """把 {url 或 ID: 值} 转成以 ID 为索引的 Series"""
+    series = pd.Series(mapping, dtype=object)
+    series.index = fiction_ids(series.index.astype(str))
+    series = series[series.index.notna()]
+    return series[~series.index.duplicated(keep='last')]
+
+
+class BookStore:
+    """书籍表，内部按小说 ID 建索引，保留原有行顺序和列"""
+
+    def __init__(self, df):
+        df = df.reset_index(drop=True)
+        ids = fiction_ids(df['url'])
+        missing = int(ids.isna().sum())
+        if missing:
+            print(f"⚠️ {missing} 本书的 URL 中没有小说 ID，合并时会被跳过")
+        dup = ids.notna() & ids.duplicated()
+        if dup.any():
+            print(f"⚠️ 发现 {int(dup.sum())} 本重复的书，只保留第一条")
+            df, ids = df[~dup], ids[~dup]
+        self.columns = list(df.columns)
+        self.df = df.set_axis(pd.Index(ids, name='fictionId'))
+
+    @classmethod
+    def load(cls, path):
+        return cls(pd.read_excel(path))
+
+    def __len__(self):
+        return len(self.df)
+
+    def ids(self):
+        return self.df.index
+
+    def map(self, mapping):
+        """按 ID 把映射对齐到每一行，返回与表同序的 Series"""
+        return pd.Series(self.df.index.map(keyed(mapping)), index=self.df.index)
+
+    def assign(self, column, mapping):
+        """用映射整体覆盖一列，映射中没有的书置空"""
+        if column not in self.columns:
+            self.columns.append(column)
+        self.df[column] = self.map(mapping)
+
+    def upsert(self, records):
+        """按 ID 合并记录：已有的书只更新非空字段，新书追加到末尾
+
+        records 可以是 DataFrame、字典列表，或 {url/ID: {字段: 值}}
+        """
+        if isinstance(records, dict):
+            records = pd.DataFrame.from_dict(records, orient='index')
+            records['fictionId'] = fiction_ids(records.index.astype(str)).to_numpy()
+        else:
+            records = pd.DataFrame(records)
+        if records.empty:
+            return 0, 0
+        if 'fictionId' not in records.columns:
+            records['fictionId'] = fiction_ids(records['url']).to_numpy()
+        records = records[records['fictionId'].notna()]
+        records = records.drop_duplicates('fictionId', keep='last').set_index('fictionId')
+        records.index = records.index.astype('Int64')
+
+        for column in records.columns:
+            if column not in self.columns:
+                self.columns.append(column)
+                self.df[column] = pd.Series(pd.NA, index=self.df.index, dtype=object)
+
+        existing = records.index.isin(self.df.index)
+        updates = records[existing]
+        ids = self.df.index.to_series()
+        for column in updates.columns:
+            values = updates[column].dropna()
+            if values.empty:
+                continue
+            hit = ids.isin(values.index)
+            self.df[column] = self.df[column].where(~hit, ids.map(values))
+
+        new = records[~existing]
+        if not new.empty:
+            self.df = pd.concat([self.df, new.reindex(columns=self.df.columns)])
+        return int(existing.sum()), len(new)
+
+    def sort_by_rank(self, ranks):
+        """按 {url/ID: 排名} 排序，没有排名的书放在最后并保持原顺序"""
+        order = self.map(ranks)
+        self.df = self.df.assign(_rank=pd.to_numeric(order)) \
+            .sort_values('_rank', kind='stable', na_position='last').drop(columns='_rank')
+        return int(order.notna().sum())
+
+    def frame(self, columns_order=None):
+        """导出为普通 DataFrame（不含 ID 列）"""
+        columns = self.columns
+        if columns_order:
+            columns = [c for c in columns_order if c in self.columns]
+        return self.df[columns].reset_index(drop=True)
+
+    def save(self, path, columns_order=None):
+        self.frame(columns_order).to_excel(path, index=False, engine='openpyxl')
@@ -3,20 +3,14 @@
 抓取单本书籍数据 - Worth the Candle by Alexander Wales
 """
 
+import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-import pandas as pd
-import re
-import json
-
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.9',
-    'Connection': 'keep-alive'
-}
 
-BASE_URL = "https://www.royalroad.com"
+from rr_cache import CacheMiss
+from rr_http import BASE_URL, fetch
+from rr_metrics import metrics_run
+from rr_parse import parse_fiction_page
 
 
 def search_book(title, author=None):
@@ -30,9 +24,8 @@ def search_book(title, author=None):
     params = {'title': title}
 
     try:
-        response = requests.get(search_url, params=params, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = fetch(search_url, params=params, timeout=30)
+        soup = BeautifulSoup(response.content, 'lxml')
 
         # 查找所有小说链接
         fiction_links = soup.find_all('a', href=lambda x: x and '/fiction/' in str(x))
@@ -70,124 +63,9 @@ def scrape_book(url):
     print(f"   URL: {url}")
 
     try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # 基本信息
-        title = None
-        title_elem = soup.find('h1', class_='font-white') or soup.find('h1')
-        if title_elem:
-            title = title_elem.get_text(strip=True)
-
-        # 作者
-        author = None
-        author_link = soup.find('a', href=lambda x: x and '/profile/' in str(x))
-        if author_link:
-            author = author_link.get_text(strip=True)
-
-        # 状态
-        status = None
-        all_text = soup.get_text()
-        for status_type in ["COMPLETED", "ONGOING", "HIATUS", "STUB", "STUBBED"]:
-            if status_type in all_text:
-                status = status_type
-                break
-
-        # 封面
-        cover_url = None
-        cover_img = soup.find('img', class_='img-responsive')
-        if cover_img:
-            cover_url = cover_img.get('src')
-
-        # 评分
-        rating = None
-        meta_rating = soup.find('meta', property='books:rating:value')
-        if meta_rating and meta_rating.get('content'):
-            try:
-                rating = float(meta_rating['content'])
-            except:
-                pass
-
-        # 如果找不到，尝试 JSON-LD
-        if not rating:
-            json_ld = soup.find('script', type='application/ld+json')
-            if json_ld:
-                try:
-                    data = json.loads(json_ld.string)
-                    if 'aggregateRating' in data:
-                        rating = float(data['aggregateRating']['ratingValue'])
-                except:
-                    pass
-
-        # 统计信息
-        stats_section = soup.find('div', class_='fiction-stats')
-        chapters = None
-        pages = None
-        words = None
-        views = None
-        followers = None
-
-        if stats_section:
-            stats_text = stats_section.get_text()
-
-            # 章节和页数
-            chapters_match = re.search(r'(\d+)\s*(Chapters|Chapter)', stats_text, re.IGNORECASE)
-            if chapters_match:
-                chapters = int(chapters_match.group(1))
-
-            pages_match = re.search(r'(\d+)\s*(Pages|Page)', stats_text, re.IGNORECASE)
-            if pages_match:
-                pages = int(pages_match.group(1))
-
-            # 字数
-            words_match = re.search(r'([\d,]+)\s*Words?', stats_text, re.IGNORECASE)
-            if words_match:
-                words = int(words_match.group(1).replace(',', ''))
-
-        # 查找浏览量和关注者
-        for elem in soup.find_all(['div', 'span', 'p']):
-            text = elem.get_text(strip=True)
-
-            if not views:
-                views_match = re.search(r'([\d,]+)\s*Views?', text, re.IGNORECASE)
-                if views_match:
-                    views = int(views_match.group(1).replace(',', ''))
-
-            if not followers:
-                followers_match = re.search(r'([\d,]+)\s*Followers?', text, re.IGNORECASE)
-                if followers_match:
-                    followers = int(followers_match.group(1).replace(',', ''))
-
-        # 简介
-        synopsis = None
-        synopsis_elem = soup.find('div', class_='fiction-description')
-        if synopsis_elem:
-            synopsis = synopsis_elem.get_text(strip=True)[:1000]
-
-        # 标签
-        tags = []
-        tag_links = soup.find_all('a', href=lambda x: x and '/tags/' in str(x))
-        for tag_elem in tag_links[:10]:
-            tag_text = tag_elem.get_text(strip=True)
-            if tag_text and tag_text not in tags:
-                tags.append(tag_text)
-
-        book_info = {
-            'title': title,
-            'author': author,
-            'url': url,
-            'coverUrl': cover_url,
-            'status': status,
-            'chapters': chapters,
-            'pages': pages,
-            'words': words,
-            'views': views,
-            'followers': followers,
-            'synopsis': synopsis,
-            'platformRating': rating,
-            'tags': ', '.join(tags) if tags else None
-        }
+        response = fetch(url, timeout=30)
+        book_info = parse_fiction_page(response.content).to_record()
+        book_info['url'] = url
 
         return book_info
 
@@ -246,16 +124,15 @@ def main():
     for url in possible_urls:
         print(f"\n尝试访问: {url}")
         try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                # 检查是否包含书名
-                if "worth the candle" in soup.get_text().lower():
-                    print("✅ 找到书籍！")
-                    book_url = url
-                    break
-        except:
+            response = fetch(url, timeout=10)
+        except (requests.RequestException, CacheMiss):
             continue
+        soup = BeautifulSoup(response.content, 'lxml')
+        # 检查是否包含书名
+        if "worth the candle" in soup.get_text().lower():
+            print("✅ 找到书籍！")
+            book_url = url
+            break
 
     # 方法2：如果直接URL不工作，使用搜索
     if not book_url:
@@ -280,4 +157,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with metrics_run('single_book'):
+        main()
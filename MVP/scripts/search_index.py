@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+搜索框用的预生成倒排索引（public/data/search.json）
+- 词项规范化：NFKD 去掉变音符号、小写、去撇号；作者名额外拆驼峰、拼接、别名
+- 前缀查询：词项按字典序排列，客户端二分查找前缀区间
+- 拼写容错：词项的三元组（trigram）倒排，候选词再用编辑距离确认；
+  三元组表可由词项表直接推出，首次模糊查询时在客户端生成，不占下载体积
+- 紧凑 JSON：文档表 + 词项表 + 差分编码的倒排列表
+
+app/lib/search.ts 按同样的规则查询；这里的 SearchIndex 是同一算法的 Python 版本，供基准和核对用。
+
+用法：
+    python3 scripts/search_index.py [查询词...]
+"""
+
+import heapq
+import json
+import re
+import sys
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+FORMAT_VERSION = 1
+
+# 字段（越小权重越高）
+FIELD_TITLE = 0
+FIELD_AUTHOR = 1
+FIELD_THEME = 2
+FIELD_WEIGHT = (1.0, 0.8, 0.5)
+
+# 匹配方式得分
+SCORE_EXACT = 3
+SCORE_PREFIX = 2
+SCORE_FUZZY = 1
+
+# 作者的其他常用名（笔名 <-> 本名）
+AUTHOR_ALIASES = {
+    'Wildbow': ['John C. McCrae'],
+    'nobody103': ['Domagoj Kurmaić'],
+}
+
+RE_TOKEN = re.compile(r'[^\W_]+')
+RE_APOSTROPHE = re.compile(r"['’`]")
+RE_CAMEL = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+RE_ALIAS_SPLIT = re.compile(r'\s*(?:[()/,&]|\band\b|\baka\b)\s*', re.IGNORECASE)
+
+
+def fold(text):
+    """大小写与变音符号折叠：Kurmaić -> kurmaic"""
+    text = unicodedata.normalize('NFKD', RE_APOSTROPHE.sub('', text))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return RE_TOKEN.findall(fold(text or ''))
+
+
+def author_terms(author):
+    """作者名的检索词：原词、括号里的别名、驼峰拆分、去分隔符拼接"""
+    names = [author] + AUTHOR_ALIASES.get(author, [])
+    terms = []
+    for name in names:
+        for part in RE_ALIAS_SPLIT.split(name):
+            words = tokenize(part)
+            terms.extend(words)
+            if len(words) > 1:
+                terms.append(''.join(words))
+            for word in RE_TOKEN.findall(part):
+                pieces = RE_CAMEL.findall(word)
+                if len(pieces) > 1:
+                    terms.extend(fold(p) for p in pieces)
+    return list(dict.fromkeys(t for t in terms if t))
+
+
+def trigrams(term):
+    """带词首标记的三元组，短词也至少有一个"""
+    padded = '^' + term
+    return {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+
+
+def max_edits(token):
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def edit_distance(a, b, limit):
+    """Damerau-Levenshtein（相邻换位），超过 limit 提前返回 limit + 1
+
+    距离不超过 limit 的编辑路径不会偏离对角线超过 limit，只计算该带状区域
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    big = limit + 1
+    prev2 = None
+    prev = [j if j <= limit else big for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        row = [big] * (len(b) + 1)
+        if i <= limit:
+            row[0] = i
+        row_min = row[0]
+        ai = a[i - 1]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            value = prev[j - 1] + (ai != b[j - 1])
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if row[j - 1] + 1 < value:
+                value = row[j - 1] + 1
+            if prev2 is not None and j > 1 and ai == b[j - 2] and a[i - 2] == b[j - 1] and prev2[j - 2] + 1 < value:
+                value = prev2[j - 2] + 1
+            row[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return big
+        prev2, prev = prev, row
+    return min(prev[-1], big)
+
+
+def build_search_index(novels, stacks):
+    """生成索引数据
+
+    docs:     [类型, id, 标题, 副标题, 封面]，类型 n=书籍 s=书单
+    terms:    排好序的词项
+    postings: 与 terms 对应，每项为 (文档序号差 << 2 | 字段) 的数组
+    """
+    docs = []
+    fields = defaultdict(dict)   # term -> {doc: 最优字段}
+
+    def add(doc, field, terms):
+        for term in terms:
+            best = fields[term].get(doc)
+            if best is None or field < best:
+                fields[term][doc] = field
+
+    for novel in novels:
+        doc = len(docs)
+        docs.append(['n', novel['id'], novel.get('title') or '', novel.get('author') or '', novel.get('coverImage')])
+        add(doc, FIELD_TITLE, tokenize(novel.get('title')))
+        add(doc, FIELD_AUTHOR, author_terms(novel.get('author') or ''))
+        for theme in novel.get('themes', []):
+            add(doc, FIELD_THEME, tokenize(theme))
+
+    for stack in stacks:
+        doc = len(docs)
+        docs.append(['s', stack['id'], stack.get('title') or '', len(stack.get('entries', [])), None])
+        add(doc, FIELD_TITLE, tokenize(stack.get('title')))
+        for theme in stack.get('themes', []):
+            add(doc, FIELD_THEME, tokenize(theme))
+
+    terms = sorted(fields)
+    postings = []
+    for term in terms:
+        entries = sorted(fields[term].items())
+        last = 0
+        packed = []
+        for doc, field in entries:
+            packed.append((doc - last) << 2 | field)
+            last = doc
+        postings.append(packed)
+
+    return {
+        'v': FORMAT_VERSION,
+        'docs': docs,
+        'terms': terms,
+        'postings': postings,
+    }
+
+
+class SearchIndex:
+    """查询预生成索引（与 app/lib/search.ts 的算法一致）"""
+
+    def __init__(self, data):
+        if data.get('v') != FORMAT_VERSION:
+            raise ValueError(f"搜索索引版本不符: {data.get('v')}")
+        self.docs = data['docs']
+        self.terms = data['terms']
+        self.postings = data['postings']
+        self._grams = None
+        self._decoded = {}
+
+    def _posting(self, i):
+        """解码第 i 个词项的倒排列表 -> [(文档, 字段)]"""
+        cached = self._decoded.get(i)
+        if cached is None:
+            cached = []
+            doc = 0
+            for value in self.postings[i]:
+                doc += value >> 2
+                cached.append((doc, value & 3))
+            self._decoded[i] = cached
+        return cached
+
+    def _gram_index(self):
+        """三元组 -> 词项序号，首次模糊查询时生成"""
+        if self._grams is None:
+            self._grams = defaultdict(list)
+            for i, term in enumerate(self.terms):
+                for gram in trigrams(term):
+                    self._grams[gram].append(i)
+        return self._grams
+
+    def _prefix_range(self, token):
+        start = bisect_left(self.terms, token)
+        end = bisect_left(self.terms, token + '\uffff', start)
+        return start, end
+
+    def _fuzzy_terms(self, token):
+        """与 token 在编辑距离内的词项（整词或等长前缀）"""
+        limit = max_edits(token)
+        if not limit:
+            return []
+        grams = self._gram_index()
+        counts = defaultdict(int)
+        for gram in trigrams(token):
+            for i in grams.get(gram, ()):
+                counts[i] += 1
+        # 每处编辑最多破坏 3 个三元组
+        need = max(1, len(trigrams(token)) - 3 * limit)
+        matches = []
+        for i, count in counts.items():
+            if count < need:
+                continue
+            term = self.terms[i]
+            if edit_distance(token, term, limit) <= limit or \
+                    (len(term) > len(token) and edit_distance(token, term[:len(token)], limit) <= limit):
+                matches.append(i)
+        return matches
+
+    def _token_scores(self, token):
+        """单个查询词命中的文档 -> 得分"""
+        scores = {}
+
+        def hit(i, base):
+            for doc, field in self._posting(i):
+                score = base * FIELD_WEIGHT[field]
+                if score > scores.get(doc, 0):
+                    scores[doc] = score
+
+        start, end = self._prefix_range(token)
+        for i in range(start, end):
+            hit(i, SCORE_EXACT if self.terms[i] == token else SCORE_PREFIX)
+        if end - start == 0 or len(scores) < 3:
+            for i in self._fuzzy_terms(token):
+                hit(i, SCORE_FUZZY)
+        return scores
+
+    def search(self, query, limit=None):
+        """返回 [(得分, 文档)]，所有查询词都须命中；得分高的在前，同分按原顺序"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        total = None
+        for token in sorted(tokens, key=len, reverse=True):
+            scores = self._token_scores(token)
+            if total is None:
+                total = scores
+            else:
+                total = {doc: total[doc] + score for doc, score in scores.items() if doc in total}
+            if not total:
+                return []
+        key = lambda item: (-item[1], item[0])
+        if limit is None:
+            ranked = sorted(total.items(), key=key)
+        else:
+            ranked = heapq.nsmallest(limit, total.items(), key=key)
+        return [(score, self.docs[doc]) for doc, score in ranked]
+
+
+def main():
+    from build_shards import Catalog
+
+    catalog = Catalog.load()
+    data = build_search_index(catalog.novels, catalog.stacks)
+    size = len(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    print(f"✅ 索引 {len(data['docs'])} 个文档，{len(data['terms'])} 个词项，{size / 1024:.1f} KB")
+
+    index = SearchIndex(data)
+    for query in sys.argv[1:]:
+        print(f"\n🔍 {query}")
+        for score, (kind, doc_id, title, sub, _) in index.search(query, limit=8):
+            print(f"   {score:4.1f}  [{kind}] {title}  —  {sub}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+离线计算相似作品与相关书单（data/similar.json）
+- 每本书的特征：主题、抓取到的 Royal Road 标签、简介词、所在书单
+- 各组特征分别做 TF-IDF 并归一化，按权重拼成一个稀疏矩阵，余弦相似度即行向量点积
+- 分块计算 top-k：每次只算一块行与全体的乘积，内存与 n×n 无关；
+  常见特征（出现在 5% 以上的书中）列数少、几乎处处非零，走稠密矩阵乘法（BLAS），其余走稀疏乘法
+- 简介只保留每本书权重最高的若干词，避免常见词让所有书两两相关
+- 书单向量取成员书向量之和，再求相关书单
+
+build_shards.py 读取结果写入 novel/stack 分片；没有结果文件时退回按共同主题计数。
+
+用法：
+    python3 scripts/similarity.py                    # 更新 data/similar.json
+    python3 scripts/similarity.py --db rr_books.sqlite --k 12
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from books_json import atomic_write
+from build_shards import RELATED_STACKS, SIMILAR_COUNT, SIMILAR_JSON, Catalog
+from rr_db import BOOKS_DB, list_tables, read_books
+from rr_store import fiction_id
+from search_index import tokenize
+
+# 各组特征的权重（相似度 = 各组余弦相似度的加权和）
+FEATURE_WEIGHTS = {
+    'theme': 1.0,
+    'tag': 0.8,
+    'synopsis': 0.6,
+    'stack': 1.2,
+}
+
+# 每块相似度矩阵的最大元素数（float32，约 64 MB）
+BLOCK_CELLS = 16_000_000
+# 文档频率达到该比例的特征按稠密列计算
+DENSE_DF = 0.05
+# 每本书保留的简介词数
+SYNOPSIS_TERMS = 10
+
+# 出现在一半以上书中的特征（如 fantasy 标签、常见简介词）区分度低，却让几乎所有书两两相关，
+# 不参与计算
+MAX_DF = 0.5
+MIN_TERM_LENGTH = 3
+STOPWORDS = frozenset("""
+    the and for with his her their them they this that from into have has had was were are not but
+    its who what when where which will would can could all one out about there been more than only
+    him she our your you just also some any over after before while being other each such very own
+""".split())
+
+
+def scraped_tags(path=BOOKS_DB):
+    """抓取数据库各表中的标签：{小说 ID: [标签]}；没有数据库时返回空"""
+    if not Path(path).exists():
+        return {}
+    tags = {}
+    for table in list_tables(path):
+        df = read_books(table, path)
+        if 'tags' not in df.columns:
+            continue
+        for url, text in zip(df['url'].tolist(), df['tags'].tolist()):
+            book_id = fiction_id(url)
+            if book_id is not None and isinstance(text, str) and text.strip():
+                tags.setdefault(book_id, [t.strip().lower() for t in text.split(',') if t.strip()])
+    return tags
+
+
+def novel_tags(novel, tags):
+    """按书籍链接里的 Royal Road 小说 ID 取抓取标签"""
+    for link in novel.get('links', []):
+        book_id = fiction_id(link.get('url'))
+        if book_id is not None and book_id in tags:
+            return tags[book_id]
+    return []
+
+
+def synopsis_terms(text):
+    return [t for t in tokenize(text) if len(t) >= MIN_TERM_LENGTH and t not in STOPWORDS and not t.isdigit()]
+
+
+def tfidf(docs, sublinear=False, max_df=MAX_DF):
+    """docs 为每行的词列表 -> 行归一化的 TF-IDF 稀疏矩阵"""
+    counts = [Counter(doc) for doc in docs]
+    df = Counter(term for c in counts for term in c)
+    limit = max_df * len(docs)
+    vocab = {term: i for i, term in enumerate(sorted(t for t, n in df.items() if n <= limit))}
+
+    rows, cols, values = [], [], []
+    for row, c in enumerate(counts):
+        for term, count in c.items():
+            col = vocab.get(term)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+                values.append(count)
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float64), (rows, cols)), shape=(len(docs), len(vocab))
+    )
+    if sublinear:
+        np.log1p(matrix.data, out=matrix.data)
+    else:
+        matrix.data[:] = 1.0
+    doc_freq = np.bincount(matrix.indices, minlength=len(vocab))
+    idf = np.log((1 + len(docs)) / (1 + doc_freq)) + 1
+    matrix = matrix @ sparse.diags(idf)
+    return normalize_rows(matrix).astype(np.float32)
+
+
+def keep_top(matrix, m):
+    """每行只保留权重最高的 m 个非零值（同权重按列序），再重新归一化"""
+    matrix = sparse.csr_matrix(matrix)
+    lengths = np.diff(matrix.indptr)
+    if not len(lengths) or lengths.max() <= m:
+        return matrix
+    rows = np.repeat(np.arange(matrix.shape[0]), lengths)
+    order = np.lexsort((matrix.indices, -matrix.data, rows))
+    rank = np.arange(matrix.nnz) - matrix.indptr[rows[order]]
+    keep = np.sort(order[rank < m])
+    pruned = sparse.csr_matrix(
+        (matrix.data[keep], (rows[keep], matrix.indices[keep])), shape=matrix.shape
+    )
+    return normalize_rows(pruned).astype(matrix.dtype)
+
+
+def normalize_rows(matrix):
+    """按行 L2 归一化，全零行保持为零"""
+    matrix = sparse.csr_matrix(matrix)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def novel_matrix(catalog, tags):
+    """书籍特征矩阵（行顺序同 catalog.novels）"""
+    groups = {
+        'theme': ([t.lower() for t in n.get('themes', [])] for n in catalog.novels),
+        'tag': (novel_tags(n, tags) for n in catalog.novels),
+        'synopsis': (synopsis_terms(n.get('synopsis', '')) for n in catalog.novels),
+        'stack': ([s['id'] for s in catalog.stacks_by_novel.get(n['id'], [])] for n in catalog.novels),
+    }
+    blocks = []
+    for name, docs in groups.items():
+        docs = list(docs)
+        block = tfidf(docs, sublinear=(name == 'synopsis'))
+        if name == 'synopsis':
+            block = keep_top(block, SYNOPSIS_TERMS)
+        # 权重开方后拼接，点积即为加权和
+        blocks.append(block * np.sqrt(FEATURE_WEIGHTS[name]))
+    return sparse.hstack(blocks, format='csr')
+
+
+def top_k(matrix, k, block_cells=BLOCK_CELLS, exclude_self=True):
+    """每行相似度最高的 k 行：(序号, 得分)，不足 k 个或得分为 0 的位置序号为 -1
+
+    按行分块计算 matrix[块] @ matrix.T，每块只保留 top-k，不生成 n×n 矩阵
+    """
+    n = matrix.shape[0]
+    k = min(k, n - 1 if exclude_self else n)
+    indices = np.full((n, max(k, 0)), -1, dtype=np.int64)
+    scores = np.zeros((n, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return indices, scores
+
+    # 按文档频率分列：常见特征稠密计算，其余稀疏计算；只出现一次的特征对相似度没有贡献
+    matrix = sparse.csc_matrix(matrix, dtype=np.float32)
+    doc_freq = np.diff(matrix.indptr)
+    dense_cols = np.flatnonzero(doc_freq >= max(2, DENSE_DF * n))
+    sparse_cols = np.flatnonzero((doc_freq >= 2) & (doc_freq < max(2, DENSE_DF * n)))
+    dense = matrix[:, dense_cols].toarray()
+    dense_t = np.ascontiguousarray(dense.T)
+    rare = matrix[:, sparse_cols].tocsr()
+    rare_t = rare.T.tocsr()
+
+    rows = max(1, block_cells // n)
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        block = dense[start:stop] @ dense_t
+        product = (rare[start:stop] @ rare_t).tocoo()
+        block.ravel()[product.row * n + product.col] += product.data
+        if exclude_self:
+            block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        part = np.argpartition(block, -k, axis=1)[:, -k:]
+        top = np.take_along_axis(block, part, axis=1)
+        # 块内按得分从高到低，同分按序号
+        order = np.lexsort((part, -top), axis=1)
+        part = np.take_along_axis(part, order, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        part[top <= 0] = -1
+        indices[start:stop] = part
+        scores[start:stop] = np.maximum(top, 0)
+    return indices, scores
+
+
+def stack_matrix(catalog, novels):
+    """书单向量：成员书向量之和，再归一化"""
+    position = catalog.position
+    rows, cols = [], []
+    for row, stack in enumerate(catalog.stacks):
+        for novel_id in dict.fromkeys(catalog.stack_novels[stack['id']]):
+            if novel_id in position:
+                rows.append(row)
+                cols.append(position[novel_id])
+    membership = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(catalog.stacks), len(catalog.novels))
+    )
+    return normalize_rows(membership @ novels)
+
+
+def build_similar(catalog, tags, k=SIMILAR_COUNT, related=RELATED_STACKS, block_cells=BLOCK_CELLS):
+    """返回 {'novels': {id: [相似书 id]}, 'stacks': {id: [相关书单 id]}}"""
+    novels = novel_matrix(catalog, tags)
+    novel_ids = [n['id'] for n in catalog.novels]
+    neighbours, _ = top_k(novels, k, block_cells)
+
+    stack_ids = [s['id'] for s in catalog.stacks]
+    related_idx, _ = top_k(stack_matrix(catalog, novels), related, block_cells)
+
+    return {
+        'novels': {novel_ids[i]: [novel_ids[j] for j in row if j >= 0] for i, row in enumerate(neighbours.tolist())},
+        'stacks': {stack_ids[i]: [stack_ids[j] for j in row if j >= 0] for i, row in enumerate(related_idx.tolist())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="计算相似作品与相关书单")
+    parser.add_argument('--db', default=str(BOOKS_DB), help="抓取数据库（提供 Royal Road 标签）")
+    parser.add_argument('--k', type=int, default=SIMILAR_COUNT, help="每本书保留的相似作品数")
+    parser.add_argument('-o', '--output', default=str(SIMILAR_JSON), help="输出文件")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = Catalog.load()
+    tags = scraped_tags(args.db)
+    tagged = sum(1 for n in catalog.novels if novel_tags(n, tags))
+    if not tags:
+        print(f"⚠️ 没有找到抓取数据库 {args.db}，不使用 Royal Road 标签")
+
+    similar = build_similar(catalog, tags, k=args.k)
+    with atomic_write(args.output) as f:
+        json.dump(similar, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+    elapsed = time.perf_counter() - start
+    empty = sum(1 for ids in similar['novels'].values() if not ids)
+    print(f"✅ 已写入 {args.output}（{elapsed:.2f} 秒）")
+    print(f"   书籍 {len(catalog.novels)}（{tagged} 本有抓取标签，{empty} 本没有相似作品），书单 {len(catalog.stacks)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+限速器测试（假时钟，不访问网络、不真正等待）
+- 429 + Retry-After：fetch 降速、等到 Retry-After 指定的时间后重试，等待由限速器完成
+- 温和脚本的速率上限：连续成功后也不超过各脚本的 MAX_RATE
+
+用法：
+    python3 -m pytest scripts/test_ratelimit.py
+    python3 scripts/test_ratelimit.py
+"""
+
+import sys
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from rr_http import fetch
+from rr_ratelimit import AdaptiveRateLimiter, parse_retry_after
+
+URL = "https://www.royalroad.com/fiction/1/book-1"
+
+
+class FakeClock:
+    """clock() 返回假时间，sleep(秒) 只推进假时间并记录"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeSession:
+    """按顺序返回预设的 (状态码, 响应头)"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        status, headers = self.responses[self.calls]
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = b'<html></html>'
+        response.url = url
+        return response
+
+
+def make_limiter(clock, **kwargs):
+    return AdaptiveRateLimiter(jitter=0, clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_retry_after_seconds():
+    clock = FakeClock()
+    limiter = make_limiter(clock, start_rate=1.0)
+    session = FakeSession([(429, {'Retry-After': '30'}), (200, {})])
+
+    response = fetch(URL, session=session, limiter=limiter, use_cache=False)
+
+    assert response.status_code == 200
+    assert session.calls == 2
+    # 第一次请求不等待，第二次等到 Retry-After 指定的 30 秒之后
+    assert clock.sleeps == [30]
+    assert [status for _, _, _, status in limiter.history] == [429, 200]
+    assert limiter.hosts['www.royalroad.com'].throttled == 1
+
+
+def test_throttle_halves_rate_and_respects_min():
+    clock = FakeClock()
+    limiter = make_limiter(clock, start_rate=1.0, min_rate=0.2)
+    assert limiter.record(URL, 429) == 0.5
+    assert limiter.record(URL, 503) == 0.25
+    assert limiter.record(URL, None) == 0.2      # 连接失败也降速，但不低于 min_rate
+    assert limiter.record(URL, 429) == 0.2
+
+
+def test_blocked_until_outlasts_interval():
+    clock = FakeClock()
+    limiter = make_limiter(clock, start_rate=10.0)
+    limiter.wait(URL)
+    limiter.record(URL, 429, '12')
+    # 之后的请求都排在 Retry-After 之后
+    assert limiter.wait(URL) == 12
+    assert clock.now == 1012
+
+
+def test_retry_after_http_date():
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:30 GMT', now=1445412480) == 30
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=1445412510) == 0
+    assert parse_retry_after('garbage') is None
+    assert parse_retry_after(None) is None
+
+
+def test_gentle_scripts_stay_under_their_ceiling():
+    import reorder_by_best_rated
+    import retry_missing_ratings
+    import update_ratings_only
+
+    for script in (reorder_by_best_rated, update_ratings_only, retry_missing_ratings):
+        clock = FakeClock()
+        limiter = make_limiter(clock, start_rate=script.START_RATE, max_rate=script.MAX_RATE)
+        start = clock.now
+        for _ in range(100):
+            limiter.wait(URL)
+            limiter.record(URL, 200)
+        assert limiter.current_rate(URL) == limiter.max_rate, script.__name__
+        # 100 个请求至少用 99 个最小间隔
+        assert clock.now - start >= 99 / limiter.max_rate - 1e-6, script.__name__
+
+
+def main():
+    tests = [(name, func) for name, func in globals().items() if name.startswith('test_') and callable(func)]
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,86 +4,25 @@
 使用温和的策略，避免被网站封禁
 """
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import random
-import re
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
-# User-Agent 模拟浏览器访问
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.9',
-    'Accept-Encoding': 'gzip, deflate, br',
-    'Connection': 'keep-alive',
-    'Upgrade-Insecure-Requests': '1'
-}
-
-
-def create_session():
-    """创建带重试机制的 Session"""
-    session = requests.Session()
-
-    # 配置重试策略
-    retry_strategy = Retry(
-        total=5,
-        backoff_factor=10,  # 指数退避
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["HEAD", "GET", "OPTIONS"]
-    )
-
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-
-    session.headers.update(HEADERS)
-
-    return session
+from rr_db import BOOKS_DB, DEFAULT_TABLE, read_books, update_books
+from rr_history import record_snapshot
+from rr_http import fetch, get_session
+from rr_metrics import metrics_run
+from rr_parse import parse_fiction_page
+from rr_journal import ScrapeJournal
+from rr_ratelimit import configure_limiter
+from rr_store import BookStore
+
+# 温和抓取：起步约 10 秒一个请求，最快 8 秒一个
+START_RATE = 1 / 10
+MAX_RATE = 1 / 8
 
 
 def get_book_rating(session, url):
     """获取书籍详情页的评分"""
     try:
-        response = session.get(url, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # 尝试多种方式查找评分
-        rating = None
-
-        # 方法1: 查找包含 rating 的 span
-        rating_elements = soup.find_all('span', class_=lambda x: x and 'rating' in str(x).lower())
-        for elem in rating_elements:
-            text = elem.get_text(strip=True)
-            match = re.search(r'(\d\.\d{1,2})', text)
-            if match:
-                rating = float(match.group(1))
-                # 确保评分在合理范围内
-                if 1 <= rating <= 5:
-                    break
-
-        # 方法2: 查找所有包含分数的元素
-        if not rating:
-            all_elements = soup.find_all(['span', 'div', 'strong'])
-            for elem in all_elements:
-                text = elem.get_text(strip=True)
-                # 匹配类似 "4.5" 的格式
-                match = re.search(r'\b(\d\.\d{1,2})\b', text)
-                if match:
-                    potential_rating = float(match.group(1))
-                    # 确保评分在合理范围内
-                    if 1 <= potential_rating <= 5:
-                        # 检查是否包含 rating/ratings 等关键词
-                        parent_text = elem.parent.get_text() if elem.parent else ""
-                        if any(keyword in parent_text.lower() for keyword in ['rating', 'star', 'score']):
-                            rating = potential_rating
-                            break
-
-        return rating
+        response = fetch(url, timeout=30, session=session)
+        return parse_fiction_page(response.content).rating
 
     except Exception as e:
         print(f"      ⚠️ 请求失败: {e}")
@@ -97,16 +36,20 @@ def main():
     print("=" * 80)
 
     # 读取现有的 Excel 文件
-    input_file = '/Users/chengwen/Projects/solo-sonar/scripts/rr_best_rated.xlsx'
-    print(f"\n📂 读取文件: {input_file}")
+    table = DEFAULT_TABLE
+    print(f"\n📂 读取数据库: {BOOKS_DB.name} / {table}")
 
-    df = pd.read_excel(input_file)
+    store = BookStore(read_books(table))
+    df = store.frame()
     print(f"✅ 读取成功，共 {len(df)} 本书")
 
     # 创建 Session
-    session = create_session()
+    session = get_session()
     print("✅ 已创建 HTTP Session（带自动重试）")
 
+    # 之后由限速器根据响应在 START_RATE 与 MAX_RATE 之间调整
+    configure_limiter(start_rate=START_RATE, max_rate=MAX_RATE)
+
     # 检查是否已有评分列
     if 'platformRating' in df.columns:
         print(f"📊 已有评分列，{df['platformRating'].notna().sum()} 本有评分")
@@ -122,17 +65,27 @@ def main():
     success_count = 0
     fail_count = 0
 
+    # 进度日志：已拿到评分的书在中断重跑时直接复用
+    journal = ScrapeJournal('update_ratings_only')
+
     for idx, row in df.iterrows():
         book_title = row['title'][:40]
         book_url = row['url']
 
         print(f"\n[{idx + 1}/{len(df)}] {book_title}...")
 
+        if book_url in journal:
+            ratings[book_url] = journal.get(book_url)
+            success_count += 1
+            print(f"      ♻️ 评分: {ratings[book_url]}（进度日志）")
+            continue
+
         try:
             rating = get_book_rating(session, book_url)
 
             if rating:
                 ratings[book_url] = rating
+                journal.record(book_url, rating)
                 success_count += 1
                 print(f"      ✅ 评分: {rating}")
             else:
@@ -140,24 +93,13 @@ def main():
                 fail_count += 1
                 print(f"      ⚠️ 未找到评分")
 
-            # 延迟 - 使用更长的延迟时间
-            if idx < len(df) - 1:
-                delay = random.uniform(8, 15)  # 8-15秒随机延迟
-                print(f"      ⏱ 等待 {delay:.1f} 秒...")
-                time.sleep(delay)
-
         except Exception as e:
             ratings[book_url] = None
             fail_count += 1
             print(f"      ❌ 出错: {e}")
 
-            # 出错后等待更长时间
-            error_delay = random.uniform(20, 30)
-            print(f"      ⏱ 出错等待 {error_delay:.1f} 秒...")
-            time.sleep(error_delay)
-
     # 添加评分列
-    df['platformRating'] = df['url'].map(ratings)
+    df['platformRating'] = store.map(ratings).to_numpy()
 
     # 调整列顺序
     if 'notes' in df.columns:
@@ -181,12 +123,13 @@ def main():
     df = df[columns_order]
 
     # 保存更新后的文件
-    output_file = input_file
     print(f"\n" + "=" * 80)
-    print(f"💾 正在保存到 {output_file}...")
+    print(f"💾 正在更新数据库中的评分列...")
 
-    df.to_excel(output_file, index=False, engine='openpyxl')
+    update_books(df, ['platformRating'], table)
+    record_snapshot({'url': url, 'platformRating': rating} for url, rating in ratings.items())
     print("✅ 保存成功！")
+    journal.finish()
 
     # 显示统计信息
     print("\n" + "=" * 80)
@@ -210,7 +153,8 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        with metrics_run('update_ratings_only'):
+            main()
     except KeyboardInterrupt:
         print("\n\n⚠️ 用户中断")
     except Exception as e:
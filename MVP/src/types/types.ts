@@ -87,6 +87,14 @@ export interface NovelLink {
   isCanonical: boolean;          // 是否为主要/官方链接
 }
 
+/** 封面的多尺寸版本（scripts/cover_images.py 生成 public/covers/opt/） */
+export interface ResponsiveCover {
+  width: number;
+  height: number;
+  blurDataURL: string;
+  sources: Array<[string, string]>;  // [MIME 类型, srcset]，按优先级排列
+}
+
 export interface Novel {
   id: string;                    // 唯一标识，如 "mother-of-learning"
   title: string;                 // 作品名称
@@ -108,6 +116,7 @@ export interface Novel {
   
   // 封面
   coverImage?: string;           // 封面图 URL
+  cover?: ResponsiveCover;       // 封面的多尺寸版本（build_shards.py 从 data/covers.json 写入分片）
   coverGradient?: string;        // 备用渐变色，如 "from-violet-600 to-indigo-900"
   
   // 统计（来自 Solo Sonar 内部）
@@ -202,4 +211,5 @@ export interface NovelDetailData {
   novel: Novel;
   stacks: Stack[];               // 包含该作品的所有书单
   similarNovels: Novel[];        // 相似作品推荐
+  relatedNovels: Novel[];        // 同一作者或同一系列的作品
 }